@@ -1,6 +1,10 @@
 import os
 import json
 import base64
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
 from fastapi.params import Query
 from google import genai
 from google.genai import types
@@ -27,6 +31,111 @@ client = genai.Client(api_key=api_key)
 #MODEL_NAME = "gemini-2.0-flash-lite"
 MODEL_NAME = "gemma-3-27b-it"
 
+# At most AI_MAX_CONCURRENCY generations run at once; up to AI_MAX_QUEUE more may wait for a slot
+AI_MAX_CONCURRENCY = int(os.environ.get("AI_MAX_CONCURRENCY", "4"))
+AI_MAX_QUEUE = int(os.environ.get("AI_MAX_QUEUE", "32"))
+AI_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("AI_QUEUE_TIMEOUT_SECONDS", "60"))
+AI_GENERATION_TIMEOUT_SECONDS = float(os.environ.get("AI_GENERATION_TIMEOUT_SECONDS", "120"))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class GenerationLimiter:
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.peak_waiting = 0
+        self.requests = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._queue_ms = deque(maxlen=500)
+        self._generation_ms = deque(maxlen=500)
+
+    @property
+    def busy(self) -> bool:
+        return self._semaphore.locked()
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Waits for a free generation slot. Raises QueueFullError straight away
+        when too many requests are already waiting, and asyncio.TimeoutError
+        if no slot frees up within the queue timeout.
+        """
+        self.requests += 1
+        queued_at = time.perf_counter()
+
+        if not self._semaphore.locked():
+            # A free slot is taken without suspending
+            await self._semaphore.acquire()
+        else:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError("AI service is busy, please try again shortly.")
+
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise
+            finally:
+                self.waiting -= 1
+        self._queue_ms.append((time.perf_counter() - queued_at) * 1000)
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield
+            self.completed += 1
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self._generation_ms.append((time.perf_counter() - started) * 1000)
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    @staticmethod
+    def _percentiles(samples) -> dict:
+        if not samples:
+            return {"avg": None, "p50": None, "p95": None}
+        ordered = sorted(samples)
+        return {
+            "avg": round(sum(ordered) / len(ordered), 2),
+            "p50": round(ordered[len(ordered) // 2], 2),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2)
+        }
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "peak_queue_depth": self.peak_waiting,
+            "requests": self.requests,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_timeouts": self.timed_out,
+            "queue_wait_ms": self._percentiles(self._queue_ms),
+            "generation_ms": self._percentiles(self._generation_ms)
+        }
+
+
+limiter = GenerationLimiter(AI_MAX_CONCURRENCY, AI_MAX_QUEUE, AI_QUEUE_TIMEOUT_SECONDS)
+
 async def process_input(text_input: str, file_inputs: Optional[List[Union[str, UploadFile, pathlib.Path, Dict[str, Any]]]] = None) -> dict:
 
     if not isinstance(text_input, str):
@@ -96,14 +205,22 @@ async def websocket_process(websocket: WebSocket, api_key: Optional[str] = Query
         
         processed_data = await process_input(text_input, file_inputs)
         
-        await websocket.send_json({"status": "generating_response"})
-        
         contents = [processed_data["text_content"]] + processed_data["file_parts"]
-        
-        response = client.models.generate_content(
-            model=MODEL_NAME, 
-            contents=contents
-        )
+
+        if limiter.busy:
+            await websocket.send_json({"status": "queued", "queue_depth": limiter.waiting + 1})
+
+        async with limiter.slot():
+            await websocket.send_json({"status": "generating_response"})
+
+            # The async client keeps the event loop free for every other websocket
+            response = await asyncio.wait_for(
+                client.aio.models.generate_content(
+                    model=MODEL_NAME, 
+                    contents=contents
+                ),
+                timeout=AI_GENERATION_TIMEOUT_SECONDS
+            )
         
         await websocket.send_json({
             "status": "complete", 
@@ -113,6 +230,18 @@ async def websocket_process(websocket: WebSocket, api_key: Optional[str] = Query
         
     except WebSocketDisconnect:
         print("Client disconnected")
+    except QueueFullError as e:
+        await websocket.send_json({
+            "status": "busy",
+            "error": str(e),
+            "finished": True
+        })
+    except asyncio.TimeoutError:
+        await websocket.send_json({
+            "status": "error",
+            "error": "Timed out waiting for the AI model.",
+            "finished": True
+        })
     except Exception as e:
         await websocket.send_json({
             "status": "error",
@@ -120,5 +249,11 @@ async def websocket_process(websocket: WebSocket, api_key: Optional[str] = Query
             "finished": True
         })
 
+@app.get("/stats")
+async def stats(api_key: Optional[str] = Query(None)):
+    if api_key != SERVER_API_KEY:
+        raise fastapi.HTTPException(status_code=403, detail="Invalid or missing API Key.")
+    return limiter.stats()
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=2)
\ No newline at end of file
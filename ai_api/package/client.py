@@ -112,6 +112,13 @@ async def ask_ai(
 
     if final_response is None:
         raise ValueError("No response received from the AI service.")
+
+    if final_response.get("status") == "busy":
+        raise ValueError(final_response.get("error", "AI service is busy, please try again shortly."))
+
+    # Timeouts and failures produced nothing, so they are not charged or logged
+    if final_response.get("status") == "error":
+        raise ValueError(final_response.get("error", "The AI service failed to respond, please try again."))
     
     if free_credits > 0:
         await bot.db.execute("UPDATE ai_config SET remaining_credits_free = remaining_credits_free - 1")
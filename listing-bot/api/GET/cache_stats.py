@@ -0,0 +1,19 @@
+route = "/cache/stats"
+
+from quart import current_app
+from bot.bot import Bot
+from api.auth_utils import require_api_key
+from bot.util.cache import data_cache
+
+@require_api_key
+async def func():
+    bot: Bot = current_app.bot
+    stats_refresh = bot.get_cog("StatsRefresh")
+
+    return {
+        "success": True,
+        "data": data_cache.stats(),
+        "config": bot.db.config_cache_stats(),
+        "database": bot.db.query_stats(),
+        "stats_refresher": stats_refresh.refresher.stats() if stats_refresh else None
+    }, 200
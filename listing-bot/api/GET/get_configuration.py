@@ -10,10 +10,11 @@ async def func():
     bot: Bot = current_app.bot
 
     configuration_data = {}
+    current_values = await bot.db.get_configs(list(config_options))
     
     for option_key, option_info in config_options.items():
         try:
-            current_value = await bot.db.get_config(option_key)
+            current_value = current_values.get(option_key)
             
             expected_type = option_info["type"]
             description = option_info["description"]
@@ -45,25 +45,18 @@ async def func():
             } if member else None
         }
 
-    vouches_query = await bot.db.fetchall(
+    vouch_counts = await bot.db.fetchall(
         """
-        SELECT message
-        FROM vouches
+        SELECT mentioned_user_id, COUNT(*)
+        FROM vouch_mentions
+        WHERE mentioned_user_id IN (SELECT user_id FROM sellers)
+        GROUP BY mentioned_user_id
         """
     )
     
-    # Count vouches by scanning message content for seller mentions
-    vouch_counts = {}
-    for vouch_row in vouches_query:
-        message = vouch_row[0]
-        if message:
-            # Look for user ID mentions in the message content
-            for seller_id in sellers_data.keys():
-                if seller_id in message:
-                    vouch_counts[seller_id] = vouch_counts.get(seller_id, 0) + 1
-    
     # Add vouch counts to sellers data
-    for seller_id, vouch_count in vouch_counts.items():
+    for seller_id, vouch_count in vouch_counts:
+        seller_id = str(seller_id)
         if seller_id in sellers_data:
             sellers_data[seller_id]["vouches"] = {
                 "count": vouch_count
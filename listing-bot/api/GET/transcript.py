@@ -1,6 +1,7 @@
 route = "/transcript/<transcript_name>"
 
 import os
+from quart import request, send_file
 from bot.util.constants import bot_name
 from api.auth_utils import require_api_key
 
@@ -19,6 +20,10 @@ async def func(transcript_name: str):
     else:
         transcript_name = f"{transcript_name}"
         
+    # Lets the parent API stream the file instead of receiving it wrapped in JSON
+    if request.args.get("raw"):
+        return await send_file(f"./templates/{transcript_name}", mimetype="text/html")
+
     with open(f"./templates/{transcript_name}", "r") as f:
         transcript = f.read()
         return {"response": transcript}, 200
@@ -1,17 +1,22 @@
 route = "/value"
 
+import asyncio
+
 from bot.bot import Bot
 from quart import current_app, request, jsonify
 from api.auth_utils import require_api_key
 
-from bot.util.calcs import gather_lowball_value, gather_value
+from bot.util.calcs import gather_values_batch
+
+MAX_BATCH_PROFILES = 1000
 
 @require_api_key
-async def func(data: dict):
+async def func():
     bot: Bot = current_app.bot
 
     """
-    request JSON structure:
+    request JSON structure (single profile), or {"profiles": [<profile>, ...]}
+    to price many profiles in one call:
     {
         catacombs: { 
             dungeons: { 
@@ -86,12 +91,35 @@ async def func(data: dict):
     }
     """
 
-    lowball_value = gather_lowball_value(data)
-    total_value = gather_value(data)
+    data = await request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "A JSON object is required"}), 400
+
+    profiles = data.get("profiles")
+    if profiles is None:
+        (total_value, lowball_value), = gather_values_batch([data])
+        return jsonify({
+            "success": True,
+            "data": {
+                "lowball_value": lowball_value,
+                "total_value": total_value
+            }
+        })
+
+    if not isinstance(profiles, list) or not all(isinstance(profile, dict) for profile in profiles):
+        return jsonify({"success": False, "error": "profiles must be a list of objects"}), 400
+    if len(profiles) > MAX_BATCH_PROFILES:
+        return jsonify({"success": False, "error": f"At most {MAX_BATCH_PROFILES} profiles per request"}), 400
+
+    # Keep the Discord gateway responsive while a large batch is priced
+    results = await asyncio.to_thread(gather_values_batch, profiles)
     return jsonify({
         "success": True,
-        "data": {
-            "lowball_value": lowball_value,
-            "total_value": total_value
-        }
+        "data": [
+            {
+                "lowball_value": lowball_value,
+                "total_value": total_value
+            }
+            for total_value, lowball_value in results
+        ]
     })
@@ -5,6 +5,7 @@ import os
 from data.db import Database
 
 import aiohttp
+import asyncio
 import base64
 import os
 import traceback
@@ -12,6 +13,9 @@ import traceback
 from datetime import datetime, timezone
 from bot.util.reconstruct import reconstruct
 from bot.util.proxy import APIProxyManager, BotCommunicator
+from bot.util import registry, snapshot
+from bot.util.cache import data_cache
+from api.auth_utils import API_KEY
 
 
 from dotenv import load_dotenv
@@ -163,7 +167,17 @@ class Bot(commands.Bot):
                     print(f"Error loading custom view for panel '{panel[0]}': {e}")
                     traceback.print_exc()
         
+        # Full snapshot once; the Snapshot cog keeps it current from gateway events
+        await snapshot.import_legacy_snapshot(self.db)
+        for guild in self.guilds:
+            try:
+                await snapshot.sync_guild(self.db, guild)
+            except Exception as e:
+                print(f"Error snapshotting guild {guild.id}: {e}")
+
         self.update_server_data.start()
+        if not self.registry_heartbeat.is_running():
+            self.registry_heartbeat.start()
         print("aiohttp ClientSession created")
         print("Connected to API Proxy Manager")
         print("Owner IDs:", self.owner_ids)
@@ -176,6 +190,17 @@ class Bot(commands.Bot):
             status=discord.Status.dnd
         )
         
+    async def invalidate_parent_index(self, kind: str):
+        # Lets the parent API refresh its domain/email index for this bot right away
+        if not self.proxy_api:
+            return
+        try:
+            await self.proxy_api.post(
+                f"internal/{kind}/invalidate?bot_name={self.bot_name}&api_key={API_KEY}"
+            )
+        except Exception as e:
+            print(f"Failed to invalidate parent {kind} index: {e}")
+
     async def get_domain(self):
         domain = await self.db.get_config("domain")
         if not domain:
@@ -321,74 +346,6 @@ class Bot(commands.Bot):
                     print("AI credits last_reset timestamp initialized")
 
 
-        if not os.path.exists("./data/server_data.json"):
-            with open("./data/server_data.json", "w") as f:
-                json.dump({}, f)
-
-        with open("./data/server_data.json", "r") as f:
-            data = json.load(f)
-
-        for guild in self.guilds:
-
-            key = str(guild.id)
-            if key not in data:
-                data[key] = {}
-            
-            key_data = {
-                "name": guild.name,
-                "members": data[key].get("members", []),
-                "channels": [],
-                "roles": []
-            }
-
-            existing_members = {member["id"]: member for member in key_data["members"]}
-
-            for member in guild.members:
-                member_data = {
-                    "id": member.id,
-                    "bot": member.bot,
-                    "roles": [role.id for role in member.roles]
-                }
-                existing_members[member.id] = member_data
-
-            key_data["members"] = list(existing_members.values())
-
-            key_data["channels"] = [
-                {
-                    channel.name: {
-                        "type": str(channel.type),
-                        "id": channel.id,
-                        "position": channel.position,
-                        "category": channel.category.name if channel.category else None,
-                        "overwrites": {
-                            overwrite.name: [value.value for value in channel.overwrites[overwrite].pair()]
-                            for overwrite in channel.overwrites
-                        }
-                    }
-                } for channel in guild.channels
-            ]
-
-            key_data["roles"] = [
-                {
-                    role.name: {
-                        "id": role.id,
-                        "color": role.color.value,
-                        "position": role.position,
-                        "permissions": role.permissions.value,
-                        "mentionable": role.mentionable,
-                        "hoist": role.hoist,
-                        "managed": role.managed,
-                        "is_bot_managed": role.is_bot_managed(),
-                        "is_premium_subscriber": role.is_premium_subscriber()
-                    }
-                } for role in guild.roles
-            ]
-
-            data[key] = key_data
-
-        with open("./data/server_data.json", "w") as f:
-            json.dump(data, f)
-
         try:
             main_guild = self.get_guild(int(await self.db.get_config("main_guild")))
         except Exception as e:
@@ -397,6 +354,24 @@ class Bot(commands.Bot):
         invite = (await main_guild.invites())[0] if main_guild and (await main_guild.invites()) else None
         self.invite = invite.url if invite else None
 
+    @tasks.loop(seconds=30)
+    async def registry_heartbeat(self):
+        try:
+            await asyncio.to_thread(registry.heartbeat, self.bot_name)
+        except Exception as e:
+            print(f"Registry heartbeat failed: {e}")
+
+    @registry_heartbeat.before_loop
+    async def before_registry_heartbeat(self):
+        # Push the (re)registration so the parent API routes to us right away
+        await self.invalidate_parent_index("registry")
+
+    def get_cached_data(self, key: str, max_age: float = None):
+        return data_cache.get(key, max_age)
+
+    def cache_data(self, key: str, data, ttl: float = None):
+        data_cache.set(key, data, ttl)
+
     def get_emoji(self, name):
         return self.item_emojis.get(name)
 
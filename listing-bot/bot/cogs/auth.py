@@ -14,12 +14,8 @@ from bot.util.helper.macro_alt import AltObject
 from bot.util.list import list_account, list_profile, list_alt
 
 from bot.util.restore import *
-
-def get_guild_data(guild_id: int) -> dict:
-    with open("./data/server_data.json", "r") as f:
-        data = json.load(f)
-
-    return data.get(str(guild_id), {})
+from bot.util.snapshot import get_guild_data
+from bot.util import role_pool
 
 
 class Auth(commands.Cog):
@@ -260,7 +256,7 @@ class Auth(commands.Cog):
         guild = self.bot.get_guild(main_guild)
 
         if main_guild:
-            data = get_guild_data(main_guild)
+            data = await get_guild_data(self.bot.db, main_guild)
             if not data:
                 embed = discord.Embed(
                     title="Error",
@@ -350,8 +346,8 @@ class Auth(commands.Cog):
         await self.bot.db.execute("DELETE FROM roles")
 
         for role in ctx.guild.roles:
-            if role.name == "𝔟𝔬𝔱𝔰.𝔫𝔬𝔢𝔪𝔱.𝔡𝔢𝔳 | 𝔪𝔞𝔡𝔢 𝔟𝔶 𝔫𝔬𝔪":
-                await self.bot.db.execute("INSERT INTO roles (role_id, used) VALUES (?, ?)", role.id, "False")
+            if role.name == role_pool.TICKET_ROLE_NAME:
+                await self.bot.db.execute("INSERT INTO roles (role_id, used) VALUES (?, ?)", role.id, 0)
 
         accounts = await self.bot.db.fetchall("SELECT * FROM accounts WHERE channel_id IS NOT NULL")
         if accounts:
@@ -431,7 +427,7 @@ class Auth(commands.Cog):
             )
             return await ctx.respond(embed=embed, ephemeral=True)
             
-        data = get_guild_data(main_guild)
+        data = await get_guild_data(self.bot.db, main_guild)
         if not data:
             embed = discord.Embed(
                 title="Error",
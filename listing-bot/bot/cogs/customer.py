@@ -1,8 +1,6 @@
 import discord
 from discord.ext import commands, tasks
 from discord import option, SlashCommandGroup
-import re
-from collections import defaultdict
 import asyncio
 
 from bot.bot import Bot
@@ -12,6 +10,8 @@ from bot.util.paginator import Paginator
 class Customer(commands.Cog):
     def __init__(self, bot):
         self.bot: Bot = bot
+        # Milestones of the last run; the first run and any milestone change re-check every customer
+        self._milestones_seen = None
         self.milestone_checker.start()
 
     def cog_unload(self):
@@ -112,78 +112,36 @@ class Customer(commands.Cog):
     async def customer_leaderboard(self, ctx: discord.ApplicationContext):
         await ctx.defer()
 
-        vouches = await self.bot.db.fetchall("SELECT user_id, message, username FROM vouches")
-        
-        if not vouches:
-            embed = discord.Embed(
-                title="Customer Leaderboard",
-                description="No vouches found in the database.",
-                color=discord.Color.red()
-            )
-            return await ctx.respond(embed=embed)
+        rows = await self.bot.db.fetchall(
+            """
+            SELECT user_id, username, total_spent, purchase_count
+            FROM customer_spending
+            WHERE total_spent > 0
+            ORDER BY total_spent DESC, purchase_count DESC
+            """
+        )
 
-        customer_stats = defaultdict(lambda: {'total_spent': 0, 'purchase_count': 0, 'name': None, 'username': None})
-        pattern = re.compile(r'(\d+)\$|\$(\d+)|(\d+)\s?bucks')
-        
-        for user_id, message, username in vouches:
-            matches = pattern.findall(message)
-            amounts = [int(match) for group in matches for match in group if match and match.isdigit()]
-            amount = max(amounts) if amounts else 0
-            
-            if amount > 0:
-                customer_id = str(user_id)
-                customer_stats[customer_id]['total_spent'] += amount
-                customer_stats[customer_id]['purchase_count'] += 1
-                customer_stats[customer_id]['username'] = username
-        
-        if not customer_stats:
+        if not rows:
+            has_vouches = await self.bot.db.fetchone("SELECT EXISTS (SELECT 1 FROM vouches)")
             embed = discord.Embed(
                 title="Customer Leaderboard",
-                description="No valid customer spending data found in vouches.",
+                description="No valid customer spending data found in vouches." if has_vouches[0] else "No vouches found in the database.",
                 color=discord.Color.red()
             )
             return await ctx.respond(embed=embed)
 
-        sorted_customers = sorted(
-            customer_stats.items(),
-            key=lambda x: (x[1]['total_spent'], x[1]['purchase_count']),
-            reverse=True
-        )
-        
-        top_customers = sorted_customers[:50]
         user_cache = {}
-        
         if ctx.guild:
             for member in ctx.guild.members:
-                user_cache[str(member.id)] = member.display_name
-        
-        for customer_id, stats in top_customers:
-            if customer_id not in user_cache:
-                try:
-                    user = self.bot.get_user(int(customer_id))
-                    if user:
-                        user_cache[customer_id] = user.display_name
-                    else:
-                        user_cache[customer_id] = stats['username'] or f"User {customer_id}"
-                except:
-                    user_cache[customer_id] = stats['username'] or f"User {customer_id}"
-        
-        for customer_id, stats in customer_stats.items():
-            stats['name'] = user_cache.get(customer_id, stats['username'] or f"User {customer_id}")
+                user_cache[member.id] = member.display_name
 
-        if not customer_stats:
-            embed = discord.Embed(
-                title="Customer Leaderboard",
-                description="No valid customer spending data found in vouches.",
-                color=discord.Color.red()
-            )
-            return await ctx.respond(embed=embed)
-
-        sorted_customers = sorted(
-            customer_stats.items(),
-            key=lambda x: (x[1]['total_spent'], x[1]['purchase_count']),
-            reverse=True
-        )
+        sorted_customers = []
+        for user_id, username, total_spent, purchase_count in rows:
+            name = user_cache.get(user_id)
+            if name is None:
+                user = self.bot.get_user(user_id)
+                name = user.display_name if user else username or f"User {user_id}"
+            sorted_customers.append((user_id, {'total_spent': total_spent, 'purchase_count': purchase_count, 'name': name}))
 
         embeds = []
         customers_per_page = 10
@@ -352,86 +310,111 @@ class Customer(commands.Cog):
     async def milestone_checker(self):
         """Check and assign milestone roles every minute"""
         try:
-            all_configs = await self.bot.db.fetchall("SELECT key, value FROM config WHERE key LIKE 'milestone_role_%'")
-            if not all_configs:
-                return
-
-            milestones = []
-            for key, role_id in all_configs:
-                try:
-                    amount = int(key.replace("milestone_role_", ""))
-                    milestones.append((amount, int(role_id)))
-                except (ValueError, TypeError):
-                    continue
-
+            milestones = await self._get_milestones()
             if not milestones:
                 return
 
-            milestones.sort(key=lambda x: x[0], reverse=True)
-
-            vouches = await self.bot.db.fetchall("SELECT user_id, message FROM vouches")
-            customer_spending = defaultdict(int)
-            pattern = re.compile(r'(\d+)\$|\$(\d+)|(\d+)\s?bucks')
-
-            for user_id, message in vouches:
-                matches = pattern.findall(message)
-                amounts = [int(match) for group in matches for match in group if match and match.isdigit()]
-                amount = max(amounts) if amounts else 0
-                if amount > 0:
-                    customer_spending[user_id] += amount
-
-            for guild in self.bot.guilds:
-                try:
-                    for user_id, total_spent in customer_spending.items():
-                        member = guild.get_member(user_id)
-                        if not member:
-                            continue
-
-                        qualified_milestone = None
-                        for amount, role_id in milestones:
-                            if total_spent >= amount:
-                                qualified_milestone = (amount, role_id)
-                                break
-
-                        if not qualified_milestone:
-                            continue
-
-                        milestone_amount, milestone_role_id = qualified_milestone
-                        role = guild.get_role(milestone_role_id)
-                        if not role:
-                            continue
-
-                        # Check if user already has this role
-                        if role in member.roles:
-                            continue
-
-                        # Remove lower milestone roles and add the new one
-                        roles_to_remove = []
-                        for amount, role_id in milestones:
-                            if amount < milestone_amount:
-                                lower_role = guild.get_role(role_id)
-                                if lower_role and lower_role in member.roles:
-                                    roles_to_remove.append(lower_role)
-
-                        try:
-                            if roles_to_remove:
-                                await member.remove_roles(*roles_to_remove, reason="Milestone upgrade")
-                            await member.add_roles(role, reason=f"Reached ${milestone_amount:,} spending milestone")
-                            
-                            # Log the milestone achievement
-                            print(f"Assigned milestone role {role.name} to {member.display_name} for spending ${milestone_amount:,}")
-                        except discord.Forbidden:
-                            continue
-                        except discord.HTTPException:
-                            continue
-
-                except Exception as e:
-                    print(f"Error processing milestones for guild {guild.name}: {e}")
-                    continue
+            # A new or removed milestone can change the role of every customer
+            if milestones != self._milestones_seen:
+                customers = await self.bot.db.fetchall(
+                    "SELECT user_id, total_spent, version FROM customer_spending WHERE total_spent > 0"
+                )
+            else:
+                customers = await self.bot.db.fetchall(
+                    "SELECT user_id, total_spent, version FROM customer_spending WHERE version > checked_version"
+                )
+
+            for user_id, total_spent, _ in customers:
+                for guild in self.bot.guilds:
+                    member = guild.get_member(user_id)
+                    if not member:
+                        continue
+                    try:
+                        await self._apply_milestone(member, total_spent, milestones)
+                    except Exception as e:
+                        print(f"Error processing milestones for guild {guild.name}: {e}")
+
+            # Only versions read above are marked, so vouches added meanwhile are picked up next run
+            await self.bot.db.executemany(
+                "UPDATE customer_spending SET checked_version = ? WHERE user_id = ?",
+                [(version, user_id) for user_id, _, version in customers]
+            )
+            self._milestones_seen = milestones
 
         except Exception as e:
             print(f"Error in milestone checker: {e}")
 
+    async def _get_milestones(self) -> list:
+        """
+        Returns the configured (amount, role_id) milestones, highest first.
+        """
+        all_configs = await self.bot.db.fetchall("SELECT key, value FROM config WHERE key LIKE 'milestone_role_%'")
+
+        milestones = []
+        for key, role_id in all_configs:
+            try:
+                amount = int(key.replace("milestone_role_", ""))
+                milestones.append((amount, int(role_id)))
+            except (ValueError, TypeError):
+                continue
+
+        milestones.sort(key=lambda x: x[0], reverse=True)
+        return milestones
+
+    async def _apply_milestone(self, member: discord.Member, total_spent: int, milestones: list):
+        """
+        Gives the member the highest milestone role their spending qualifies for.
+        """
+        guild = member.guild
+        qualified_milestone = None
+        for amount, role_id in milestones:
+            if total_spent >= amount:
+                qualified_milestone = (amount, role_id)
+                break
+
+        if not qualified_milestone:
+            return
+
+        milestone_amount, milestone_role_id = qualified_milestone
+        role = guild.get_role(milestone_role_id)
+        if not role:
+            return
+
+        # Check if user already has this role
+        if role in member.roles:
+            return
+
+        # Remove lower milestone roles and add the new one
+        roles_to_remove = []
+        for amount, role_id in milestones:
+            if amount < milestone_amount:
+                lower_role = guild.get_role(role_id)
+                if lower_role and lower_role in member.roles:
+                    roles_to_remove.append(lower_role)
+
+        try:
+            if roles_to_remove:
+                await member.remove_roles(*roles_to_remove, reason="Milestone upgrade")
+            await member.add_roles(role, reason=f"Reached ${milestone_amount:,} spending milestone")
+
+            # Log the milestone achievement
+            print(f"Assigned milestone role {role.name} to {member.display_name} for spending ${milestone_amount:,}")
+        except discord.Forbidden:
+            return
+        except discord.HTTPException:
+            return
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        # Returning customers get their milestone role back without waiting for a full pass
+        row = await self.bot.db.fetchone("SELECT total_spent FROM customer_spending WHERE user_id = ?", member.id)
+        if not row or row[0] <= 0:
+            return
+
+        milestones = await self._get_milestones()
+        if milestones:
+            await self._apply_milestone(member, row[0], milestones)
+
     @milestone_checker.before_loop
     async def before_milestone_checker(self):
         await self.bot.wait_until_ready()
@@ -49,6 +49,7 @@ class Domains(commands.Cog):
 
         await self.bot.db.execute("UPDATE auth_bots SET redirect_uri=?", f'https://{domain}/authorize')
         await self.bot.db.update_config("domain", domain)
+        await self.bot.invalidate_parent_index("domain")
 
         embed = discord.Embed(
             title="Domain Updated",
@@ -75,6 +76,7 @@ Add the following to your **all** bot's redirect URIs:
     async def reset_domain(self, ctx: discord.ApplicationContext):
         await self.bot.db.execute("UPDATE auth_bots SET redirect_uri=?", "https://v2.noemt.dev/authorize")
         await self.bot.db.update_config("domain", "v2.noemt.dev")
+        await self.bot.invalidate_parent_index("domain")
 
         embed = discord.Embed(
             title="Domain Reset",
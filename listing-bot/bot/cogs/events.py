@@ -5,8 +5,10 @@ from bot.util.vouch import insert_vouch
 from datetime import datetime
 from bot.bot import Bot
 import json
-import os
 from bot.util.constants import is_authorized_to_use_bot
+from bot.util.log_settings import LoggingSettings
+from bot.util.log_dispatcher import LogDispatcher
+from bot.util import role_pool
 import ai
 
 sample_json = {
@@ -42,29 +44,15 @@ class Event(commands.Cog):
     def __init__(self, bot):
         self.bot: Bot = bot
 
-        if not os.path.exists("data/logging.json"):
-            # Ensure data directory exists
-            os.makedirs("data", exist_ok=True)
-            with open("data/logging.json", "w") as f:
-                json.dump(sample_json, f, indent=4)
+        self.logging_settings = LoggingSettings("data/logging.json", sample_json)
+        self.log_dispatcher = LogDispatcher()
+
+    def cog_unload(self):
+        self.log_dispatcher.close()
 
     # Helper method to check if logging is enabled
     async def is_logging_enabled(self, guild_id, event_type):
-        try:
-            with open("data/logging.json", "r") as f:
-                settings = json.load(f)
-        except FileNotFoundError:
-             # Ensure data directory exists
-            os.makedirs("data", exist_ok=True)
-            with open("data/logging.json", "w") as f:
-                json.dump({}, f, indent=4) # Start with empty if file truly missing
-            return False
-            
-        guild_id_str = str(guild_id)
-        if guild_id_str not in settings:
-            return False
-            
-        return settings[guild_id_str].get(event_type, False)
+        return self.logging_settings.is_enabled(guild_id, event_type)
     
     # Helper method to send log messages
     async def send_log(self, guild, event_type, embed_to_send: discord.Embed):
@@ -92,12 +80,8 @@ class Event(commands.Cog):
 
         embed_to_send.timestamp = datetime.utcnow()
         embed_to_send.set_footer(text=f"Event ID: {event_type}")
-        try:
-            await channel.send(embed=embed_to_send)
-        except discord.Forbidden:
-            print(f"Missing permissions to send log message in {channel.name} ({channel.id})")
-        except discord.HTTPException as e:
-            print(f"Failed to send log message: {e}")
+        # Batched per channel so bursts of events don't hit the channel rate limit
+        self.log_dispatcher.submit(channel, embed_to_send)
     
     # Define the logging command group
     logging = SlashCommandGroup("logging", "Commands for configuring logging settings")
@@ -127,28 +111,8 @@ class Event(commands.Cog):
     async def logging_config(self, ctx: discord.ApplicationContext, event: str, enabled: bool):
         await ctx.defer(ephemeral=True)
         
-        try:
-            with open("data/logging.json", "r") as f:
-                settings = json.load(f)
-        except FileNotFoundError:
-            os.makedirs("data", exist_ok=True)
-            settings = {} # Initialize empty settings
-        
-        guild_id = str(ctx.guild.id)
-        
-        if guild_id not in settings:
-            settings[guild_id] = sample_json.copy() # Use a copy of sample_json as a base
-        
-        # Ensure all keys from sample_json are present for the guild
-        for key, value in sample_json.items():
-            if key not in settings[guild_id]:
-                settings[guild_id][key] = value
-
-        if event in settings[guild_id]:
-            settings[guild_id][event] = enabled
-            
-            with open("data/logging.json", "w") as f:
-                json.dump(settings, f, indent=4)
+        if event in sample_json:
+            self.logging_settings.set_event(ctx.guild.id, event, enabled)
             
             status = "enabled" if enabled else "disabled"
             await ctx.respond(f"Logging for `{event}` has been {status}.", ephemeral=True)
@@ -182,25 +146,9 @@ class Event(commands.Cog):
     async def logging_status(self, ctx: discord.ApplicationContext):
         await ctx.defer(ephemeral=True)
         
-        try:
-            with open("data/logging.json", "r") as f:
-                settings = json.load(f)
-        except FileNotFoundError:
-            os.makedirs("data", exist_ok=True)
-            settings = {}
-        
-        guild_id = str(ctx.guild.id)
-        
-        if guild_id not in settings:
-            settings[guild_id] = sample_json.copy()
-            with open("data/logging.json", "w") as f: # Save initial settings if not present
-                json.dump(settings, f, indent=4)
-        
-        # Ensure all keys from sample_json are present
-        guild_settings = settings[guild_id]
-        for key, value in sample_json.items():
-            if key not in guild_settings:
-                guild_settings[key] = value # Default to sample_json value if missing
+        # Save initial settings if not present
+        self.logging_settings.ensure_guild(ctx.guild.id)
+        guild_settings = self.logging_settings.get_guild(ctx.guild.id)
 
         embed = discord.Embed(
             title="Logging Configuration",
@@ -218,6 +166,16 @@ class Event(commands.Cog):
                 pass # log_channel remains None
 
         embed.add_field(name="Log Channel", value=log_channel.mention if log_channel else "Not set", inline=False)
+
+        queue_stats = self.log_dispatcher.stats()
+        embed.add_field(
+            name="Log Queue",
+            value=(
+                f"{queue_stats['sent']} sent in {queue_stats['messages']} messages, {queue_stats['pending']} pending\n"
+                f"{queue_stats['dropped']} dropped, {queue_stats['delayed']} delayed, {queue_stats['failed']} failed"
+            ),
+            inline=False
+        )
         
         enabled_events = []
         disabled_events = []
@@ -434,7 +392,7 @@ class Event(commands.Cog):
             opened_by_id = ticket[0]
             role_id = ticket[3] # Assuming role_id is at index 3
 
-            await self.bot.db.execute("UPDATE roles SET used = ? WHERE role_id = ?", 0, role_id)
+            await role_pool.release_role(self.bot, role_id)
             
             member = channel.guild.get_member(opened_by_id) # Get member object
             role = channel.guild.get_role(role_id) # Get role object
@@ -5,7 +5,6 @@ from discord import SlashCommandGroup, option
 from bot.util.constants import is_authorized_to_use_bot
 from bot.util.list import list_account, list_profile, list_alt
 from bot.bot import Bot
-from bot.util.number import get_available_number
 
 def convert_str_bool(value: str) -> bool:
     return value.lower() == "true"
@@ -126,7 +125,7 @@ class Export(commands.Cog):
                 embed = await list_account(
                     self.bot, username, int(price), payment_methods, 
                     False, additional_information, convert_str_bool(show_username), 
-                    profile, await get_available_number(self.bot, "accounts"), ctx,
+                    profile, None, ctx,
                     ctx.author.id
                 )
             except Exception as e:
@@ -168,7 +167,7 @@ class Export(commands.Cog):
                 embed = await list_profile(
                     self.bot, username, int(price), payment_methods, 
                     False, additional_information, convert_str_bool(show_username), 
-                    profile, await get_available_number(self.bot, "profiles"), ctx.author.id
+                    profile, None, ctx.author.id
                 )
             except Exception as e:
                 embed = discord.Embed(
@@ -210,7 +209,7 @@ class Export(commands.Cog):
                     self.bot, username, int(price), payment_methods, 
                     convert_str_bool(farming), convert_str_bool(mining),
                     False, additional_information, convert_str_bool(show_username), 
-                    profile, await get_available_number(self.bot, "alts"), ctx.author.id
+                    profile, None, ctx.author.id
                 )
             except Exception as e:
                 embed = discord.Embed(
@@ -8,6 +8,8 @@ from bot.util.selector import profile_selector
 from bot.util.fetch import fetch_profile_data
 from bot.util.get_payment_methods import get_payment_methods
 from bot.util.convert_payment_methods import convert_payment_methods
+from bot.util.refresh import RefreshJob, DONE, SKIPPED, update_listing_message, clear_listing_hash
+from bot.util.number import holding_number
 
 from bot.util.helper.account import AccountObject, create_embed_account_listing
 from bot.util.helper.profile import ProfileObject, create_embed_profile_listing
@@ -21,6 +23,75 @@ class List(commands.Cog):
     update = SlashCommandGroup(name="update", description="Updating related commands.")
     restore = SlashCommandGroup(name="restore", description="Restoration related commands.")
 
+    async def run_refresh(self, ctx: discord.ApplicationContext, job_key: str, title: str, noun: str, rows: list, listing_class, handler):
+        """
+        Runs an update or restore over the given listing rows with progress for every
+        listing. An interrupted run of the same command is resumed instead.
+        """
+        listings = [listing_class(*row) for row in rows]
+        job = await RefreshJob.start(self.bot, job_key, [(listing.number, listing.username, row) for listing, row in zip(listings, rows)])
+
+        if job is None:
+            response_embed = discord.Embed(
+                title="Already Running",
+                description="This command is already running, please wait for it to finish.",
+                color=discord.Color.red()
+            )
+            return await ctx.respond(embed=response_embed)
+
+        if not job.items:
+            response_embed = discord.Embed(
+                title=f"No {title} Found",
+                description=f"No {title.lower()} found with the specified criteria.",
+                color=discord.Color.red()
+            )
+            return await ctx.respond(embed=response_embed)
+
+        description = f"Found {len(job.items)} {noun}(s) matching the given criteria."
+        if job.resumed:
+            description = f"Resuming an interrupted run over {len(job.items)} {noun}(s)."
+
+        response_embed = discord.Embed(
+            title=f"{title} Found",
+            description=description,
+            color=discord.Color.green()
+        )
+        try:
+            response: discord.WebhookMessage = await ctx.respond(embed=job.render(response_embed, description))
+            await job.run(response, response_embed, description, handler)
+        finally:
+            job.release()
+
+    async def _current_listing(self, table: str, listing_class, row: list):
+        # A resumed job carries the rows of its first run; prices may have changed since
+        current = await self.bot.db.fetchone(f"SELECT * FROM {table} WHERE number=?", listing_class(*row).number)
+        return listing_class(*current) if current else None
+
+    async def _prepare_restore(self, table: str, listing):
+        """
+        Warms the profile cache and removes the old listing, so the ordered part of a
+        restore only has to create the new channel. Call it while holding the number.
+        """
+        await fetch_profile_data(self.bot.session, listing.uuid, self.bot, listing.profile, allow_error_handler=False)
+
+        # After a crash the listing may already have been recreated under a new channel
+        current = await self.bot.db.fetchone(f"SELECT channel_id, uuid FROM {table} WHERE number=?", listing.number)
+        if current and current[1] != listing.uuid:
+            raise Exception(f"#{listing.number} has been taken by another listing")
+        channel = self.bot.get_channel(current[0] if current else listing.channel_id)
+        if channel:
+            await channel.delete()
+
+        await self.bot.db.execute(f"DELETE FROM {table} WHERE number=?", listing.number)
+        await clear_listing_hash(self.bot, table, listing.number)
+
+    @staticmethod
+    def _relisted(embed: discord.Embed) -> str:
+        # list_* report failures in the embed they return; the job keeps the row of failed items
+        if embed.color != discord.Color.green():
+            raise Exception(embed.description or embed.title)
+        return DONE
+
     @list.command(name="account", description="List an account")
     @option(name="username", description="Name of the Account", type=str, required=True)
     @option(name="price", description="Price of the Account (IN USD)", type=int, required=True)
@@ -60,49 +131,15 @@ class List(commands.Cog):
         params = (number,) if number else ()
         accounts = await self.bot.db.fetchall(query, *params)
 
-        if not accounts:
-            response_embed = discord.Embed(
-                title="No Accounts Found",
-                description="No accounts found with the specified criteria.",
-                color=discord.Color.red()
-            )
-            return await ctx.respond(embed=response_embed)
-
+        async def update(job: RefreshJob, index: int, row: list):
+            account = await self._current_listing("accounts", AccountObject, row)
+            if not account:
+                return SKIPPED
+            profile_data, profile = await fetch_profile_data(self.bot.session, account.uuid, self.bot, account.profile)
+            embed = create_embed_account_listing(profile_data, profile, account.uuid, account.username, account.price, account.additional_info, convert_payment_methods(self.bot, account.payment_methods), ctx, self.bot, f"<@{account.listed_by}>")
+            return await update_listing_message(self.bot, "accounts", account, [embed])
 
-        response_embed = discord.Embed(
-            title="Accounts Found",
-            description=f"Found {len(accounts)} account(s) matching the given criteria.",
-            color=discord.Color.green()
-        )
-        for i, account in enumerate(accounts):
-            if i < 24:
-                account = AccountObject(*account)
-                response_embed.add_field(name=account.username, value=f"🔴")
-            else:
-                response_embed.add_field(name=f"And {len(accounts)-24} more", value="🔴", inline=False)
-                break
-
-        response: discord.WebhookMessage = await ctx.respond(embed=response_embed)
-
-        for i, account in enumerate(accounts):
-            if i < 24:
-                account = AccountObject(*account)
-                profile_data, profile = await fetch_profile_data(self.bot.session, account.uuid, self.bot, account.profile)
-                embed = create_embed_account_listing(profile_data, profile, account.uuid, account.username, account.price, account.additional_info, convert_payment_methods(self.bot, account.payment_methods), ctx, self.bot, f"<@{account.listed_by}>")
-                response_embed.fields[i].value = f"🟢"
-
-                channel = self.bot.get_channel(account.channel_id)
-                if not channel:
-                    continue
-                message = await channel.fetch_message(account.message_id)
-                if not message:
-                    continue
-
-                await message.edit(embed=embed)
-                await response.edit(embed=response_embed)
-
-        response_embed.fields[-1].value = "🟢"
-        await response.edit(embed=response_embed)
+        await self.run_refresh(ctx, f"accounts:update:{number or 'all'}", "Accounts", "account", accounts, AccountObject, update)
     
     @restore.command(name="accounts", description="Restore all accounts")
     @is_authorized_to_use_bot()
@@ -111,45 +148,15 @@ class List(commands.Cog):
 
         accounts = await self.bot.db.fetchall("SELECT * FROM accounts WHERE channel_id IS NOT NULL")
 
-        if not accounts:
-            response_embed = discord.Embed(
-                title="No Accounts Found",
-                description="No accounts found with the specified criteria.",
-                color=discord.Color.red()
-            )
-            return await ctx.respond(embed=response_embed)
+        async def restore(job: RefreshJob, index: int, row: list):
+            account = AccountObject(*row)
+            async with holding_number(self.bot, "accounts", account.number):
+                await self._prepare_restore("accounts", account)
+                async with job.in_order(index):
+                    embed = await list_account(self.bot, account.username, account.price, account.payment_methods, False, account.additional_info, account.show_username, account.profile, account.number, ctx, account.listed_by)
+            return self._relisted(embed)
 
-        response_embed = discord.Embed(
-            title="Accounts Found",
-            description=f"Found {len(accounts)} account(s) matching the given criteria.",
-            color=discord.Color.green()
-        )
-        for i, account in enumerate(accounts):
-            if i < 24:
-                account = AccountObject(*account)
-                response_embed.add_field(name=account.username, value=f"🔴")
-            else:
-                response_embed.add_field(name=f"And {len(accounts)-24} more", value="🔴", inline=False)
-                break
-
-        response: discord.WebhookMessage = await ctx.respond(embed=response_embed)
-
-        for i, account in enumerate(accounts):
-            account = AccountObject(*account)
-
-            channel = self.bot.get_channel(account.channel_id)
-            if channel:
-                await channel.delete()
-            
-            await self.bot.db.execute("DELETE FROM accounts WHERE number=?", account.number)
-            await list_account(self.bot, account.username, account.price, account.payment_methods, False, account.additional_info, account.show_username, account.profile, account.number, ctx, account.listed_by)
-            
-            if i < 24:
-                response_embed.fields[i].value = f"🟢"
-                await response.edit(embed=response_embed)
-
-        response_embed.fields[-1].value = "🟢"
-        await response.edit(embed=response_embed)
+        await self.run_refresh(ctx, "accounts:restore", "Accounts", "account", accounts, AccountObject, restore)
 
     @list.command(name="profile", description="List a profile")
     @option(name="username", description="Name of the Account", type=str, required=True)
@@ -190,48 +197,15 @@ class List(commands.Cog):
         params = (number,) if number else ()
         profiles = await self.bot.db.fetchall(query, *params)
 
-        if not profiles:
-            response_embed = discord.Embed(
-                title="No Profiles Found",
-                description="No profiles found with the specified criteria.",
-                color=discord.Color.red()
-            )
-            return await ctx.respond(embed=response_embed)
+        async def update(job: RefreshJob, index: int, row: list):
+            account = await self._current_listing("profiles", ProfileObject, row)
+            if not account:
+                return SKIPPED
+            profile_data, profile = await fetch_profile_data(self.bot.session, account.uuid, self.bot, account.profile)
+            embed = create_embed_profile_listing(profile_data, profile, account.price, convert_payment_methods(self.bot, account.payment_methods), self.bot, f"<@{account.listed_by}>")
+            return await update_listing_message(self.bot, "profiles", account, [embed])
 
-        response_embed = discord.Embed(
-            title="Profiles Found",
-            description=f"Found {len(profiles)} profile(s) matching the given criteria.",
-            color=discord.Color.green()
-        )
-        for i, profile in enumerate(profiles):
-            if i < 24:
-                profile = ProfileObject(*profile)
-                response_embed.add_field(name=profile.username, value=f"🔴")
-            else:
-                response_embed.add_field(name=f"And {len(profiles)-24} more", value="🔴", inline=False)
-                break
-
-        response: discord.WebhookMessage = await ctx.respond(embed=response_embed)
-
-        for i, profile in enumerate(profiles):
-            if i < 24:
-                account = ProfileObject(*profile)
-                profile_data, profile = await fetch_profile_data(self.bot.session, account.uuid, self.bot, account.profile)
-                embed = create_embed_profile_listing(profile_data, profile, account.price, convert_payment_methods(self.bot, account.payment_methods), self.bot, f"<@{account.listed_by}>")
-                response_embed.fields[i].value = f"🟢"
-
-                channel = self.bot.get_channel(account.channel_id)
-                if not channel:
-                    continue
-                message = await channel.fetch_message(account.message_id)
-                if not message:
-                    continue
-
-                await message.edit(embed=embed)
-                await response.edit(embed=response_embed)
-
-        response_embed.fields[-1].value = "🟢"
-        await response.edit(embed=response_embed)
+        await self.run_refresh(ctx, f"profiles:update:{number or 'all'}", "Profiles", "profile", profiles, ProfileObject, update)
 
     @restore.command(name="profiles", description="Restore all profiles")
     @is_authorized_to_use_bot()
@@ -240,45 +214,15 @@ class List(commands.Cog):
 
         profiles = await self.bot.db.fetchall("SELECT * FROM profiles WHERE channel_id IS NOT NULL")
 
-        if not profiles:
-            response_embed = discord.Embed(
-                title="No Profiles Found",
-                description="No profiles found with the specified criteria.",
-                color=discord.Color.red()
-            )
-            return await ctx.respond(embed=response_embed)
-
-        response_embed = discord.Embed(
-            title="Profiles Found",
-            description=f"Found {len(profiles)} profile(s) matching the given criteria.",
-            color=discord.Color.green()
-        )
-        for i, profile in enumerate(profiles):
-            if i < 24:
-                profile = ProfileObject(*profile)
-                response_embed.add_field(name=profile.username, value=f"🔴")
-            else:
-                response_embed.add_field(name=f"And {len(profiles)-24} more", value="🔴", inline=False)
-                break
-
-        response: discord.WebhookMessage = await ctx.respond(embed=response_embed)
-
-        for i, profile in enumerate(profiles):
-            profile = ProfileObject(*profile)
-
-            channel = self.bot.get_channel(profile.channel_id)
-            if channel:
-                await channel.delete()
-            
-            await self.bot.db.execute("DELETE FROM profiles WHERE number=?", profile.number)
-            await list_profile(self.bot, profile.username, profile.price, profile.payment_methods, False, profile.additional_info, profile.show_username, profile.profile, profile.number, profile.listed_by)
+        async def restore(job: RefreshJob, index: int, row: list):
+            profile = ProfileObject(*row)
+            async with holding_number(self.bot, "profiles", profile.number):
+                await self._prepare_restore("profiles", profile)
+                async with job.in_order(index):
+                    embed = await list_profile(self.bot, profile.username, profile.price, profile.payment_methods, False, profile.additional_info, profile.show_username, profile.profile, profile.number, profile.listed_by)
+            return self._relisted(embed)
 
-            if i < 24:
-                response_embed.fields[i].value = f"🟢"
-                await response.edit(embed=response_embed)
-
-        response_embed.fields[-1].value = "🟢"
-        await response.edit(embed=response_embed)
+        await self.run_refresh(ctx, "profiles:restore", "Profiles", "profile", profiles, ProfileObject, restore)
 
     @list.command(name="alt", description="List an alt")
     @option(name="username", description="Name of the Account", type=str, required=True)
@@ -322,48 +266,15 @@ class List(commands.Cog):
         params = (number,) if number else ()
         alts = await self.bot.db.fetchall(query, *params)
 
-        if not alts:
-            response_embed = discord.Embed(
-                title="No Alt Accounts Found",
-                description="No Alt Accounts found with the specified criteria.",
-                color=discord.Color.red()
-            )
-            return await ctx.respond(embed=response_embed)
+        async def update(job: RefreshJob, index: int, row: list):
+            account = await self._current_listing("alts", AltObject, row)
+            if not account:
+                return SKIPPED
+            profile_data, profile = await fetch_profile_data(self.bot.session, account.uuid, self.bot, account.profile)
+            embeds = create_embed_alt_listing(profile_data, profile, account.price, convert_payment_methods(self.bot, account.payment_methods), self.bot, f"<@{account.listed_by}>", account.mining, account.farming)
+            return await update_listing_message(self.bot, "alts", account, embeds)
 
-        response_embed = discord.Embed(
-            title="Alt Accounts Found",
-            description=f"Found {len(alts)} Alt Account(s) matching the given criteria.",
-            color=discord.Color.green()
-        )
-        for i, profile in enumerate(alts):
-            if i < 24:
-                profile = AltObject(*profile)
-                response_embed.add_field(name=profile.username, value=f"🔴")
-            else:
-                response_embed.add_field(name=f"And {len(alts)-24} more", value="🔴", inline=False)
-                break
-
-        response: discord.WebhookMessage = await ctx.respond(embed=response_embed)
-
-        for i, profile in enumerate(alts):
-            if i < 24:
-                account = AltObject(*profile)
-                profile_data, profile = await fetch_profile_data(self.bot.session, account.uuid, self.bot, account.profile)
-                embeds = create_embed_alt_listing(profile_data, profile, account.price, convert_payment_methods(self.bot, account.payment_methods), self.bot, f"<@{account.listed_by}>", account.mining, account.farming)
-                response_embed.fields[i].value = f"🟢"
-
-                channel = self.bot.get_channel(account.channel_id)
-                if not channel:
-                    continue
-                message = await channel.fetch_message(account.message_id)
-                if not message:
-                    continue
-
-                await message.edit(embeds=embeds)
-                await response.edit(embed=response_embed)
-
-        response_embed.fields[-1].value = "🟢"
-        await response.edit(embed=response_embed)
+        await self.run_refresh(ctx, f"alts:update:{number or 'all'}", "Alt Accounts", "Alt Account", alts, AltObject, update)
 
     @restore.command(name="alts", description="Restore all alt accounts")
     @is_authorized_to_use_bot()
@@ -372,46 +283,15 @@ class List(commands.Cog):
 
         alts = await self.bot.db.fetchall("SELECT * FROM alts WHERE channel_id IS NOT NULL")
 
-        if not alts:
-            response_embed = discord.Embed(
-                title="No Alt Accounts Found",
-                description="No Alt Accounts found with the specified criteria.",
-                color=discord.Color.red()
-            )
-            return await ctx.respond(embed=response_embed)
-        
-        response_embed = discord.Embed(
-            title="Alt Accounts Found",
-            description=f"Found {len(alts)} Alt Account(s) matching the given criteria.",
-            color=discord.Color.green()
-        )
-
-        for i, profile in enumerate(alts):
-            if i < 24:
-                profile = AltObject(*profile)
-                response_embed.add_field(name=profile.username, value=f"🔴")
-            else:
-                response_embed.add_field(name=f"And {len(alts)-24} more", value="🔴", inline=False)
-                break
-
-        response: discord.WebhookMessage = await ctx.respond(embed=response_embed)
-
-        for i, profile in enumerate(alts):
-            profile = AltObject(*profile)
-
-            channel = self.bot.get_channel(profile.channel_id)
-            if channel:
-                await channel.delete()
-            
-            await self.bot.db.execute("DELETE FROM alts WHERE number=?", profile.number)
-            await list_alt(self.bot, profile.username, profile.price, profile.payment_methods, profile.farming, profile.mining, False, profile.additional_info, profile.show_username, profile.profile, profile.number, profile.listed_by)
-
-            if i < 24:
-                response_embed.fields[i].value = f"🟢"
-                await response.edit(embed=response_embed)
+        async def restore(job: RefreshJob, index: int, row: list):
+            profile = AltObject(*row)
+            async with holding_number(self.bot, "alts", profile.number):
+                await self._prepare_restore("alts", profile)
+                async with job.in_order(index):
+                    embed = await list_alt(self.bot, profile.username, profile.price, profile.payment_methods, profile.farming, profile.mining, False, profile.additional_info, profile.show_username, profile.profile, profile.number, profile.listed_by)
+            return self._relisted(embed)
 
-        response_embed.fields[-1].value = "🟢"
-        await response.edit(embed=response_embed)
+        await self.run_refresh(ctx, "alts:restore", "Alt Accounts", "Alt Account", alts, AltObject, restore)
 
 def setup(bot):
     bot.add_cog(List(bot))
\ No newline at end of file
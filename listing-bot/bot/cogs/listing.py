@@ -6,6 +6,7 @@ from bot.bot import Bot
 from bot.util.constants import is_authorized_to_use_bot
 from bot.util.fetch import fetch_profile_data
 from bot.util.convert_payment_methods import convert_payment_methods
+from bot.util.refresh import store_listing_hash
 
 from bot.util.helper.account import AccountObject, create_embed_account_listing
 from bot.util.helper.profile import ProfileObject, create_embed_profile_listing
@@ -160,6 +161,7 @@ class Listings(commands.Cog):
         
         message = await channel.fetch_message(account.message_id)
         await message.edit(embeds=embeds)
+        await store_listing_hash(self.bot, used_table, account.number, embeds)
 
         embed = discord.Embed(
             title="Price Updated",
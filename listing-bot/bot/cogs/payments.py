@@ -403,6 +403,7 @@ class Payments(commands.Cog):
             "INSERT OR REPLACE INTO config (key, value, data_type) VALUES (?, ?, ?)",
             "email_address", email, "str"
         )
+        await self.bot.invalidate_parent_index("email")
         
         embed = discord.Embed(
             title="Email Set Up",
@@ -0,0 +1,45 @@
+import os
+from discord.ext import commands, tasks
+from dotenv import load_dotenv
+
+from bot.bot import Bot
+from bot.util import role_pool
+
+load_dotenv()
+
+# How often the spare ticket roles are topped up, besides after every claim
+ROLE_POOL_CHECK_MINUTES = float(os.getenv("ROLE_POOL_CHECK_MINUTES", "10"))
+
+
+class RolePool(commands.Cog):
+    """
+    Keeps ROLE_POOL_SPARES free ticket roles in the main guild, so opening a ticket
+    only claims a role and never creates one.
+    """
+    def __init__(self, bot):
+        self.bot: Bot = bot
+        self.pool_refiller.start()
+
+    def cog_unload(self):
+        self.pool_refiller.cancel()
+
+    @tasks.loop(minutes=ROLE_POOL_CHECK_MINUTES)
+    async def pool_refiller(self):
+        try:
+            main_guild = await self.bot.db.get_config("main_guild")
+            guild = self.bot.get_guild(int(main_guild)) if main_guild else None
+            if not guild:
+                return
+
+            created = await role_pool.refill(self.bot, guild)
+            if created:
+                print(f"Created {created} spare ticket role(s)")
+        except Exception as e:
+            print(f"Error refilling ticket role pool: {e}")
+
+    @pool_refiller.before_loop
+    async def before_pool_refiller(self):
+        await self.bot.wait_until_ready()
+
+def setup(bot):
+    bot.add_cog(RolePool(bot))
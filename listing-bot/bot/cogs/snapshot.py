@@ -0,0 +1,88 @@
+import discord
+from discord.ext import commands
+from bot.bot import Bot
+from bot.util import snapshot
+
+
+class Snapshot(commands.Cog):
+    """
+    Keeps the guild snapshot used by /auth backup and restore current from gateway events,
+    instead of rebuilding it on a timer.
+    """
+    def __init__(self, bot: Bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        try:
+            await snapshot.sync_guild(self.bot.db, guild)
+        except Exception as e:
+            print(f"Error snapshotting guild {guild.id}: {e}")
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        if before.name == after.name:
+            return
+        try:
+            await snapshot.update_guild_name(self.bot.db, after)
+        except Exception as e:
+            print(f"Error updating guild snapshot name: {e}")
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        try:
+            await snapshot.upsert_member(self.bot.db, member)
+        except Exception as e:
+            print(f"Error snapshotting member {member.id}: {e}")
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles == after.roles:
+            return
+        try:
+            await snapshot.upsert_member(self.bot.db, after)
+        except Exception as e:
+            print(f"Error snapshotting member {after.id}: {e}")
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        await self._sync_roles(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        await self._sync_roles(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        await self._sync_roles(after.guild)
+        # Channel overwrites are stored by role name
+        if before.name != after.name:
+            await self._sync_channels(after.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        await self._sync_channels(channel.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        await self._sync_channels(channel.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        await self._sync_channels(after.guild)
+
+    async def _sync_roles(self, guild: discord.Guild):
+        try:
+            await snapshot.sync_roles(self.bot.db, guild)
+        except Exception as e:
+            print(f"Error snapshotting roles of guild {guild.id}: {e}")
+
+    async def _sync_channels(self, guild: discord.Guild):
+        try:
+            await snapshot.sync_channels(self.bot.db, guild)
+        except Exception as e:
+            print(f"Error snapshotting channels of guild {guild.id}: {e}")
+
+
+def setup(bot: Bot):
+    bot.add_cog(Snapshot(bot))
@@ -0,0 +1,39 @@
+import os
+from discord.ext import commands, tasks
+from dotenv import load_dotenv
+
+from bot.bot import Bot
+from bot.util.stats_refresher import StatsRefresher
+
+load_dotenv()
+
+# How often a batch of due listings is refreshed
+STATS_REFRESH_INTERVAL_MINUTES = float(os.getenv("STATS_REFRESH_INTERVAL_MINUTES", "5"))
+
+
+class StatsRefresh(commands.Cog):
+    """
+    Refreshes listing stats and embeds in the background, a small batch at a time,
+    so /api/accounts/all stays current without bursts against the Skyblock API.
+    """
+    def __init__(self, bot):
+        self.bot: Bot = bot
+        self.refresher = StatsRefresher(bot)
+        self.stats_refresher.start()
+
+    def cog_unload(self):
+        self.stats_refresher.cancel()
+
+    @tasks.loop(minutes=STATS_REFRESH_INTERVAL_MINUTES)
+    async def stats_refresher(self):
+        try:
+            await self.refresher.run()
+        except Exception as e:
+            print(f"Error in stats refresher: {e}")
+
+    @stats_refresher.before_loop
+    async def before_stats_refresher(self):
+        await self.bot.wait_until_ready()
+
+def setup(bot):
+    bot.add_cog(StatsRefresh(bot))
@@ -7,7 +7,7 @@ from bot.bot import Bot
 
 from bot.util.constants import is_authorized_to_use_bot
 from bot.util.listing_objects.ticket import Ticket as TicketObject
-from bot.util.ticket import get_default_overwrites
+from bot.util import role_pool
 from bot.util.paginator import Paginator
 import os
 from bot.util.attachment_handler import CustomHandler
@@ -108,7 +108,7 @@ class Ticket(commands.Cog):
 
         # Mark ticket as closed in database instead of deleting
         await self.bot.db.execute("UPDATE tickets SET is_open = ? WHERE channel_id = ?", 0, ctx.channel.id)
-        await self.bot.db.execute("UPDATE roles SET used = ? WHERE role_id = ?", 0, ticket_object.role_id)
+        await role_pool.release_role(self.bot, ticket_object.role_id)
 
         # Update channel permissions to make it read-only
         await ctx.channel.set_permissions(ctx.guild.default_role, send_messages=False, read_messages=False)
@@ -180,7 +180,7 @@ class Ticket(commands.Cog):
         ticket_object = TicketObject(*data)
         role = ctx.guild.get_role(ticket_object.role_id)
         if not role:
-            _, role = await get_default_overwrites(self.bot, ctx.guild.id)
+            role = await role_pool.claim_role(self.bot, ctx.guild)
 
         await user.add_roles(role)
 
@@ -193,8 +193,8 @@ class Ticket(commands.Cog):
         await ctx.channel.set_permissions(role, read_messages=True, send_messages=True)
 
         await self.bot.db.execute("UPDATE tickets SET role_id = ? WHERE channel_id = ?", role.id, ctx.channel.id)
-        await self.bot.db.execute("UPDATE roles SET used = ? WHERE role_id = ?", 0, ticket_object.role_id)
-        await self.bot.db.execute("UPDATE roles SET used = ? WHERE role_id = ?", 1, role.id)
+        await role_pool.release_role(self.bot, ticket_object.role_id)
+        await role_pool.mark_role_used(self.bot, role.id)
 
     @ticket.command(
         name="remove",
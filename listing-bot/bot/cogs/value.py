@@ -2,12 +2,31 @@ import discord
 from discord.ext import commands
 from discord import option, SlashCommandGroup
 import asyncio
+import os
+import time
 
 from discord.ui import View, Button
 
 from bot.util.value import old_value, old_lowball
 from bot.util.constants import is_authorized_to_use_bot
 from bot.util.selector import profile_selector
+from bot.util.ratelimit import skyblock_bucket
+
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "4"))
+# Minimum seconds between progress edits of the results message
+BULK_PROGRESS_INTERVAL = 2.0
+
+def parse_usernames(raw: str, separator: str) -> list[str]:
+    """Splits the input, dropping blanks and case-insensitive duplicates while keeping order"""
+    seen = set()
+    usernames = []
+    for username in raw.split(separator):
+        username = username.strip()
+        if not username or username.lower() in seen:
+            continue
+        seen.add(username.lower())
+        usernames.append(username)
+    return usernames
 
 class MassView(View):
     def __init__(self, embeds: list[discord.Embed], views: list[discord.ui.View]):
@@ -78,11 +97,12 @@ class MassView(View):
 
         await self.handle_button_click(interaction)
 
-    async def handle_button_click(self, interaction: discord.Interaction):
+    def page_embeds(self) -> list[discord.Embed]:
         start = self.index * 5
-        end = start + 5
+        return self.embeds[start:start + 5]
 
-        accounts_to_display = self.embeds[start:end]
+    async def handle_button_click(self, interaction: discord.Interaction):
+        accounts_to_display = self.page_embeds()
         self.update_buttons()
         await interaction.response.edit_message(embeds=accounts_to_display, view=self)
 
@@ -110,54 +130,64 @@ class Value(commands.Cog):
     async def lowball_singular(self, ctx: discord.ApplicationContext, username: str, profile: str = None):
         await old_lowball(ctx, self.bot, username, profile)
 
-    @bulk.command(name="lowballs", description="Get the lowball value of MANY accounts.")
-    @option(name="usernames", description="The usernames to check (separate by commas)", type=str, required=False)
-    @option(name="file", description="The file to check (txt file with one username per line)", type=discord.Attachment, required=False)
-    @is_authorized_to_use_bot()
-    async def bulk_lowball(self, ctx: discord.ApplicationContext, usernames: str = None, file: discord.Attachment = None):
-
-        if not usernames and not file:
-            embed = discord.Embed(
-                title="Input Error",
-                description="You must provide either usernames or a file.",
-                color=discord.Color.red()
-            )
-            return await ctx.respond(embed=embed, ephemeral=True)
-        if usernames and file:
-            embed = discord.Embed(
-                title="Input Error",
-                description="You must provide either usernames or a file, not both.",
-                color=discord.Color.red()
-            )
-            return await ctx.respond(embed=embed, ephemeral=True)
-        
-        await ctx.defer(ephemeral=True)
-        
-        if file:
-            file_content = await file.read()
-            usernames = file_content.decode("utf-8").split("\n")
-        else:
-            usernames = usernames.split(",")
-
+    async def run_bulk(self, ctx: discord.ApplicationContext, usernames: list[str], fetch):
+        """
+        Values every username concurrently, bounded by BULK_CONCURRENCY and the shared
+        Skyblock API token bucket, and streams results into one paginated message.
+        """
         embeds = []
         views = []
-
         failed_usernames = []
-
-        for i, username in enumerate(usernames):
-            embed, view = await old_lowball(ctx, self.bot, username, just_embed=True)
+        timings = {}
+
+        view = None
+        message = None
+        last_update = 0.0
+        semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+        started = time.perf_counter()
+
+        async def process(username: str):
+            async with semaphore:
+                await skyblock_bucket.acquire()
+                item_started = time.perf_counter()
+                try:
+                    embed, item_view = await fetch(ctx, self.bot, username, just_embed=True)
+                except Exception as e:
+                    print(f"Bulk valuation failed for {username}: {e}")
+                    embed, item_view = None, None
+                return username, embed, item_view, time.perf_counter() - item_started
+
+        def progress() -> str:
+            done = len(embeds) + len(failed_usernames)
+            return f"Processed **{done}/{len(usernames)}** accounts ({len(failed_usernames)} failed)"
+
+        for next_result in asyncio.as_completed([process(username) for username in usernames]):
+            username, embed, item_view, elapsed = await next_result
+            timings[username] = elapsed
 
             if embed is None:
                 failed_usernames.append(username)
                 continue
 
             embeds.append(embed)
-            views.append(view)
-
-            if i != len(usernames) - 1:
-                await asyncio.sleep(1)
-
-        view = MassView(embeds, views)
+            views.append(item_view)
+
+            now = time.perf_counter()
+            if message is None:
+                view = MassView(embeds, views)
+                message = await ctx.respond(content=progress(), embeds=view.page_embeds(), view=view, ephemeral=True)
+                last_update = now
+            elif now - last_update >= BULK_PROGRESS_INTERVAL:
+                view.update_buttons()
+                await message.edit(content=progress(), embeds=view.page_embeds(), view=view)
+                last_update = now
+
+        total = time.perf_counter() - started
+        summary = f"Processed **{len(usernames)}** accounts in **{total:.1f}s**"
+        if timings:
+            slowest = max(timings, key=timings.get)
+            average = sum(timings.values()) / len(timings)
+            summary += f" (avg {average:.2f}s per account, slowest `{slowest}` at {timings[slowest]:.2f}s)"
 
         if failed_usernames:
             embed = discord.Embed(
@@ -167,67 +197,68 @@ class Value(commands.Cog):
             )
             await ctx.respond(embed=embed)
 
-        await ctx.respond(embeds=embeds[:5], view=view, ephemeral=True)
-
-    @bulk.command(name="values", description="Get the account value of MANY accounts.")
-    @option(name="usernames", description="The usernames to check (separate by commas)", type=str, required=False)
-    @option(name="file", description="The file to check (txt file with one username per line)", type=discord.Attachment, required=False)
-    @is_authorized_to_use_bot()
-    async def bulk_value(self, ctx: discord.ApplicationContext, usernames: str = None, file: discord.Attachment = None):
+        if message is not None:
+            view.update_buttons()
+            await message.edit(content=summary, embeds=view.page_embeds(), view=view)
 
+    async def bulk_input(self, ctx: discord.ApplicationContext, usernames: str, file: discord.Attachment):
+        """Validates the bulk command input. Returns the usernames, or None after responding with an error."""
         if not usernames and not file:
             embed = discord.Embed(
                 title="Input Error",
                 description="You must provide either usernames or a file.",
                 color=discord.Color.red()
             )
-            return await ctx.respond(embed=embed, ephemeral=True)
+            await ctx.respond(embed=embed, ephemeral=True)
+            return None
         if usernames and file:
             embed = discord.Embed(
                 title="Input Error",
                 description="You must provide either usernames or a file, not both.",
                 color=discord.Color.red()
             )
-            return await ctx.respond(embed=embed, ephemeral=True)
+            await ctx.respond(embed=embed, ephemeral=True)
+            return None
         
         await ctx.defer(ephemeral=True)
         
         if file:
             file_content = await file.read()
-            usernames = file_content.decode("utf-8").split("\n")
+            usernames = parse_usernames(file_content.decode("utf-8"), "\n")
         else:
-            usernames = usernames.split(",")
-
-        embeds = []
-        views = []
-
-        failed_usernames = []
-
-        for i, username in enumerate(usernames):
-            embed, view = await old_value(ctx, self.bot, username, just_embed=True)
+            usernames = parse_usernames(usernames, ",")
 
-            if embed is None:
-                failed_usernames.append(username)
-                continue
-
-            embeds.append(embed)
-            views.append(view)
-
-            if i != len(usernames) - 1:
-                await asyncio.sleep(1)
-
-        view = MassView(embeds, views)
-
-        if failed_usernames:
+        if not usernames:
             embed = discord.Embed(
-                title="Some Accounts Failed to fetch",
-                description=f"**Failed usernames**: `{'`, `'.join(failed_usernames)}`",
+                title="Input Error",
+                description="No usernames were found in your input.",
                 color=discord.Color.red()
             )
-            await ctx.respond(embed=embed)
+            await ctx.respond(embed=embed, ephemeral=True)
+            return None
+        return usernames
+
+    @bulk.command(name="lowballs", description="Get the lowball value of MANY accounts.")
+    @option(name="usernames", description="The usernames to check (separate by commas)", type=str, required=False)
+    @option(name="file", description="The file to check (txt file with one username per line)", type=discord.Attachment, required=False)
+    @is_authorized_to_use_bot()
+    async def bulk_lowball(self, ctx: discord.ApplicationContext, usernames: str = None, file: discord.Attachment = None):
+        usernames = await self.bulk_input(ctx, usernames, file)
+        if usernames is None:
+            return
+
+        await self.run_bulk(ctx, usernames, old_lowball)
+
+    @bulk.command(name="values", description="Get the account value of MANY accounts.")
+    @option(name="usernames", description="The usernames to check (separate by commas)", type=str, required=False)
+    @option(name="file", description="The file to check (txt file with one username per line)", type=discord.Attachment, required=False)
+    @is_authorized_to_use_bot()
+    async def bulk_value(self, ctx: discord.ApplicationContext, usernames: str = None, file: discord.Attachment = None):
+        usernames = await self.bulk_input(ctx, usernames, file)
+        if usernames is None:
+            return
 
-        if not failed_usernames == usernames:
-            await ctx.respond(embeds=embeds[:5], view=view, ephemeral=True)
+        await self.run_bulk(ctx, usernames, old_value)
 
 def setup(bot):
     bot.add_cog(Value(bot))
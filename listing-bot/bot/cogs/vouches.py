@@ -188,29 +188,6 @@ class Vouches(commands.Cog):
     def __init__(self, bot):
         self.bot: Bot = bot
 
-    def _extract_amount_from_message(self, message):
-        """Extract dollar amount from vouch message"""
-        if not message:
-            return 0.0
-        
-        # Patterns to match: $50, 50$, 50 bucks, etc.
-        patterns = [
-            r'(\d+(?:\.\d{2})?)\$',  # 50$ or 50.99$
-            r'\$(\d+(?:\.\d{2})?)',  # $50 or $50.99
-            r'(\d+(?:\.\d{2})?)\s?(?:bucks?|dollars?)',  # 50 bucks, 50 dollars
-            r'(\d+(?:\.\d{2})?)\s?(?:usd|USD)',  # 50 USD
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                try:
-                    return float(match.group(1))
-                except (ValueError, IndexError):
-                    continue
-        
-        return 0.0
-
     def _extract_mentioned_user_from_message(self, message):
         """Extract mentioned user ID from vouch message using regex"""
         if not message:
@@ -402,27 +379,23 @@ class Vouches(commands.Cog):
             await ctx.respond(embed=embed)
     
     async def _fetch_all_shop_vouches(self):
-        """Fetch vouches from all bots using the communication system"""
+        """Fetch vouches from all bots concurrently through the parent API"""
         try:
-            # Get all available bots from ports
-            ports = self.bot.communication.fetch_ports()
             all_shop_data = []
             
-            for bot_name, port in ports.items():
-                try:
-                    # Request vouches from each bot
-                    response = await self.bot.communication.request(
-                        endpoint="vouches/all",
-                        request_type="GET",
-                        bots=[bot_name]
-                    )
-                    
-                    if response and response.get('success'):
-                        all_shop_data.append(response)
-                        
-                except Exception as e:
-                    print(f"Failed to fetch vouches from {bot_name}: {e}")
+            async for result in self.bot.communication.scatter("vouches/all", deadline=10):
+                if result.get("done"):
+                    if result["stragglers"]:
+                        print(f"Vouch fetch timed out for: {', '.join(result['stragglers'])}")
                     continue
+
+                if not result["success"]:
+                    print(f"Failed to fetch vouches from {result['bot_name']}: {result['error']}")
+                    continue
+
+                response = result["data"]
+                if response and response.get('success'):
+                    all_shop_data.append(response)
             
             return all_shop_data
             
@@ -438,10 +411,19 @@ class Vouches(commands.Cog):
         await ctx.defer()
         
         try:
-            # Get all vouches from local database
-            vouches = await self.bot.db.fetchall("SELECT user_id, message, username, avatar FROM vouches")
+            # Aggregate vouches by vouched-for users (the first user mentioned in each message)
+            rows = await self.bot.db.fetchall(
+                """
+                SELECT mentioned_user_id, COUNT(*) AS total_vouches, SUM(amount) AS total_amount
+                FROM vouch_mentions
+                WHERE position = 0
+                GROUP BY mentioned_user_id
+                ORDER BY total_amount DESC, total_vouches DESC
+                LIMIT 10
+                """
+            )
             
-            if not vouches:
+            if not rows:
                 embed = discord.Embed(
                     title="🏆 Local Vouch Leaderboard",
                     description="No vouches found in this shop.",
@@ -449,43 +431,15 @@ class Vouches(commands.Cog):
                 )
                 return await ctx.respond(embed=embed)
             
-            # Aggregate vouches by vouched-for users (mentioned in messages)
-            seller_stats = defaultdict(lambda: {
-                'total_vouches': 0,
-                'total_amount': 0.0,
-                'username': '',
-                'avatar': ''
-            })
-            
-            for user_id, message, username, avatar in vouches:
-                amount = self._extract_amount_from_message(message)
-                
-                # Extract the mentioned user ID (the person being vouched for)
-                mentioned_user_id = self._extract_mentioned_user_from_message(message)
-                
-                if mentioned_user_id:  # Only count vouches that mention someone
-                    seller_stats[mentioned_user_id]['total_vouches'] += 1
-                    seller_stats[mentioned_user_id]['total_amount'] += amount
-                    
-                    # Try to get username from the bot if possible
-                    try:
-                        user = self.bot.get_user(mentioned_user_id)
-                        if user:
-                            seller_stats[mentioned_user_id]['username'] = user.display_name
-                            seller_stats[mentioned_user_id]['avatar'] = str(user.avatar.url) if user.avatar else ''
-                        else:
-                            seller_stats[mentioned_user_id]['username'] = f'User {mentioned_user_id}'
-                            seller_stats[mentioned_user_id]['avatar'] = ''
-                    except:
-                        seller_stats[mentioned_user_id]['username'] = f'User {mentioned_user_id}'
-                        seller_stats[mentioned_user_id]['avatar'] = ''
-            
-            # Sort by total amount (then by total vouches as tiebreaker)
-            sorted_sellers = sorted(
-                seller_stats.items(),
-                key=lambda x: (x[1]['total_amount'], x[1]['total_vouches']),
-                reverse=True
-            )
+            sorted_sellers = []
+            for mentioned_user_id, total_vouches, total_amount in rows:
+                user = self.bot.get_user(mentioned_user_id)
+                sorted_sellers.append((mentioned_user_id, {
+                    'total_vouches': total_vouches,
+                    'total_amount': total_amount,
+                    'username': user.display_name if user else f'User {mentioned_user_id}',
+                    'avatar': str(user.avatar.url) if user and user.avatar else ''
+                }))
             
             # Create leaderboard embed
             shop_name = "This Shop"
@@ -549,8 +503,7 @@ class Vouches(commands.Cog):
             if message.content in vouch_set:
                 continue
             
-            await self.bot.db.execute(
-                "INSERT INTO vouches (user_id, message, avatar, username) VALUES (?, ?, ?, ?)",
+            await self.bot.db.add_vouch(
                 message.author.id,
                 message.content,
                 str(message.author.display_avatar.url),
@@ -604,21 +557,16 @@ class Vouches(commands.Cog):
         )
         embed.set_thumbnail(url=user.avatar.url if user.avatar else user.default_avatar.url)
 
-        vouches = await self.bot.db.fetchall("SELECT * FROM vouches WHERE message LIKE ?", f"%{user.id}%")
+        count, amount = await self.bot.db.fetchone(
+            "SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM vouch_mentions WHERE mentioned_user_id = ?",
+            user.id
+        )
 
-        if not vouches:
+        if not count:
             embed.description += "\nNo vouches found for this user."
             return await ctx.respond(embed=embed, ephemeral=True)
-        
-        amount = 0
-        for user_id, message, avatar, username in vouches:
-            pattern = r'(\d+)\$|\$(\d+)|(\d+)\s?bucks'
-            matches = re.findall(pattern, message)
-            matches = [int(match) for group in matches for match in group if match and match.isdigit()]
-            if matches:
-                amount += max(matches)
 
-        embed.description += f"\nhas **{len(vouches)}** vouches\nand dealt with **{amount}$**."
+        embed.description += f"\nhas **{count}** vouches\nand dealt with **{amount}$**."
         embed.set_footer(text="Vouches are not moderated by the bot. Count and amount are based on available data.")
 
         await ctx.respond(embed=embed, ephemeral=True)
@@ -664,9 +612,9 @@ class Vouches(commands.Cog):
     async def vouch_leaderboard(self, ctx: discord.ApplicationContext):
         await ctx.defer()
 
-        vouches = await self.bot.db.fetchall("SELECT user_id, message FROM vouches")
+        has_vouches = await self.bot.db.fetchone("SELECT EXISTS (SELECT 1 FROM vouches)")
         
-        if not vouches:
+        if not has_vouches[0]:
             embed = discord.Embed(
                 title="Vouch Leaderboard",
                 description="No vouches found in the database.",
@@ -674,22 +622,16 @@ class Vouches(commands.Cog):
             )
             return await ctx.respond(embed=embed)
 
-        seller_stats = defaultdict(lambda: {'count': 0, 'total_amount': 0, 'name': None})
-        mention_pattern = re.compile(r'<@!?(\d+)>')
-        amount_pattern = re.compile(r'(\d+)\$|\$(\d+)|(\d+)\s?bucks')
-        
-        for user_id, message in vouches:
-            mentioned_users = mention_pattern.findall(message)
-            
-            matches = amount_pattern.findall(message)
-            amounts = [int(match) for group in matches for match in group if match and match.isdigit()]
-            amount = max(amounts) if amounts else 0
-            
-            for mentioned_user_id in mentioned_users:
-                seller_stats[mentioned_user_id]['count'] += 1
-                seller_stats[mentioned_user_id]['total_amount'] += amount
+        rows = await self.bot.db.fetchall(
+            """
+            SELECT mentioned_user_id, COUNT(*) AS count, SUM(amount) AS total_amount
+            FROM vouch_mentions
+            GROUP BY mentioned_user_id
+            ORDER BY total_amount DESC, count DESC
+            """
+        )
 
-        if not seller_stats:
+        if not rows:
             embed = discord.Embed(
                 title="Vouch Leaderboard",
                 description="No valid vouches with mentioned users found.",
@@ -697,11 +639,10 @@ class Vouches(commands.Cog):
             )
             return await ctx.respond(embed=embed)
 
-        sorted_sellers = sorted(
-            seller_stats.items(),
-            key=lambda x: (x[1]['total_amount'], x[1]['count']),
-            reverse=True
-        )
+        sorted_sellers = [
+            (str(mentioned_user_id), {'count': count, 'total_amount': total_amount, 'name': None})
+            for mentioned_user_id, count, total_amount in rows
+        ]
         
         seller_role_id = await self.bot.db.get_config("seller_role")
         seller_role = ctx.guild.get_role(seller_role_id) if seller_role_id else None
@@ -810,9 +751,7 @@ class Vouches(commands.Cog):
         if amount < 0:
             return await ctx.respond("Amount must be a positive number.", ephemeral=True)
         
-        query = f"INSERT INTO vouches (user_id, message, avatar, username) VALUES (?, ?, ?, ?)"
-        await self.bot.db.execute(
-            query,
+        await self.bot.db.add_vouch(
             ctx.author.id,
             f"{message} ({user.mention}; {amount}$)",
             str(ctx.author.avatar.url if ctx.author.avatar else ctx.author.default_avatar.url),
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATA_CACHE_MAX_BYTES = int(os.getenv("DATA_CACHE_MAX_MB", "128")) * 1024 * 1024
+DATA_CACHE_DEFAULT_TTL = float(os.getenv("DATA_CACHE_DEFAULT_TTL", "60"))
+
+
+class DataCache:
+    """
+    Size-bounded LRU cache for upstream API payloads (profiles, players, Mojang lookups).
+    Concurrent get_or_fetch calls for the same key share a single upstream request.
+    """
+    def __init__(self, max_bytes: int = DATA_CACHE_MAX_BYTES, default_ttl: float = DATA_CACHE_DEFAULT_TTL):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._in_flight: dict = {}
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: str, max_age: float = None):
+        """
+        Returns the cached value, or None if it is missing, expired or older
+        than max_age seconds (which lets a caller demand fresher data than the TTL).
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        age = time.monotonic() - entry["stored_at"]
+        if age >= entry["ttl"] or (max_age is not None and age >= max_age):
+            self.stale += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry["value"]
+
+    def set(self, key: str, value, ttl: float = None, size: int = 1):
+        if size > self.max_bytes:
+            return
+
+        self.remove(key)
+        self._entries[key] = {
+            "value": value,
+            "stored_at": time.monotonic(),
+            "ttl": self.default_ttl if ttl is None else ttl,
+            "size": size
+        }
+        self._size += size
+
+        while self._size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted["size"]
+            self.evictions += 1
+
+    def remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._size -= entry["size"]
+
+    async def get_or_fetch(self, key: str, fetcher, ttl: float = None, max_age: float = None, cacheable=None):
+        """
+        Returns the cached value or awaits fetcher() once for every concurrent caller.
+        fetcher must return (value, size_in_bytes). Values for which cacheable(value)
+        is False (e.g. error payloads) are handed to the waiting callers but not stored.
+        """
+        value = self.get(key, max_age)
+        if value is not None:
+            return value
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        async def run():
+            try:
+                value, size = await fetcher()
+                if cacheable is None or cacheable(value):
+                    self.set(key, value, ttl, size)
+                return value
+            finally:
+                self._in_flight.pop(key, None)
+
+        # A separate task keeps the fetch alive for the others if the first caller is cancelled
+        task = asyncio.ensure_future(run())
+        self._in_flight[key] = task
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "in_flight": len(self._in_flight),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
+
+
+data_cache = DataCache()
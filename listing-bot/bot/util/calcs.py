@@ -1,26 +1,57 @@
-from typing import Tuple
+from bisect import bisect_right
+from typing import List, Tuple
+
+import numpy as np
+
+# Cumulative XP needed for each level, index == level
+CATA_XP = (
+    0, 50, 125, 235, 395, 625, 955, 1425, 2095, 3045,
+    4385, 6275, 8940, 12700, 17960, 25340, 35640,
+    50040, 70040, 97640, 135640, 188140, 259640, 356640,
+    488640, 668640, 911640, 1239640, 1684640, 2284640,
+    3084640, 4149640, 5559640, 7459640, 9959640, 13259640,
+    17559640, 23159640, 30359640, 39559640, 51559640, 66559640,
+    85559640, 109559640, 139559640, 177559640, 225559640,
+    285559640, 360559640, 453559640, 569809640
+)
+
+SKILL_XP = (
+    0, 50, 175, 375, 675, 1175, 1925, 2925, 4425, 6425,
+    9925, 14925, 22425, 32425, 47425, 67425, 97425, 147425,
+    222425, 322425, 522425, 822425, 1222425, 1722425, 2322425,
+    3022425, 3822425, 4722425, 5722425, 6822425, 8022425, 9322425,
+    10722425, 12222425, 13822425, 15522425, 17322425, 19222425,
+    21222425, 23322425, 25522425, 27822425, 30222425, 32722425,
+    35322425, 38072425, 40972425, 44072425, 47472425, 51172425,
+    55172425, 59472425, 64072425, 68972425, 74172425, 79672425,
+    85472425, 91572425, 97972425, 104672425, 111672425
+)
+
+_SLAYER_XP_LOW = (0, 5, 15, 200, 1000, 5000, 20000, 100000, 400000, 1000000)
+_SLAYER_XP_HIGH = (0, 10, 30, 250, 1500, 5000, 20000, 100000, 400000, 1000000)
+
+SLAYER_XP = {
+    "revenant": _SLAYER_XP_LOW, "zombie": _SLAYER_XP_LOW,
+    "spider": _SLAYER_XP_LOW, "tarantula": _SLAYER_XP_LOW,
+    "sven": _SLAYER_XP_HIGH, "wolf": _SLAYER_XP_HIGH,
+    "enderman": _SLAYER_XP_HIGH, "voidgloom": _SLAYER_XP_HIGH,
+    "blaze": _SLAYER_XP_HIGH, "demonlord": _SLAYER_XP_HIGH
+}
+
+
+def _level_from_xp(table: tuple, exp, max_level: int):
+    """Fractional level for a cumulative XP table, capped at max_level"""
+    if exp >= table[max_level]:
+        return max_level
+    index = bisect_right(table, exp)
+    if index == 0:
+        return 0.0
+    low = table[index - 1]
+    return (index - 1) + (exp - low) / (table[index] - low)
+
 
 def get_cata_lvl(exp):
-    levels = {
-        '0': 0, '1': 50, '2': 125, '3': 235, '4': 395, '5': 625, '6': 955, '7': 1425, '8': 2095, '9': 3045,
-        '10': 4385, '11': 6275, '12': 8940, '13': 12700, '14': 17960, '15': 25340, '16': 35640,
-        '17': 50040, '18': 70040, '19': 97640, '20': 135640, '21': 188140, '22': 259640, '23': 356640,
-        '24': 488640, '25': 668640, '26': 911640, '27': 1239640, '28': 1684640, '29': 2284640,
-        '30': 3084640, '31': 4149640, '32': 5559640, '33': 7459640, '34': 9959640, '35': 13259640,
-        '36': 17559640, '37': 23159640, '38': 30359640, '39': 39559640, '40': 51559640, '41': 66559640,
-        '42': 85559640, '43': 109559640, '44': 139559640, '45': 177559640, '46': 225559640,
-        '47': 285559640, '48': 360559640, '49': 453559640, '50': 569809640
-    }
-    for level in levels:
-        if exp >= levels["50"]:
-            return 50
-        if levels[level] > exp:
-            lowexp = levels[str(int(level) - 1)]
-            highexp = levels[level]
-            difference = highexp - lowexp
-            extra = exp - lowexp
-            percentage = (extra / difference)
-            return (int(level) - 1) + percentage
+    return _level_from_xp(CATA_XP, exp, 50)
 
 
 SKILL_MAX_LEVELS = {
@@ -59,78 +90,27 @@ SKILL_MAX_LEVELS = {
 
 
 def get_slayer_level(slayer_type, exp):
-    revenant = {"0": 0, "1": 5, "2": 15, "3": 200, "4": 1000,
-                "5": 5000, "6": 20000, "7": 100000, "8": 400000, "9": 1000000}
-    spider = {"0": 0, "1": 5, "2": 15, "3": 200, "4": 1000,
-              "5": 5000, "6": 20000, "7": 100000, "8": 400000, "9": 1000000}
-    sven = {"0": 0, "1": 10, "2": 30, "3": 250, "4": 1500, "5": 5000,
-            "6": 20000, "7": 100000, "8": 400000, "9": 1000000}
-    enderman = {"0": 0, "1": 10, "2": 30, "3": 250, "4": 1500,
-                "5": 5000, "6": 20000, "7": 100000, "8": 400000, "9": 1000000}
-    blaze = {"0": 0, "1": 10, "2": 30, "3": 250, "4": 1500,
-             "5": 5000, "6": 20000, "7": 100000, "8": 400000, "9": 1000000}
-
-    if slayer_type in ["revenant", "zombie"]:
-        levels = revenant
-    elif slayer_type in ["spider", "tarantula"]:
-        levels = spider
-    elif slayer_type in ["sven", "wolf"]:
-        levels = sven
-    elif slayer_type in ["enderman", "voidgloom"]:
-        levels = enderman
-    elif slayer_type in ["blaze", "demonlord"]:
-        levels = blaze
-
-    for level in levels:
-        if exp >= levels["9"]:
-            return 9
-        if levels.get(level) > exp:
-            lowexp = levels[str(int(level) - 1)]
-            highexp = levels.get(level)
-            difference = highexp - lowexp
-            extra = exp - lowexp
-            percentage = (extra / difference)
-            return (int(level) - 1) + percentage
-
-
-skill_levels = {
-    "0": 0, "1": 50, "2": 175, "3": 375, "4": 675, "5": 1175, "6": 1925, "7": 2925, "8": 4425, "9": 6425,
-    "10": 9925, "11": 14925, "12": 22425, "13": 32425, "14": 47425, "15": 67425, "16": 97425, "17": 147425,
-    "18": 222425, "19": 322425, "20": 522425, "21": 822425, "22": 1222425, "23": 1722425, "24": 2322425,
-    "25": 3022425, "26": 3822425, "27": 4722425, "28": 5722425, "29": 6822425, "30": 8022425, "31": 9322425,
-    "32": 10722425, "33": 12222425, "34": 13822425, "35": 15522425, "36": 17322425, "37": 19222425,
-    "38": 21222425, "39": 23322425, "40": 25522425, "41": 27822425, "42": 30222425, "43": 32722425,
-    "44": 35322425, "45": 38072425, "46": 40972425, "47": 44072425, "48": 47472425, "49": 51172425,
-    "50": 55172425, "51": 59472425, "52": 64072425, "53": 68972425, "54": 74172425, "55": 79672425,
-    "56": 85472425, "57": 91572425, "58": 97972425, "59": 104672425, "60": 111672425
+    return _level_from_xp(SLAYER_XP[slayer_type], exp, 9)
 
-}
+
+skill_levels = {str(level): xp for level, xp in enumerate(SKILL_XP)}
 
 
 def get_skill_lvl(skill_type, exp):
-    levels = {
-        "0": 0, "1": 50, "2": 175, "3": 375, "4": 675, "5": 1175, "6": 1925, "7": 2925, "8": 4425, "9": 6425,
-        "10": 9925, "11": 14925, "12": 22425, "13": 32425, "14": 47425, "15": 67425, "16": 97425, "17": 147425,
-        "18": 222425, "19": 322425, "20": 522425, "21": 822425, "22": 1222425, "23": 1722425, "24": 2322425,
-        "25": 3022425, "26": 3822425, "27": 4722425, "28": 5722425, "29": 6822425, "30": 8022425, "31": 9322425,
-        "32": 10722425, "33": 12222425, "34": 13822425, "35": 15522425, "36": 17322425, "37": 19222425,
-        "38": 21222425, "39": 23322425, "40": 25522425, "41": 27822425, "42": 30222425, "43": 32722425,
-        "44": 35322425, "45": 38072425, "46": 40972425, "47": 44072425, "48": 47472425, "49": 51172425,
-        "50": 55172425, "51": 59472425, "52": 64072425, "53": 68972425, "54": 74172425, "55": 79672425,
-        "56": 85472425, "57": 91572425, "58": 97972425, "59": 104672425, "60": 111672425
-    }
-    for level in levels:
-        if exp >= levels[str(SKILL_MAX_LEVELS[skill_type]["maxLevel"])]:
-            return SKILL_MAX_LEVELS[skill_type]["maxLevel"]
-        if levels[level] > exp:
-            lowexp = levels[str(int(level) - 1)]
-            highexp = levels[level]
-            difference = highexp - lowexp
-            extra = exp - lowexp
-            percentage = (extra / difference)
-            return (int(level) - 1) + percentage
+    return _level_from_xp(SKILL_XP, exp, SKILL_MAX_LEVELS[skill_type]["maxLevel"])
         
 
+# (min level, base value, quadratic scaling)
+CATA_VALUE_TIERS = (
+    (0, 0.0, 0.015),
+    (20, 3.0, 0.12),
+    (24, 6.0, 0.2),
+    (30, 10.0, 0.35),
+    (40, 35.0, 1.5),
+    (45, 75.0, 5.0),
+    (49, 100.0, 0.0)
+)
+
 def catacombs_to_usd(data: dict) -> Tuple[float, float]:
     dungeon_data = data.get("dungeons", {})
     if not dungeon_data:
@@ -155,16 +135,7 @@ def catacombs_to_usd(data: dict) -> Tuple[float, float]:
     cata_level = get_cata_lvl(cata_xp)
     
     max_price = 100.0
-    
-    value_tiers = [
-        (0, 0.0, 0.015),
-        (20, 3.0, 0.12),
-        (24, 6.0, 0.2),
-        (30, 10.0, 0.35),
-        (40, 35.0, 1.5),
-        (45, 75.0, 5.0),
-        (49, 100.0, 0.0)
-    ]
+    value_tiers = CATA_VALUE_TIERS
     
     tier_index = 0
     for i, (tier_level, _, _) in enumerate(value_tiers):
@@ -193,41 +164,43 @@ def catacombs_to_usd(data: dict) -> Tuple[float, float]:
     return value, value / 1.8
 
 
+SLAYER_VALUE_RATES = {
+    "zombie": {
+        "tiers": [100000, 3000000, float('inf')],
+        "rates": [0.00001, 0.000008, 0.000007],
+        "max_value": 0.005,
+        "multiplier": 1.2
+    },
+    "spider": {
+        "tiers": [100000, 3000000, float('inf')],
+        "rates": [0.00001, 0.000008, 0.000007],
+        "max_value": 0.004,
+        "multiplier": 1.3
+    },
+    "wolf": {
+        "tiers": [100000, 3000000, float('inf')],
+        "rates": [0.000014, 0.000012, 0.00001],
+        "max_value": 0.008,
+        "multiplier": 1.35
+    },
+    "enderman": {
+        "tiers": [100000, 3000000, float('inf')],
+        "rates": [0.000025, 0.000022, 0.00002],
+        "max_value": 0.018,
+        "multiplier": 1.0
+    },
+    "blaze": {
+        "tiers": [20000, 100000, 1000000, float('inf')],
+        "rates": [0.000033, 0.000029, 0.00002, 0.0],
+        "max_value": 0.018,
+        "multiplier": 1.0
+    }
+}
+
 def slayer_to_usd(data: dict) -> Tuple[float, float]:
     slayer_data = data.get("slayer", {})
     
-    rates = {
-        "zombie": {
-            "tiers": [100000, 3000000, float('inf')],
-            "rates": [0.00001, 0.000008, 0.000007],
-            "max_value": 0.005,
-            "multiplier": 1.2
-        },
-        "spider": {
-            "tiers": [100000, 3000000, float('inf')],
-            "rates": [0.00001, 0.000008, 0.000007],
-            "max_value": 0.004,
-            "multiplier": 1.3
-        },
-        "wolf": {
-            "tiers": [100000, 3000000, float('inf')],
-            "rates": [0.000014, 0.000012, 0.00001],
-            "max_value": 0.008,
-            "multiplier": 1.35
-        },
-        "enderman": {
-            "tiers": [100000, 3000000, float('inf')],
-            "rates": [0.000025, 0.000022, 0.00002],
-            "max_value": 0.018,
-            "multiplier": 1.0
-        },
-        "blaze": {
-            "tiers": [20000, 100000, 1000000, float('inf')],
-            "rates": [0.000033, 0.000029, 0.00002, 0.0],
-            "max_value": 0.018,
-            "multiplier": 1.0
-        }
-    }
+    rates = SLAYER_VALUE_RATES
     
     total_value = 0.0
     
@@ -281,84 +254,85 @@ def slayer_to_usd(data: dict) -> Tuple[float, float]:
     
     return total_value, total_value / 1.8
 
-def networth_to_usd(data: dict) -> Tuple[float, float]:
-    coin_multiplier = 4e-8
-
-    def process_item(item: dict) -> float:
-        soulbound = item.get("soulbound", False)
-
-        cosmetic = item.get("cosmetic", False)
-        value = item.get("price", 0.0)
-        calculation = item.get("calculation", [])
-
-        def calc_multiplier(value: float) -> float:
-            if value < 1e7:
-                return 0.5
-                
-            if value >= 1e10:
-                return 0.9
-
-            t = (value - 1e7) / (1e10 - 1e7)
-            return 0.5 + (0.9 - 0.5) * (t**0.9)
-
-        multiplier = calc_multiplier(value)
-        if soulbound:
-            multiplier *= 0.65
-
-        item_usd_value = value * multiplier * coin_multiplier
-        
-        if cosmetic and item_usd_value > 0 and calculation:
-            cosmetic_deduction = (item_usd_value / 1e6) * 0.01
-            item_usd_value = max(0, item_usd_value - cosmetic_deduction)
-
-        elif cosmetic and item_usd_value > 0:
-            cosmetic_deduction = (item_usd_value / 1e6) * 0.03
-            item_usd_value = max(0, item_usd_value - cosmetic_deduction)
-
-        return item_usd_value
-
-    total_value = 0
+NETWORTH_COIN_MULTIPLIER = 4e-8
+
+def networth_to_usd_batch(profiles: List[dict]) -> List[Tuple[float, float]]:
+    """
+    Networth value of many profiles at once. Every item of every profile is
+    flattened into one set of arrays so the per-item multiplier curve, the
+    soulbound discount and the cosmetic deduction run as numpy operations.
+    """
+    coin_multiplier = NETWORTH_COIN_MULTIPLIER
+
+    prices = []
+    soulbound = []
+    cosmetic = []
+    calculated = []
+    owners = []
+    liquid = np.zeros(len(profiles))
+
+    for index, data in enumerate(profiles):
+        networth_data = data.get("networth", {})
+        liquid[index] = networth_data.get("purse", 0) + networth_data.get("bank", 0) + networth_data.get("personalBank", 0)
+
+        for item_type_data in networth_data.get("types", {}).values():
+            for item in item_type_data.get("items", []):
+                if isinstance(item, dict):
+                    prices.append(item.get("price", 0.0))
+                    soulbound.append(bool(item.get("soulbound", False)))
+                    cosmetic.append(bool(item.get("cosmetic", False)))
+                    calculated.append(bool(item.get("calculation", [])))
+                    owners.append(index)
+
+    price = np.asarray(prices, dtype=np.float64)
+
+    # 0.5 below 10M coins, 0.9 from 10B, a t^0.9 curve in between
+    t = np.clip((price - 1e7) / (1e10 - 1e7), 0.0, 1.0)
+    multiplier = np.where(price < 1e7, 0.5, np.where(price >= 1e10, 0.9, 0.5 + (0.9 - 0.5) * t ** 0.9))
+    multiplier = np.where(np.asarray(soulbound, dtype=bool), multiplier * 0.65, multiplier)
+
+    item_usd_value = price * multiplier * coin_multiplier
+
+    cosmetic_items = np.asarray(cosmetic, dtype=bool) & (item_usd_value > 0)
+    deduction_rate = np.where(np.asarray(calculated, dtype=bool), 0.01, 0.03)
+    item_usd_value = np.where(
+        cosmetic_items,
+        np.maximum(0, item_usd_value - (item_usd_value / 1e6) * deduction_rate),
+        item_usd_value
+    )
+
+    item_totals = np.bincount(np.asarray(owners, dtype=np.intp), weights=item_usd_value, minlength=len(profiles))
+    totals = liquid * coin_multiplier + item_totals
+
+    return [(float(total), max(0, float(total) / 1.8)) for total in totals]
 
-    networth_data = data.get("networth", {})
-
-    liquid_networth = networth_data.get("purse", 0) + networth_data.get("bank", 0) + networth_data.get("personalBank", 0)
-    total_value += liquid_networth * coin_multiplier
-
-    item_types = networth_data.get("types", {})
-    for item_type in item_types:
-        item_type_data = item_types[item_type]
-        items = item_type_data.get("items", [])
-        for item in items:
-            if isinstance(item, dict):
-                value = process_item(item)
-                total_value += value
-    
-    lowball_value = max(0, total_value / 1.8)
-
-    return total_value, lowball_value
+def networth_to_usd(data: dict) -> Tuple[float, float]:
+    return networth_to_usd_batch([data])[0]
+
+SKILL_VALUE_RATES = {
+    'farming': 18 / 111672425,
+    'foraging': 24 / 55172425,
+    'fishing': 22 / 55172425,
+    'alchemy': 2 / 55172425,
+    'enchanting': 0.5 / 111672425,
+    'combat': 14 / 111672425,
+    'mining': 12 / 111672425,
+    'taming': 0.5 / 55172425
+}
 
 def skills_to_usd(data: dict) -> Tuple[float, float]:
     skills_data: dict = data.get("skills", {})
     if not skills_data:
         return 0.0, 0.0
     
-    conversion_rates = {
-        'farming': 18 / 111672425,
-        'foraging': 24 / 55172425,
-        'fishing': 22 / 55172425,
-        'alchemy': 2 / 55172425,
-        'enchanting': 0.5 / 111672425,
-        'combat': 14 / 111672425,
-        'mining': 12 / 111672425,
-        'taming': 0.5 / 55172425
-    }
+    conversion_rates = SKILL_VALUE_RATES
     
     total_value = 0.0
     skill_values = {}
     
     def get_max_xp(skill):
         max_level = SKILL_MAX_LEVELS.get(skill, {}).get("maxLevel", 50)
-        return int(skill_levels[str(max_level)])
+        return SKILL_XP[max_level]
     
     for skill, skill_info in skills_data.items():
         if skill not in conversion_rates:
@@ -472,27 +446,40 @@ def crimson_to_usd(data: dict) -> Tuple[float, float]:
 
     return total_value, total_value / 1.8
 
+VALUE_COMPONENTS = (
+    ("catacombs", catacombs_to_usd),
+    ("slayer", slayer_to_usd),
+    ("networth", None),
+    ("skills", skills_to_usd),
+    ("mining", mining_to_usd),
+    ("farming", farming_to_usd),
+    ("crimson", crimson_to_usd)
+)
+
+def gather_values_batch(profiles: List[dict]) -> List[Tuple[dict, dict]]:
+    """
+    Prices many profiles in one pass.
+    Returns: [(value, lowball_value), ...] in the same order as profiles
+    """
+    networth_values = networth_to_usd_batch(profiles)
+
+    results = []
+    for data, networth in zip(profiles, networth_values):
+        value = {}
+        lowball_value = {}
+        for name, calculate in VALUE_COMPONENTS:
+            value[name], lowball_value[name] = networth if calculate is None else calculate(data)
+        results.append((value, lowball_value))
+    return results
+
+def gather_values(data: dict) -> Tuple[dict, dict]:
+    return gather_values_batch([data])[0]
+
 def gather_lowball_value(data: dict) -> dict:
-    return {
-        "catacombs": catacombs_to_usd(data)[1],
-        "slayer": slayer_to_usd(data)[1],
-        "networth": networth_to_usd(data)[1],
-        "skills": skills_to_usd(data)[1],
-        "mining": mining_to_usd(data)[1],
-        "farming": farming_to_usd(data)[1],
-        "crimson": crimson_to_usd(data)[1]
-    }
+    return gather_values(data)[1]
 
 def gather_value(data: dict) -> dict:
-    return {
-        "catacombs": catacombs_to_usd(data)[0],
-        "slayer": slayer_to_usd(data)[0],
-        "networth": networth_to_usd(data)[0],
-        "skills": skills_to_usd(data)[0],
-        "mining": mining_to_usd(data)[0],
-        "farming": farming_to_usd(data)[0],
-        "crimson": crimson_to_usd(data)[0]
-    }
+    return gather_values(data)[0]
 
 async def calculate_coin_price(type: str, bot, amount: int):
     base_key = f"coin_price_{type}"
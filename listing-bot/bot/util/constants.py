@@ -7,6 +7,8 @@ from dotenv import load_dotenv
 
 from discord.ext import commands
 
+from bot.util import registry
+
 load_dotenv()
 
 BOT_SERVICE_HOST = os.getenv("BOT_SERVICE_HOST", "127.0.0.1")
@@ -16,11 +18,8 @@ color_codes = ["§0", "§1", "§2", "§3", "§4", "§5", "§6", "§7", "§8", "
 bot_name = os.path.basename(os.getcwd())
 
 try:
-    with open("../parent_api/ports.json", "r") as f:
-        ports: dict = json.load(f)
-
-    port = ports.get(bot_name)
-except FileNotFoundError:
+    port = registry.get_port(bot_name) or 3080
+except Exception:
     port = 3080
 
 auth_config_options = {
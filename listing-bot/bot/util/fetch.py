@@ -2,7 +2,9 @@ from typing import Tuple, Dict
 from .errors import ApiError, MojangError
 from discord import Webhook
 from .constants import api_key
+from .cache import data_cache
 import aiohttp
+import json
 import requests
 import os
 from dotenv import load_dotenv
@@ -14,6 +16,12 @@ PARENT_API_PORT = os.getenv("PARENT_API_PORT", "7000")
 SKYBLOCK_API_HOST = os.getenv("SKYBLOCK_API_HOST", "127.0.0.1")
 SKYBLOCK_API_PORT = os.getenv("SKYBLOCK_API_PORT", "3002")
 
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "120"))
+PLAYER_CACHE_TTL = float(os.getenv("PLAYER_CACHE_TTL", "120"))
+MOJANG_CACHE_TTL = float(os.getenv("MOJANG_CACHE_TTL", "3600"))
+# "Update Info" buttons accept profile data at most this old
+PROFILE_REFRESH_MAX_AGE = float(os.getenv("PROFILE_REFRESH_MAX_AGE", "15"))
+
 def handle_selection(selection):
     """
     Returns the cute name of the selected profile.
@@ -32,12 +40,17 @@ async def fetch_mojang_api(session: aiohttp.ClientSession, username):
     async def fetch_data(url):
         async with session.get(url) as response:
             try:
-                return await response.json(), response.status
+                return (await response.json(), response.status), 256
             except:
-                return {}, response.status
+                return ({}, response.status), 256
 
     url = f"https://mowojang.matdoes.dev/{username.replace('-', '')}"
-    data, status = await fetch_data(url)
+    data, status = await data_cache.get_or_fetch(
+        f"mojang:{username.replace('-', '').lower()}",
+        lambda: fetch_data(url),
+        ttl=MOJANG_CACHE_TTL,
+        cacheable=lambda result: result[1] == 200
+    )
     if status == 200:
         return {
             "name": data.get("name", "Invalid Username."),
@@ -58,7 +71,7 @@ def validate_uuid(uuid: str) -> bool:
     except ValueError:
         return False
     
-async def fetch_profile_data(session, uuid, bot, profile=None, allow_error_handler=True) -> Tuple[Dict, str]:
+async def fetch_profile_data(session, uuid, bot, profile=None, allow_error_handler=True, max_age: float = None) -> Tuple[Dict, str]:
 
     if not validate_uuid(uuid) and len(uuid) > 16:
         if allow_error_handler:
@@ -79,15 +92,28 @@ async def fetch_profile_data(session, uuid, bot, profile=None, allow_error_handl
                 return None, None
         uuid = mojang_data[0]["id"]
 
-    try:
-        await session.post(f"http://{PARENT_API_HOST}:{PARENT_API_PORT}/live/data-fetch", json={"uuid": uuid})
-    except Exception as e:
-        pass
+    selection = handle_selection(profile) or ''
+    url = f"http://{SKYBLOCK_API_HOST}:{SKYBLOCK_API_PORT}/v1/{word}/{uuid}/{selection}?key=API_KEY"
 
-    url = f"http://{SKYBLOCK_API_HOST}:{SKYBLOCK_API_PORT}/v1/{word}/{uuid}/{handle_selection(profile) or ''}?key=API_KEY"
-    async with session.get(url) as resp:
-        profile_data = await resp.json()
-        data = profile_data.get("data", {})
+    async def fetch():
+        try:
+            await session.post(f"http://{PARENT_API_HOST}:{PARENT_API_PORT}/live/data-fetch", json={"uuid": uuid})
+        except Exception as e:
+            pass
+
+        async with session.get(url) as resp:
+            raw = await resp.read()
+        return json.loads(raw), len(raw)
+
+    # Dropdowns, buttons and /value for the same account share one upstream fetch
+    profile_data = await data_cache.get_or_fetch(
+        f"profile:{uuid}:{word}:{selection.lower()}",
+        fetch,
+        ttl=PROFILE_CACHE_TTL,
+        max_age=max_age,
+        cacheable=lambda payload: payload.get("status") == 200
+    )
+    data = profile_data.get("data", {})
 
     if profile_data.get("status") != 200:
         if allow_error_handler:
@@ -98,11 +124,8 @@ async def fetch_profile_data(session, uuid, bot, profile=None, allow_error_handl
     return data, data.get("name")
 
 async def fetch_raw_hypixel_stats(self, uuid):
-    async with aiohttp.ClientSession() as session:
-        cached_data = self.bot.get_cached_data(f"player:{uuid}")
-        if cached_data:
-            data = cached_data
-        else:
+    async def fetch():
+        async with aiohttp.ClientSession() as session:
             # Log the data fetch to the new endpoint with just the UUID
             try:
                 await session.post(f"http://{PARENT_API_HOST}:{PARENT_API_PORT}/live/data-fetch", json={"uuid": uuid})
@@ -111,10 +134,15 @@ async def fetch_raw_hypixel_stats(self, uuid):
                 
             url = f"https://api.hypixel.net/v2/player?key={api_key}&uuid="+uuid
             async with session.get(url) as r:
-                data: dict = await r.json()
-                self.bot.cache_data(f"player:{uuid}", data)
-
-    return data
+                raw = await r.read()
+        return json.loads(raw), len(raw)
+
+    return await data_cache.get_or_fetch(
+        f"player:{uuid}",
+        fetch,
+        ttl=PLAYER_CACHE_TTL,
+        cacheable=lambda data: data.get("success") is True
+    )
 
 class MojangObject:
     def __init__(self, _input):
@@ -1,4 +1,5 @@
 from bot.bot import Bot
+from bot.util import role_pool
 import discord
 
 def get_role_config_name(ticket_type: str):
@@ -45,26 +46,14 @@ async def get_default_overwrites(bot: Bot, guild_id: int, user_id: int = None, t
     seller_role = guild.get_role(seller_role) if seller_role else None
     regular_role = guild.get_role(regular_role) if regular_role else None
 
-    # Find or create a role for this ticket (normalize boolean comparisons)
-    if not role_id_overwrite:
-        # Try multiple boolean representations for backward compatibility
-        available_role = await bot.db.fetchone("SELECT * FROM roles WHERE used = ? OR used = ? OR used = ?", 0, "0", "False")
-    else:
-        available_role = await bot.db.fetchone("SELECT * FROM roles WHERE role_id=?", role_id_overwrite)
-
-    if available_role:
-        # Mark role as used (use consistent boolean representation)
-        await bot.db.execute("UPDATE roles SET used = ? WHERE role_id = ?", 1, available_role[0])
-        role = guild.get_role(available_role[0])
-        if not role:
-            role_name = "𝔟𝔬𝔱𝔰.𝔫𝔬𝔢𝔪𝔱.𝔡𝔢𝔳 | 𝔪𝔞𝔡𝔢 𝔟𝔶 𝔫𝔬𝔪"
-            role = await guild.create_role(name=role_name, reason="Ticket System")
-            await bot.db.execute("UPDATE roles SET role_id = ? WHERE role_id = ?", role.id, available_role[0])
-
-    else:
-        role_name = "𝔟𝔬𝔱𝔰.𝔫𝔬𝔢𝔪𝔱.𝔡𝔢𝔳 | 𝔪𝔞𝔡𝔢 𝔟𝔶 𝔫𝔬𝔪"
-        role = await guild.create_role(name=role_name, reason="Ticket System")
-        await bot.db.execute("INSERT INTO roles (role_id, used) VALUES (?, ?)", role.id, 1)
+    # Claim a free role from the pool for this ticket
+    role = None
+    if role_id_overwrite:
+        role = guild.get_role(role_id_overwrite)
+        if role:
+            await role_pool.mark_role_used(bot, role.id)
+    if not role:
+        role = await role_pool.claim_role(bot, guild)
 
     overwrites = {
         guild.default_role: discord.PermissionOverwrite(read_messages=False, view_channel=False),
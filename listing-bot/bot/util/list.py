@@ -1,7 +1,7 @@
 import discord
 import aiohttp
 from bot.util.selector import handle_selection
-from bot.util.number import get_available_number
+from bot.util.number import reserves_number
 from bot.util.fetch import fetch_profile_data, fetch_mojang_api
 from bot.util.listing_objects.account import Account
 from bot.util.listing_objects.profile import Profile
@@ -14,14 +14,101 @@ from bot.bot import Bot
 from bot.util.calcs import calc_skill_avg
 from numerize import numerize
 
-
+ACCOUNT_STATS_INSERT = """
+    INSERT INTO account_stats 
+    (
+        uuid, skill_average, catacombs_level, 
+        zombie_slayer_level, spider_slayer_level, 
+        wolf_slayer_level, enderman_slayer_level, 
+        blaze_slayer_level, vampire_slayer_level, 
+        skyblock_level, total_networth, 
+        soulbound_networth, liquid_networth, 
+        heart_of_the_mountain_level, 
+        mithril_powder, gemstone_powder, glaciate_powder
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+PROFILE_STATS_INSERT = "INSERT INTO profile_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+def account_stats_row(uuid: str, profile_data: dict) -> tuple:
+    """
+    The account_stats row for accounts and alts, in ACCOUNT_STATS_INSERT order.
+    """
+    skill_data = profile_data.get("skills", {})
+
+    dungeons = profile_data.get("dungeons", {})
+    if dungeons is None:
+        dungeons = {}        
+    catacombs = dungeons.get("catacombs", {})
+    catacombs_skill = catacombs.get("skill", {})
+
+    slayer_data = profile_data.get("slayer", {})
+    zombie = slayer_data.get("zombie", {})
+    spider = slayer_data.get("spider", {})
+    wolf = slayer_data.get("wolf", {})
+    enderman = slayer_data.get("enderman", {})
+    blaze = slayer_data.get("blaze", {})
+    vampire = slayer_data.get("vampire", {})
+
+    networth_data = profile_data.get("networth", {})
+
+    mining_stats = profile_data.get("mining", {})
+    hotm = mining_stats.get("hotM_tree", {})
+    mithril_powder = mining_stats.get("mithril_powder", {})
+    gemstone_powder = mining_stats.get("gemstone_powder", {})
+    glacite_powder = mining_stats.get("glacite_powder", {})
+
+    return (
+        uuid,
+        calc_skill_avg([v.get("level", 0) for k, v in skill_data.items() if not k == "carpentry" and not k == "runecrafting" and not k == "social"]),
+        catacombs_skill.get("level", 0),
+        zombie.get("level", 0),
+        spider.get("level", 0),
+        wolf.get("level", 0),
+        enderman.get("level", 0),
+        blaze.get("level", 0),
+        vampire.get("level", 0),
+        profile_data.get('sbLevel'),
+        numerize.numerize(networth_data.get("networth", 0)),
+        numerize.numerize(networth_data.get("networth", 0)-networth_data.get("unsoulboundNetworth", 0)),
+        numerize.numerize(networth_data.get("purse", 0) + networth_data.get("bank", 0) + networth_data.get("personalBank", 0)),
+        hotm.get("level", 0),
+        numerize.numerize(mithril_powder.get("total", 0)),
+        numerize.numerize(gemstone_powder.get("total", 0)),
+        numerize.numerize(glacite_powder.get("total", 0)),
+    )
+
+def profile_stats_row(uuid: str, profile: str, profile_data: dict) -> tuple:
+    """
+    The profile_stats row for a profile listing, in PROFILE_STATS_INSERT order.
+    """
+    networth_data = profile_data.get("networth", {})
+    minion_data = profile_data.get("minions", {})
+    slots = minion_data.get("minionSlots", 0)
+    bonus = minion_data.get("bonusSlots", 0)
+
+    collection_data = profile_data.get("collections", [])
+    maxed_collections = len([c for c in collection_data if c["tier"] == c["maxTiers"]])
+    unlocked_collections = len([c for c in collection_data if c["amount"] > 0])
+
+    return (
+        uuid,
+        profile,
+        numerize.numerize(networth_data.get("networth", 0)),
+        numerize.numerize(networth_data.get("networth", 0)-networth_data.get("unsoulboundNetworth", 0)),
+        numerize.numerize(networth_data.get("purse", 0) + networth_data.get("bank", 0) + networth_data.get("personalBank", 0)),
+        slots,
+        bonus,
+        maxed_collections,
+        unlocked_collections
+    )
+
+
+@reserves_number("accounts")
 async def list_account(bot: Bot, username: str, price: int, payment_methods: str, ping: bool, additional_information: str, show_ign: bool, profile: str, number: int, ctx, listed_by) -> discord.Embed:
     if profile:
         profile = handle_selection(profile)
 
-    if not number:
-        number = await get_available_number(bot, "accounts")
-
     response_embed = discord.Embed(color=discord.Color.red())
 
     async with aiohttp.ClientSession() as session:
@@ -76,69 +163,10 @@ async def list_account(bot: Bot, username: str, price: int, payment_methods: str
         response_embed.title = "Account Listed"
         response_embed.description = f"Your account has been listed in {channel.mention}!"
 
-        skill_data = profile_data.get("skills", {})
-
-        dungeons = profile_data.get("dungeons", {})
-        if dungeons is None:
-            dungeons = {}        
-        catacombs = dungeons.get("catacombs", {})
-        catacombs_skill = catacombs.get("skill", {})
-
-        slayer_data = profile_data.get("slayer", {})
-        zombie = slayer_data.get("zombie", {})
-        spider = slayer_data.get("spider", {})
-        wolf = slayer_data.get("wolf", {})
-        enderman = slayer_data.get("enderman", {})
-        blaze = slayer_data.get("blaze", {})
-        vampire = slayer_data.get("vampire", {})
-
-        networth_data = profile_data.get("networth", {})
-
-        mining_stats = profile_data.get("mining", {})
-        hotm = mining_stats.get("hotM_tree", {})
-        mithril_powder = mining_stats.get("mithril_powder", {})
-        gemstone_powder = mining_stats.get("gemstone_powder", {})
-        glacite_powder = mining_stats.get("glacite_powder", {})
-
-        data = (
-            uuid,
-            calc_skill_avg([v.get("level", 0) for k, v in skill_data.items() if not k == "carpentry" and not k == "runecrafting" and not k == "social"]),
-            catacombs_skill.get("level", 0),
-            zombie.get("level", 0),
-            spider.get("level", 0),
-            wolf.get("level", 0),
-            enderman.get("level", 0),
-            blaze.get("level", 0),
-            vampire.get("level", 0),
-            profile_data.get('sbLevel'),
-            numerize.numerize(networth_data.get("networth", 0)),
-            numerize.numerize(networth_data.get("networth", 0)-networth_data.get("unsoulboundNetworth", 0)),
-            numerize.numerize(networth_data.get("purse", 0) + networth_data.get("bank", 0) + networth_data.get("personalBank", 0)),
-            hotm.get("level", 0),
-            numerize.numerize(mithril_powder.get("total", 0)),
-            numerize.numerize(gemstone_powder.get("total", 0)),
-            numerize.numerize(glacite_powder.get("total", 0)),
-        )
         await bot.db.execute(
             "DELETE FROM account_stats WHERE uuid = ?", uuid
         )
-        await bot.db.execute(
-            """
-            INSERT INTO account_stats 
-            (
-                uuid, skill_average, catacombs_level, 
-                zombie_slayer_level, spider_slayer_level, 
-                wolf_slayer_level, enderman_slayer_level, 
-                blaze_slayer_level, vampire_slayer_level, 
-                skyblock_level, total_networth, 
-                soulbound_networth, liquid_networth, 
-                heart_of_the_mountain_level, 
-                mithril_powder, gemstone_powder, glaciate_powder
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            *data
-        )
+        await bot.db.execute(ACCOUNT_STATS_INSERT, *account_stats_row(uuid, profile_data))
 
         if ping:
             ping_role = await bot.db.get_config("ping_role")
@@ -163,13 +191,11 @@ async def list_account(bot: Bot, username: str, price: int, payment_methods: str
 
     return response_embed
 
+@reserves_number("profiles")
 async def list_profile(bot: Bot, username: str, price: int, payment_methods: str, ping: bool, additional_information: str, show_ign: bool, profile: str, number: int, listed_by) -> discord.Embed:
     if profile:
         profile = handle_selection(profile)
 
-    if not number:
-        number = await get_available_number(bot, "profiles")
-
     response_embed = discord.Embed(color=discord.Color.red())
 
     async with aiohttp.ClientSession() as session:
@@ -227,33 +253,10 @@ async def list_profile(bot: Bot, username: str, price: int, payment_methods: str
         response_embed.title = "Profile Listed"
         response_embed.description = f"Your profile has been listed in {channel.mention}!"
 
-        networth_data = profile_data.get("networth", {})
-        minion_data = profile_data.get("minions", {})
-        slots = minion_data.get("minionSlots", 0)
-        bonus = minion_data.get("bonusSlots", 0)
-
-        collection_data = profile_data.get("collections", [])
-        maxed_collections = len([c for c in collection_data if c["tier"] == c["maxTiers"]])
-        unlocked_collections = len([c for c in collection_data if c["amount"] > 0])
-
-        data = (
-            uuid,
-            profile,
-            numerize.numerize(networth_data.get("networth", 0)),
-            numerize.numerize(networth_data.get("networth", 0)-networth_data.get("unsoulboundNetworth", 0)),
-            numerize.numerize(networth_data.get("purse", 0) + networth_data.get("bank", 0) + networth_data.get("personalBank", 0)),
-            slots,
-            bonus,
-            maxed_collections,
-            unlocked_collections
-        )
         await bot.db.execute(
             "DELETE FROM profile_stats WHERE uuid = ? AND profile = ?", uuid, profile
         )
-        await bot.db.execute(
-            "INSERT INTO profile_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            *data
-        )
+        await bot.db.execute(PROFILE_STATS_INSERT, *profile_stats_row(uuid, profile, profile_data))
 
         if ping:
             ping_role = await bot.db.get_config("ping_role")
@@ -278,13 +281,11 @@ async def list_profile(bot: Bot, username: str, price: int, payment_methods: str
 
     return response_embed
 
+@reserves_number("alts")
 async def list_alt(bot: Bot, username: str, price: int, payment_methods: str, farming: bool, mining: bool, ping: bool, additional_information: str, show_ign: bool, profile: str, number: int, listed_by) -> discord.Embed:
     if profile:
         profile = handle_selection(profile)
 
-    if not number:
-        number = await get_available_number(bot, "alts")
-
     response_embed = discord.Embed(color=discord.Color.red())
 
     async with aiohttp.ClientSession() as session:
@@ -342,69 +343,10 @@ async def list_alt(bot: Bot, username: str, price: int, payment_methods: str, fa
         response_embed.title = "Alt Account Listed"
         response_embed.description = f"Your Alt Account has been listed in {channel.mention}!"
 
-        skill_data = profile_data.get("skills", {})
-
-        dungeons = profile_data.get("dungeons", {})
-        if dungeons is None:
-            dungeons = {}        
-        catacombs = dungeons.get("catacombs", {})
-        catacombs_skill = catacombs.get("skill", {})
-
-        slayer_data = profile_data.get("slayer", {})
-        zombie = slayer_data.get("zombie", {})
-        spider = slayer_data.get("spider", {})
-        wolf = slayer_data.get("wolf", {})
-        enderman = slayer_data.get("enderman", {})
-        blaze = slayer_data.get("blaze", {})
-        vampire = slayer_data.get("vampire", {})
-
-        networth_data = profile_data.get("networth", {})
-
-        mining_stats = profile_data.get("mining", {})
-        hotm = mining_stats.get("hotM_tree", {})
-        mithril_powder = mining_stats.get("mithril_powder", {})
-        gemstone_powder = mining_stats.get("gemstone_powder", {})
-        glacite_powder = mining_stats.get("glacite_powder", {})
-
-        data = (
-            uuid,
-            calc_skill_avg([v.get("level", 0) for k, v in skill_data.items() if not k == "carpentry" and not k == "runecrafting" and not k == "social"]),
-            catacombs_skill.get("level", 0),
-            zombie.get("level", 0),
-            spider.get("level", 0),
-            wolf.get("level", 0),
-            enderman.get("level", 0),
-            blaze.get("level", 0),
-            vampire.get("level", 0),
-            profile_data.get('sbLevel'),
-            numerize.numerize(networth_data.get("networth", 0)),
-            numerize.numerize(networth_data.get("networth", 0)-networth_data.get("unsoulboundNetworth", 0)),
-            numerize.numerize(networth_data.get("purse", 0) + networth_data.get("bank", 0) + networth_data.get("personalBank", 0)),
-            hotm.get("level", 0),
-            numerize.numerize(mithril_powder.get("total", 0)),
-            numerize.numerize(gemstone_powder.get("total", 0)),
-            numerize.numerize(glacite_powder.get("total", 0)),
-        )
         await bot.db.execute(
             "DELETE FROM account_stats WHERE uuid = ?", uuid
         )
-        await bot.db.execute(
-            """
-            INSERT INTO account_stats 
-            (
-                uuid, skill_average, catacombs_level, 
-                zombie_slayer_level, spider_slayer_level, 
-                wolf_slayer_level, enderman_slayer_level, 
-                blaze_slayer_level, vampire_slayer_level, 
-                skyblock_level, total_networth, 
-                soulbound_networth, liquid_networth, 
-                heart_of_the_mountain_level, 
-                mithril_powder, gemstone_powder, glaciate_powder
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            *data
-        )
+        await bot.db.execute(ACCOUNT_STATS_INSERT, *account_stats_row(uuid, profile_data))
 
         if ping:
             ping_role = await bot.db.get_config("ping_role")
@@ -8,8 +8,9 @@ from .ticket import OpenedTicket
 from bot.util.ticket import get_default_overwrites
 from bot.util.listing_objects.dropdown import Dropdown
 
-from bot.util.fetch import fetch_profile_data
+from bot.util.fetch import fetch_profile_data, PROFILE_REFRESH_MAX_AGE
 from bot.util.convert_payment_methods import convert_payment_methods
+from bot.util.refresh import store_listing_hash
 
 
 class Account(View):
@@ -134,9 +135,10 @@ class Account(View):
         account = AccountObject(*account)
         await interaction.response.defer(ephemeral=True)
 
-        profile_data, profile = await fetch_profile_data(self.bot.session, account.uuid, self.bot, account.profile)
+        profile_data, profile = await fetch_profile_data(self.bot.session, account.uuid, self.bot, account.profile, max_age=PROFILE_REFRESH_MAX_AGE)
         embed = create_embed_account_listing(profile_data, profile, account.uuid, account.username, account.price, account.additional_info, convert_payment_methods(self.bot, account.payment_methods), interaction, self.bot, f"<@{account.listed_by}>")
         await interaction.message.edit(embed=embed)
+        await store_listing_hash(self.bot, "accounts", account.number, [embed])
 
     @button(
         label="Unlist",
@@ -5,6 +5,7 @@ from bot.util.helper.account import AccountObject
 from bot.util.helper.profile import ProfileObject
 from bot.util.helper.macro_alt import AltObject
 from bot.util.fetch import fetch_profile_data
+from bot.util.refresh import mark_listing_viewed
 from bot.util.transform import abbreviate, get_progress_bar
 from bot.util.constants import (
     class_emoji_mappings, slayer_emoji_mappings, 
@@ -83,6 +84,8 @@ class Dropdown(Select):
             case _:
                 raise ValueError("Invalid account type")
             
+        await mark_listing_viewed(self.bot.db, self.account_type, account.number)
+
         async with aiohttp.ClientSession() as session:
             try:
                 profile_data, profile = await fetch_profile_data(session, account.uuid, self.bot, account.profile, False)
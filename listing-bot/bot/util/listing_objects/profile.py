@@ -4,8 +4,9 @@ from bot.bot import Bot
 import asyncio
 
 from bot.util.helper.profile import ProfileObject, create_embed_profile_listing
-from bot.util.fetch import fetch_profile_data
+from bot.util.fetch import fetch_profile_data, PROFILE_REFRESH_MAX_AGE
 from bot.util.convert_payment_methods import convert_payment_methods
+from bot.util.refresh import store_listing_hash
 
 from .ticket import OpenedTicket
 from bot.util.ticket import get_default_overwrites
@@ -220,9 +221,10 @@ class Profile(View):
         account = ProfileObject(*account)
         await interaction.response.defer(ephemeral=True)
 
-        profile_data, profile = await fetch_profile_data(self.bot.session, account.uuid, self.bot, account.profile)
+        profile_data, profile = await fetch_profile_data(self.bot.session, account.uuid, self.bot, account.profile, max_age=PROFILE_REFRESH_MAX_AGE)
         embed = create_embed_profile_listing(profile_data, profile, account.price, convert_payment_methods(self.bot, account.payment_methods), self.bot, f"<@{account.listed_by}>")
         await interaction.message.edit(embed=embed)
+        await store_listing_hash(self.bot, "profiles", account.number, [embed])
 
     @button(
         label="Unlist",
@@ -5,6 +5,7 @@ from bot.bot import Bot
 from chat_exporter.construct.transcript import Transcript
 from bot.util.attachment_handler import CustomHandler
 from bot.util.get_default_overwrites import get_role_config_name
+from bot.util import role_pool
 import os
 
 class Ticket:
@@ -225,7 +226,7 @@ class OpenedTicket(View):
 
         # Mark ticket as closed in database instead of deleting
         await self.bot.db.execute("UPDATE tickets SET is_open = ? WHERE channel_id = ?", 0, interaction.channel.id)
-        await self.bot.db.execute("UPDATE roles SET used = ? WHERE role_id = ?", 0, ticket.role_id)
+        await role_pool.release_role(self.bot, ticket.role_id)
 
         # Update channel permissions to make it read-only
         await interaction.channel.set_permissions(interaction.guild.default_role, send_messages=False, read_messages=False)
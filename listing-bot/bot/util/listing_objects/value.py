@@ -216,8 +216,7 @@ async def old_lowball(ctx, bot, username: str, profile: str=None, uuid: str=None
         return None, None
 
     # Get both value types
-    standard_values = gather_value(profile_data)  # Get standard values first
-    lowball_values = gather_lowball_value(profile_data)  # Get lowball values
+    standard_values, lowball_values = gather_values(profile_data)
 
     embed, view = create_embed(
         value_type="Lowball",
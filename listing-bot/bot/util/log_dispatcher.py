@@ -0,0 +1,144 @@
+import asyncio
+import os
+import time
+
+import discord
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Seconds to wait for more events before sending a partial batch
+LOG_BATCH_WINDOW = float(os.getenv("LOG_BATCH_WINDOW", "1.5"))
+# Pending embeds per channel before new ones are dropped
+LOG_QUEUE_MAX = int(os.getenv("LOG_QUEUE_MAX", "500"))
+# Embeds that waited longer than this before being sent are counted as delayed
+LOG_DELAY_WARN_SECONDS = float(os.getenv("LOG_DELAY_WARN_SECONDS", "30"))
+
+# Discord limits for a single message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+DROP_NOTICE_RESERVE = 100
+
+
+class LogDispatcher:
+    """
+    Coalesces log embeds into as few messages as possible: one bounded queue and
+    one sender per channel, up to 10 embeds per message. When a channel falls
+    behind, new embeds are dropped and the next message says how many were lost.
+    """
+    def __init__(self, batch_window: float = LOG_BATCH_WINDOW, queue_max: int = LOG_QUEUE_MAX):
+        self.batch_window = batch_window
+        self.queue_max = queue_max
+        self._queues: dict[int, asyncio.Queue] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self._dropped_unreported: dict[int, int] = {}
+
+        self.submitted = 0
+        self.sent = 0
+        self.messages = 0
+        self.dropped = 0
+        self.delayed = 0
+        self.failed = 0
+
+    def submit(self, channel: discord.TextChannel, embed: discord.Embed) -> bool:
+        """
+        Queues an embed for the channel without waiting. Returns False if it was dropped.
+        """
+        queue = self._queues.get(channel.id)
+        if queue is None:
+            queue = self._queues[channel.id] = asyncio.Queue(maxsize=self.queue_max)
+
+        try:
+            queue.put_nowait((time.monotonic(), embed))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._dropped_unreported[channel.id] = self._dropped_unreported.get(channel.id, 0) + 1
+            return False
+
+        self.submitted += 1
+        worker = self._workers.get(channel.id)
+        if worker is None or worker.done():
+            self._workers[channel.id] = asyncio.create_task(self._run(channel, queue))
+        return True
+
+    async def _next_batch(self, queue: asyncio.Queue, carry, max_embeds: int):
+        """
+        Collects embeds until the message is full or the batch window has passed.
+        Returns the batch and an embed that did not fit (to lead the next batch).
+        """
+        batch = [carry or queue.get_nowait()]
+        chars = len(batch[0][1])
+        deadline = time.monotonic() + self.batch_window
+
+        while len(batch) < max_embeds:
+            remaining = deadline - time.monotonic()
+            try:
+                if queue.empty() and remaining > 0:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                else:
+                    item = queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+
+            if chars + len(item[1]) > MAX_EMBED_CHARS_PER_MESSAGE - DROP_NOTICE_RESERVE:
+                return batch, item
+            batch.append(item)
+            chars += len(item[1])
+
+        return batch, None
+
+    def _drop_notice(self, channel_id: int):
+        dropped = self._dropped_unreported.pop(channel_id, 0)
+        if not dropped:
+            return None
+        return discord.Embed(
+            description=f"⚠️ {dropped} log event(s) were dropped because the log queue was full.",
+            color=discord.Color.orange()
+        )
+
+    async def _run(self, channel: discord.TextChannel, queue: asyncio.Queue):
+        carry = None
+        while True:
+            # No await between the empty check and deregistering, so submit() can't miss a restart
+            if carry is None and queue.empty():
+                self._workers.pop(channel.id, None)
+                return
+
+            # Leave a slot for the drop notice when there are drops to report
+            reserve = 1 if self._dropped_unreported.get(channel.id) else 0
+            batch, carry = await self._next_batch(queue, carry, MAX_EMBEDS_PER_MESSAGE - reserve)
+            embeds = [embed for _, embed in batch]
+            if len(embeds) < MAX_EMBEDS_PER_MESSAGE:
+                notice = self._drop_notice(channel.id)
+                if notice:
+                    embeds.append(notice)
+
+            if time.monotonic() - batch[0][0] > LOG_DELAY_WARN_SECONDS:
+                self.delayed += len(batch)
+
+            try:
+                await channel.send(embeds=embeds)
+                self.sent += len(batch)
+                self.messages += 1
+            except discord.Forbidden:
+                self.failed += len(batch)
+                print(f"Missing permissions to send log message in {channel.name} ({channel.id})")
+            except discord.HTTPException as e:
+                self.failed += len(batch)
+                print(f"Failed to send log message: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "messages": self.messages,
+            "pending": sum(queue.qsize() for queue in self._queues.values()),
+            "dropped": self.dropped,
+            "delayed": self.delayed,
+            "failed": self.failed
+        }
+
+    def close(self):
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
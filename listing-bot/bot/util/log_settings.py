@@ -0,0 +1,88 @@
+import json
+import os
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# How often the settings file is checked for edits made outside the bot
+LOGGING_SETTINGS_RELOAD_SECONDS = float(os.getenv("LOGGING_SETTINGS_RELOAD_SECONDS", "5"))
+
+
+class LoggingSettings:
+    """
+    In-memory copy of data/logging.json. Lookups are dict reads; writes go through
+    to the file, and the file is re-read when its mtime changes.
+    """
+    def __init__(self, path: str, defaults: dict, reload_interval: float = LOGGING_SETTINGS_RELOAD_SECONDS):
+        self.path = path
+        self.defaults = defaults
+        self.reload_interval = reload_interval
+        self._settings: dict = {}
+        self._mtime = None
+        self._checked_at = 0.0
+
+        if not os.path.exists(self.path):
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._write(dict(self.defaults))
+
+        self._load()
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                self._settings = json.load(f)
+        except FileNotFoundError:
+            self._settings = {}
+        except json.JSONDecodeError as e:
+            # Keep the last good settings while the file is being edited
+            print(f"Invalid {self.path}, keeping previous logging settings: {e}")
+        self._mtime = self._stat()
+        self._checked_at = time.monotonic()
+
+    def _write(self, settings: dict):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(settings, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+
+        if self._stat() != self._mtime:
+            self._load()
+
+    def is_enabled(self, guild_id, event_type: str) -> bool:
+        self._maybe_reload()
+        return self._settings.get(str(guild_id), {}).get(event_type, False)
+
+    def get_guild(self, guild_id) -> dict:
+        """
+        Returns the guild's settings with any missing events filled in from the defaults.
+        """
+        self._maybe_reload()
+        return {**self.defaults, **self._settings.get(str(guild_id), {})}
+
+    def set_event(self, guild_id, event_type: str, enabled: bool):
+        guild_settings = self.get_guild(guild_id)
+        guild_settings[event_type] = enabled
+        self._settings[str(guild_id)] = guild_settings
+        self._write(self._settings)
+        self._mtime = self._stat()
+
+    def ensure_guild(self, guild_id):
+        self._maybe_reload()
+        if str(guild_id) in self._settings:
+            return
+        self._settings[str(guild_id)] = dict(self.defaults)
+        self._write(self._settings)
+        self._mtime = self._stat()
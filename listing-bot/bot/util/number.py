@@ -1,12 +1,186 @@
+import contextvars
+import functools
+import inspect
+import os
+import time
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+import discord
 from bot.bot import Bot
 
-async def get_available_number(bot: Bot, table):
+load_dotenv()
+
+# A reserved number whose listing never got inserted is handed out again after this many seconds
+LISTING_RESERVATION_TTL = float(os.getenv("LISTING_RESERVATION_TTL", "600"))
+
+LISTING_TABLES = ("accounts", "profiles", "alts")
+
+# Reservations older than this process were left behind by the previous run
+_STARTED_AT = time.time()
+
+# (table, number) pairs held across a delete and relist (see holding_number)
+_held_numbers = set()
+_holding = contextvars.ContextVar("holding_numbers", default=frozenset())
+
+
+async def _expire_reservations(tx, table: str):
+    # Reservations left behind by a crash mid-listing go back to the free list
+    held = [number for held_table, number in _held_numbers if held_table == table]
+    exclude = f" AND number NOT IN ({','.join('?' * len(held))})" if held else ""
+    expired = await tx.fetchall(
+        f"DELETE FROM listing_number_reservations WHERE listing_type = ? AND reserved_at < ?{exclude} RETURNING number",
+        table, max(time.time() - LISTING_RESERVATION_TTL, _STARTED_AT), *held
+    )
+    for (number,) in expired:
+        await _free_number(tx, table, number)
+
+
+async def _free_number(tx, table: str, number: int):
+    # Numbers at or above the counter are handed out by the counter, so only gaps below it are tracked
+    await tx.execute(
+        "INSERT OR IGNORE INTO listing_free_numbers (listing_type, number) "
+        f"SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE number = ?) "
+        "AND ? < (SELECT next_number FROM listing_number_counters WHERE listing_type = ?)",
+        table, number, number, number, table
+    )
+
+
+async def reserve_number(bot: Bot, table: str, number: int = None):
     """
-    Returns the first available number in the given table.
+    Reserves the lowest free listing number in the given table, or `number` if given.
+    Returns the reserved number, or None if `number` is already listed or reserved.
+
+    The whole allocation runs in one transaction on the writer connection, so two
+    listings created at once never get the same number. The reservation ends when the
+    listing row is inserted (see the "<table>_insert_number" triggers) or on release_number.
     """
+    if table not in LISTING_TABLES:
+        raise ValueError(f"Unknown listing table: {table}")
 
-    number = 1
-    while await bot.db.fetchone(f"SELECT * FROM {table} WHERE number=?", number):
-        number += 1
+    async with bot.db.transaction() as tx:
+        await _expire_reservations(tx, table)
 
+        if number:
+            taken = await tx.fetchone(
+                f"SELECT EXISTS (SELECT 1 FROM {table} WHERE number = ?) "
+                "OR EXISTS (SELECT 1 FROM listing_number_reservations WHERE listing_type = ? AND number = ?)",
+                number, table, number
+            )
+            if taken[0]:
+                return None
+            await tx.execute("DELETE FROM listing_free_numbers WHERE listing_type = ? AND number = ?", table, number)
+        else:
+            row = await tx.fetchone(
+                "DELETE FROM listing_free_numbers WHERE rowid = ("
+                "SELECT rowid FROM listing_free_numbers WHERE listing_type = ? ORDER BY number LIMIT 1"
+                ") RETURNING number",
+                table
+            )
+            if row:
+                number = row[0]
+            else:
+                await tx.execute(
+                    "INSERT OR IGNORE INTO listing_number_counters (listing_type, next_number) "
+                    f"SELECT ?, COALESCE(MAX(number), 0) + 1 FROM {table}",
+                    table
+                )
+                while True:
+                    row = await tx.fetchone(
+                        "UPDATE listing_number_counters SET next_number = next_number + 1 "
+                        "WHERE listing_type = ? RETURNING next_number - 1",
+                        table
+                    )
+                    number = row[0]
+                    # Skip numbers someone picked by hand and is still listing
+                    reserved = await tx.fetchone(
+                        "SELECT 1 FROM listing_number_reservations WHERE listing_type = ? AND number = ?",
+                        table, number
+                    )
+                    if not reserved:
+                        break
+
+        await tx.execute(
+            "INSERT INTO listing_number_reservations (listing_type, number, reserved_at) VALUES (?, ?, ?)",
+            table, number, time.time()
+        )
     return number
+
+
+async def release_number(bot: Bot, table: str, number: int):
+    """
+    Ends a reservation. If the listing wasn't created, the number becomes free again.
+    """
+    async with bot.db.transaction() as tx:
+        await tx.execute(
+            "DELETE FROM listing_number_reservations WHERE listing_type = ? AND number = ?",
+            table, number
+        )
+        await _free_number(tx, table, number)
+
+
+@asynccontextmanager
+async def holding_number(bot: Bot, table: str, number: int):
+    """
+    Keeps `number` reserved while its listing is deleted and listed again, so nothing
+    else is handed the number in between. list_* calls inside the block use the held
+    number instead of reserving it themselves. Raises if the number is already reserved.
+    """
+    async with bot.db.transaction() as tx:
+        await _expire_reservations(tx, table)
+        reserved = await tx.fetchone(
+            "SELECT 1 FROM listing_number_reservations WHERE listing_type = ? AND number = ?",
+            table, number
+        )
+        if reserved:
+            raise Exception(f"Number #{number} is being used by a listing that is still being created.")
+        await tx.execute(
+            "INSERT INTO listing_number_reservations (listing_type, number, reserved_at) VALUES (?, ?, ?)",
+            table, number, time.time()
+        )
+
+    _held_numbers.add((table, number))
+    token = _holding.set(_holding.get() | {(table, number)})
+    try:
+        yield
+    finally:
+        _holding.reset(token)
+        _held_numbers.discard((table, number))
+        await release_number(bot, table, number)
+
+
+def reserves_number(table: str):
+    """
+    Wraps a list_* function so its `number` is reserved for the duration of the call:
+    the lowest free number when none is given, otherwise the given one. The reservation
+    is released afterwards, which frees the number again if nothing was listed.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bot = bound.arguments["bot"]
+            requested = bound.arguments.get("number")
+            if requested and (table, requested) in _holding.get():
+                return await func(*args, **kwargs)
+
+            number = await reserve_number(bot, table, requested)
+            if number is None:
+                if await bot.db.fetchone(f"SELECT 1 FROM {table} WHERE number = ?", requested):
+                    # Already listed; the listing function reports that itself
+                    return await func(*args, **kwargs)
+                return discord.Embed(
+                    title="An Error Occurred",
+                    description=f"Number #{requested} is being used by a listing that is still being created.",
+                    color=discord.Color.red()
+                )
+
+            bound.arguments["number"] = number
+            try:
+                return await func(*bound.args, **bound.kwargs)
+            finally:
+                await release_number(bot, table, number)
+        return wrapper
+    return decorator
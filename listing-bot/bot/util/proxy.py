@@ -3,6 +3,7 @@ from typing import Optional
 import json
 import os
 from api.auth_utils import API_KEY
+from bot.util import registry
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -63,10 +64,11 @@ class BotCommunicator:
         await self.session.close()
 
     def fetch_ports(self) -> dict:
-        if os.path.exists("../parent_api/ports.json"):
-            with open("../parent_api/ports.json", "r") as f:
-                return json.load(f)
-        return ports
+        try:
+            return registry.get_ports()
+        except Exception as e:
+            print(f"Failed to read the service registry: {e}")
+            return ports
 
     async def request(self, endpoint: str, request_type: str = "GET", bots: Optional[list[str]] = None, data: Optional[dict] = None, **kwargs):
         ports = self.fetch_ports()
@@ -92,3 +94,34 @@ class BotCommunicator:
                 async with self.session.delete(url, **kwargs) as response:
                     response.raise_for_status()
                     return await response.json()
+
+    async def scatter(self, endpoint: str, bots: Optional[list[str]] = None, deadline: float = 5.0, data: Optional[dict] = None):
+        """
+        Query many bots at once through the parent API and yield each bot's
+        result as it arrives. The last item is a summary with "done": True
+        that lists the stragglers which missed the deadline.
+        """
+        url = f"http://{PARENT_API_HOST}:{PARENT_API_PORT}/internal/scatter"
+        payload = {"endpoint": f"/{endpoint.lstrip('/')}", "deadline": deadline}
+        if bots:
+            payload["bots"] = bots
+        if data is not None:
+            payload["data"] = data
+
+        async with self.session.post(
+            url,
+            params={"api_key": API_KEY},
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=deadline + 10)
+        ) as response:
+            response.raise_for_status()
+            # Split manually: a single bot's result can exceed aiohttp's line length limit
+            buffer = b""
+            async for chunk in response.content.iter_any():
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+            if buffer.strip():
+                yield json.loads(buffer)
@@ -0,0 +1,40 @@
+import asyncio
+import os
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Requests per second the Skyblock backend tolerates, and how many may burst at once
+SKYBLOCK_API_RATE = float(os.getenv("SKYBLOCK_API_RATE", "2"))
+SKYBLOCK_API_BURST = int(os.getenv("SKYBLOCK_API_BURST", "5"))
+
+
+class TokenBucket:
+    """
+    Async token bucket: refills `rate` tokens per second up to `capacity`.
+    Waiters are served in arrival order.
+    """
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+# Shared by every bulk command so parallel invocations respect one upstream budget
+skyblock_bucket = TokenBucket(SKYBLOCK_API_RATE, SKYBLOCK_API_BURST)
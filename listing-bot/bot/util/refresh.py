@@ -0,0 +1,277 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+import discord
+from dotenv import load_dotenv
+
+from bot.util.ratelimit import skyblock_bucket
+
+load_dotenv()
+
+# Listings refreshed at once; Discord's per-route buckets are enforced by the HTTP client
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "4"))
+# Minimum seconds between edits of the progress message
+REFRESH_PROGRESS_INTERVAL = float(os.getenv("REFRESH_PROGRESS_INTERVAL", "2"))
+
+PENDING = "pending"
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+STATUS_ICONS = {PENDING: "🔴", DONE: "🟢", SKIPPED: "⚪", FAILED: "❌"}
+RUNNING_ICON = "🟡"
+
+# Job ids being run by this process, so a second invocation doesn't "resume" a live job
+_active_jobs = set()
+# One start() per job key at a time, so two invocations can't both create or resume a job
+_start_locks = {}
+
+
+def embeds_hash(embeds: list) -> str:
+    payload = json.dumps([embed.to_dict() for embed in embeds], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def update_listing_message(bot, listing_type: str, listing, embeds: list) -> str:
+    """
+    Edits the listing message unless the embeds match the ones it was last edited with.
+    """
+    digest = embeds_hash(embeds)
+    row = await bot.db.fetchone(
+        "SELECT hash FROM listing_hashes WHERE listing_type = ? AND number = ?",
+        listing_type, listing.number
+    )
+    if row and row[0] == digest:
+        return SKIPPED
+
+    channel = bot.get_channel(listing.channel_id)
+    if not channel:
+        return SKIPPED
+
+    # A partial message saves the fetch_message round trip
+    await channel.get_partial_message(listing.message_id).edit(embeds=embeds)
+    await store_listing_hash(bot, listing_type, listing.number, embeds, digest)
+    return DONE
+
+
+async def store_listing_hash(bot, listing_type: str, number: int, embeds: list, digest: str = None):
+    # Every edit of a listing message records what it was edited with, or the next refresh may skip wrongly
+    await bot.db.execute(
+        "INSERT INTO listing_hashes (listing_type, number, hash) VALUES (?, ?, ?) "
+        "ON CONFLICT (listing_type, number) DO UPDATE SET hash = excluded.hash",
+        listing_type, number, digest or embeds_hash(embeds)
+    )
+
+
+async def mark_listing_viewed(db, listing_type: str, number: int):
+    # Recently viewed listings get their stats refreshed sooner (see StatsRefresher)
+    await db.execute(
+        "INSERT INTO listing_refresh (listing_type, number, last_viewed) VALUES (?, ?, ?) "
+        "ON CONFLICT (listing_type, number) DO UPDATE SET last_viewed = excluded.last_viewed",
+        listing_type, number, time.time()
+    )
+
+
+async def clear_listing_hash(bot, listing_type: str, number: int):
+    await bot.db.execute("DELETE FROM listing_hashes WHERE listing_type = ? AND number = ?", listing_type, number)
+
+
+class RefreshJob:
+    """
+    A bulk update or restore of listings. Items run concurrently, bounded by
+    REFRESH_CONCURRENCY and the shared Skyblock API bucket, and each item's state is
+    stored in refresh_job_items so that running the same command after a crash
+    continues the unfinished job instead of starting over.
+    """
+    def __init__(self, bot, job_id: int, items: list, resumed: bool = False):
+        self.bot = bot
+        self.job_id = job_id
+        self.items = items
+        self.resumed = resumed
+        self._running = set()
+        self._holding = set()
+        self._semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+        self._finished = [asyncio.Event() for _ in items]
+        self._dirty = True
+
+        for index, item in enumerate(items):
+            if item["status"] != PENDING:
+                self._finished[index].set()
+
+    @classmethod
+    async def start(cls, bot, job_key: str, items: list):
+        """
+        items are (number, label, row) tuples. Returns the unfinished job for job_key if
+        there is one, a new job otherwise, or None if the job is already running. The
+        returned job counts as running until run() finishes or release() is called.
+        """
+        lock = _start_locks.setdefault(job_key, asyncio.Lock())
+        async with lock:
+            job = await cls._start(bot, job_key, items)
+            if job and job.job_id is not None:
+                _active_jobs.add(job.job_id)
+            return job
+
+    @classmethod
+    async def _start(cls, bot, job_key: str, items: list):
+        job = await bot.db.fetchone(
+            "SELECT job_id FROM refresh_jobs WHERE job_key = ? AND finished_at IS NULL ORDER BY job_id DESC LIMIT 1",
+            job_key
+        )
+        if job:
+            if job[0] in _active_jobs:
+                return None
+
+            rows = await bot.db.fetchall(
+                "SELECT number, label, payload, status FROM refresh_job_items WHERE job_id = ? ORDER BY rowid",
+                job[0]
+            )
+            return cls(bot, job[0], [
+                {"number": number, "label": label, "row": json.loads(payload), "status": status}
+                for number, label, payload, status in rows
+            ], resumed=True)
+
+        async with bot.db.transaction() as tx:
+            # Failed items are carried into the new run; for a restore they are the only copy left
+            failed = await tx.fetchall(
+                "SELECT number, label, payload FROM refresh_job_items WHERE status = ? "
+                "AND job_id IN (SELECT job_id FROM refresh_jobs WHERE job_key = ?) ORDER BY rowid",
+                FAILED, job_key
+            )
+            numbers = {number for number, _, _ in items}
+            items = list(items) + [
+                (number, label, json.loads(payload))
+                for number, label, payload in failed
+                if number not in numbers
+            ]
+            if not items:
+                return cls(bot, None, [])
+
+            # Only the latest finished run of a command is worth keeping
+            await tx.execute(
+                "DELETE FROM refresh_job_items WHERE job_id IN (SELECT job_id FROM refresh_jobs WHERE job_key = ?)",
+                job_key
+            )
+            await tx.execute("DELETE FROM refresh_jobs WHERE job_key = ?", job_key)
+            cursor = await tx.execute(
+                "INSERT INTO refresh_jobs (job_key, created_at) VALUES (?, ?)",
+                job_key, time.time()
+            )
+            job_id = cursor.lastrowid
+            await tx.executemany(
+                "INSERT INTO refresh_job_items (job_id, number, label, payload) VALUES (?, ?, ?, ?)",
+                [(job_id, number, label, json.dumps(list(row))) for number, label, row in items]
+            )
+
+        return cls(bot, job_id, [
+            {"number": number, "label": label, "row": list(row), "status": PENDING}
+            for number, label, row in items
+        ])
+
+    @asynccontextmanager
+    async def in_order(self, index: int):
+        """
+        Runs the block once every earlier item has finished, for steps whose order is
+        visible (new listing channels are appended to the category). These steps run one
+        at a time anyway, so the item gives up its concurrency slot for the wait and the
+        block instead of queueing behind later items to get it back.
+        """
+        if index in self._holding:
+            self._holding.discard(index)
+            self._semaphore.release()
+
+        for event in self._finished[:index]:
+            await event.wait()
+        yield
+
+    async def _process(self, index: int, item: dict, handler):
+        status, error = FAILED, None
+        try:
+            await self._semaphore.acquire()
+            self._holding.add(index)
+            self._running.add(index)
+            self._dirty = True
+            await skyblock_bucket.acquire()
+            try:
+                status = await handler(self, index, item["row"]) or DONE
+            except Exception as e:
+                error = str(e)
+                print(f"Refreshing listing #{item['number']} failed: {e}")
+        finally:
+            if index in self._holding:
+                self._holding.discard(index)
+                self._semaphore.release()
+            self._running.discard(index)
+            self._finished[index].set()
+
+        item["status"] = status
+        self._dirty = True
+        await self.bot.db.execute(
+            "UPDATE refresh_job_items SET status = ?, error = ? WHERE job_id = ? AND number = ?",
+            status, error, self.job_id, item["number"]
+        )
+
+    def release(self):
+        _active_jobs.discard(self.job_id)
+
+    def render(self, embed: discord.Embed, header: str) -> discord.Embed:
+        counts = {status: 0 for status in STATUS_ICONS}
+        for item in self.items:
+            counts[item["status"]] += 1
+        finished = len(self.items) - counts[PENDING]
+
+        summary = f"**{finished}/{len(self.items)}** processed • {counts[SKIPPED]} unchanged • {counts[FAILED]} failed"
+        lines = [
+            f"{RUNNING_ICON if index in self._running else STATUS_ICONS[item['status']]} #{item['number']} {item['label']}"
+            for index, item in enumerate(self.items)
+        ]
+
+        description = "\n".join([header, summary, "", *lines])
+        if len(description) > 4000:
+            # Too many listings to show all; keep the ones that still need attention
+            open_lines = [line for line, item in zip(lines, self.items) if item["status"] in (PENDING, FAILED)]
+            description = "\n".join([header, summary, "", *open_lines[:100]])
+            if len(open_lines) > 100:
+                description += f"\n...and {len(open_lines) - 100} more"
+
+        embed.description = description[:4096]
+        return embed
+
+    async def run(self, response: discord.WebhookMessage, embed: discord.Embed, header: str, handler) -> dict:
+        """
+        Runs handler(job, index, row) for every pending item, keeping the progress in
+        `embed` below `header`. Handlers return DONE or SKIPPED; exceptions mark the
+        item FAILED without stopping the others.
+        """
+        async def report():
+            while True:
+                await asyncio.sleep(REFRESH_PROGRESS_INTERVAL)
+                if not self._dirty:
+                    continue
+                self._dirty = False
+                try:
+                    await response.edit(embed=self.render(embed, header))
+                except discord.HTTPException as e:
+                    print(f"Failed to update refresh progress: {e}")
+
+        reporter = asyncio.create_task(report())
+        try:
+            await asyncio.gather(*(
+                self._process(index, item, handler)
+                for index, item in enumerate(self.items)
+                if item["status"] == PENDING
+            ))
+            await self.bot.db.execute(
+                "UPDATE refresh_jobs SET finished_at = ? WHERE job_id = ?",
+                time.time(), self.job_id
+            )
+        finally:
+            reporter.cancel()
+            self.release()
+
+        await response.edit(embed=self.render(embed, header))
+        return {status: sum(1 for item in self.items if item["status"] == status) for status in STATUS_ICONS}
@@ -0,0 +1,108 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import closing
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Shared with parent_api, which watches this file for changes
+REGISTRY_PATH = os.getenv("SERVICE_REGISTRY_PATH", "../parent_api/registry.db")
+LEGACY_PORTS_PATH = "../parent_api/ports.json"
+
+
+def get_available_port() -> int:
+    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as s:
+        s.bind(('', 0))
+        return s.getsockname()[1]
+
+
+def connect() -> sqlite3.Connection:
+    """
+    Opens the registry, creating it (and importing the old ports.json) on first use.
+    This is the only place the services table is defined; parent_api only reads it.
+    """
+    conn = sqlite3.connect(REGISTRY_PATH, timeout=10, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=10000")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS services ("
+        "bot_name TEXT PRIMARY KEY, "
+        "port INTEGER NOT NULL UNIQUE, "
+        "pid INTEGER, "
+        "registered_at REAL NOT NULL, "
+        "last_heartbeat REAL NOT NULL)"
+    )
+
+    if os.path.exists(LEGACY_PORTS_PATH) and not conn.execute("SELECT 1 FROM services LIMIT 1").fetchone():
+        try:
+            with open(LEGACY_PORTS_PATH, "r") as f:
+                legacy_ports: dict = json.load(f)
+            now = time.time()
+            conn.executemany(
+                "INSERT OR IGNORE INTO services (bot_name, port, registered_at, last_heartbeat) VALUES (?, ?, ?, 0)",
+                [(name, int(port), now) for name, port in legacy_ports.items()]
+            )
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"Warning: Could not import ports.json into the registry: {e}")
+
+    return conn
+
+
+def register(bot_name: str) -> int:
+    """
+    Atomically claims a port for this bot, keeping the one it already had.
+    BEGIN IMMEDIATE serializes concurrent restarts so no two bots share a port
+    and no registration is lost.
+    """
+    with closing(connect()) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT port FROM services WHERE bot_name = ?", (bot_name,)).fetchone()
+            now = time.time()
+
+            if row:
+                port = row[0]
+                conn.execute(
+                    "UPDATE services SET pid = ?, registered_at = ?, last_heartbeat = ? WHERE bot_name = ?",
+                    (os.getpid(), now, now, bot_name)
+                )
+            else:
+                used = {port for (port,) in conn.execute("SELECT port FROM services")}
+                port = get_available_port()
+                while port in used:
+                    port = get_available_port()
+
+                conn.execute(
+                    "INSERT INTO services (bot_name, port, pid, registered_at, last_heartbeat) VALUES (?, ?, ?, ?, ?)",
+                    (bot_name, port, os.getpid(), now, now)
+                )
+
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    return port
+
+
+def heartbeat(bot_name: str):
+    with closing(connect()) as conn:
+        conn.execute(
+            "UPDATE services SET last_heartbeat = ?, pid = ? WHERE bot_name = ?",
+            (time.time(), os.getpid(), bot_name)
+        )
+
+
+def get_ports() -> dict:
+    with closing(connect()) as conn:
+        return dict(conn.execute("SELECT bot_name, port FROM services"))
+
+
+def get_port(bot_name: str):
+    with closing(connect()) as conn:
+        row = conn.execute("SELECT port FROM services WHERE bot_name = ?", (bot_name,)).fetchone()
+        return row[0] if row else None
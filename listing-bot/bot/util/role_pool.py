@@ -0,0 +1,96 @@
+import asyncio
+import os
+
+import discord
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Free ticket roles kept pre-created so opening a ticket never waits on role creation
+ROLE_POOL_SPARES = int(os.getenv("ROLE_POOL_SPARES", "3"))
+
+TICKET_ROLE_NAME = "𝔟𝔬𝔱𝔰.𝔫𝔬𝔢𝔪𝔱.𝔡𝔢𝔳 | 𝔪𝔞𝔡𝔢 𝔟𝔶 𝔫𝔬𝔪"
+
+_refill_lock = asyncio.Lock()
+# The event loop only keeps weak references to tasks
+_refill_tasks = set()
+
+
+async def claim_role(bot, guild: discord.Guild) -> discord.Role:
+    """
+    Takes a free ticket role from the pool. The claim is a single UPDATE on the
+    writer connection, so two tickets opening at once can't get the same role.
+    A role is only created here when the pool is empty.
+    """
+    skipped = []
+    while True:
+        exclude = f" AND role_id NOT IN ({','.join('?' * len(skipped))})" if skipped else ""
+        async with bot.db.transaction() as tx:
+            row = await tx.fetchone(
+                "UPDATE roles SET used = 1 WHERE rowid = ("
+                f"SELECT rowid FROM roles WHERE used = 0 AND role_id IS NOT NULL{exclude} ORDER BY rowid LIMIT 1"
+                ") RETURNING role_id",
+                *skipped
+            )
+        if not row:
+            break
+
+        role = guild.get_role(row[0])
+        if role:
+            schedule_refill(bot, guild)
+            return role
+
+        if any(other.get_role(row[0]) for other in bot.guilds):
+            # Belongs to another guild the bot is in; leave it for that one
+            await release_role(bot, row[0])
+            skipped.append(row[0])
+        else:
+            await bot.db.execute("DELETE FROM roles WHERE role_id = ?", row[0])
+
+    role = await guild.create_role(name=TICKET_ROLE_NAME, reason="Ticket System")
+    await bot.db.execute("INSERT INTO roles (role_id, used) VALUES (?, ?)", role.id, 1)
+    schedule_refill(bot, guild)
+    return role
+
+
+async def release_role(bot, role_id: int):
+    await bot.db.execute("UPDATE roles SET used = 0 WHERE role_id = ?", role_id)
+
+
+async def mark_role_used(bot, role_id: int):
+    await bot.db.execute("UPDATE roles SET used = 1 WHERE role_id = ?", role_id)
+
+
+async def refill(bot, guild: discord.Guild, spares: int = ROLE_POOL_SPARES) -> int:
+    """
+    Creates roles until the pool has `spares` free ones. Returns how many were created.
+    """
+    async with _refill_lock:
+        free = await bot.db.fetchall("SELECT role_id FROM roles WHERE used = 0 AND role_id IS NOT NULL")
+        usable = 0
+        for (role_id,) in free:
+            if guild.get_role(role_id):
+                usable += 1
+            elif not any(other.get_role(role_id) for other in bot.guilds):
+                # The role was deleted on Discord; claiming it would only be skipped
+                await bot.db.execute("DELETE FROM roles WHERE role_id = ? AND used = 0", role_id)
+        missing = spares - usable
+
+        created = 0
+        for _ in range(missing):
+            try:
+                role = await guild.create_role(name=TICKET_ROLE_NAME, reason="Ticket System")
+            except discord.HTTPException as e:
+                print(f"Failed to create spare ticket role: {e}")
+                break
+            await bot.db.execute("INSERT INTO roles (role_id, used) VALUES (?, ?)", role.id, 0)
+            created += 1
+        return created
+
+
+def schedule_refill(bot, guild: discord.Guild):
+    # Tops the pool up after a claim without holding up the ticket being opened
+    if not _refill_lock.locked():
+        task = asyncio.create_task(refill(bot, guild))
+        _refill_tasks.add(task)
+        task.add_done_callback(_refill_tasks.discard)
@@ -0,0 +1,197 @@
+import json
+import os
+import time
+
+import discord
+from data.db import Database, Transaction
+
+# Pre-SQLite snapshot file, imported once into an empty store
+LEGACY_SNAPSHOT_PATH = "./data/server_data.json"
+
+
+def serialize_member(member: discord.Member) -> dict:
+    return {
+        "id": member.id,
+        "bot": member.bot,
+        "roles": [role.id for role in member.roles]
+    }
+
+
+def serialize_channel(channel: discord.abc.GuildChannel) -> dict:
+    return {
+        "type": str(channel.type),
+        "id": channel.id,
+        "position": channel.position,
+        "category": channel.category.name if channel.category else None,
+        "overwrites": {
+            overwrite.name: [value.value for value in channel.overwrites[overwrite].pair()]
+            for overwrite in channel.overwrites
+        }
+    }
+
+
+def serialize_role(role: discord.Role) -> dict:
+    return {
+        "id": role.id,
+        "color": role.color.value,
+        "position": role.position,
+        "permissions": role.permissions.value,
+        "mentionable": role.mentionable,
+        "hoist": role.hoist,
+        "managed": role.managed,
+        "is_bot_managed": role.is_bot_managed(),
+        "is_premium_subscriber": role.is_premium_subscriber()
+    }
+
+
+def _member_row(guild_id: int, member: dict, now: float) -> tuple:
+    return (guild_id, member["id"], int(member["bot"]), json.dumps(member["roles"]), now)
+
+
+async def _replace_channels(tx: Transaction, guild_id: int, channels: list):
+    await tx.execute("DELETE FROM guild_snapshot_channels WHERE guild_id = ?", guild_id)
+    await tx.executemany(
+        "INSERT INTO guild_snapshot_channels (guild_id, channel_id, name, position, data) VALUES (?, ?, ?, ?, ?)",
+        [(guild_id, data["id"], channel_name, data.get("position", 0), json.dumps(data)) for channel_name, data in channels]
+    )
+
+
+async def _replace_roles(tx: Transaction, guild_id: int, roles: list):
+    await tx.execute("DELETE FROM guild_snapshot_roles WHERE guild_id = ?", guild_id)
+    await tx.executemany(
+        "INSERT INTO guild_snapshot_roles (guild_id, role_id, name, position, data) VALUES (?, ?, ?, ?, ?)",
+        [(guild_id, data["id"], role_name, data.get("position", 0), json.dumps(data)) for role_name, data in roles]
+    )
+
+
+async def _write_guild(db: Database, guild_id: int, name: str, members: list, channels: list, roles: list):
+    """
+    Replaces the channel and role snapshot of a guild and upserts its members in one
+    transaction. Members that left are kept so they can still be pulled back on restore.
+    """
+    now = time.time()
+    async with db.transaction() as tx:
+        await tx.execute(
+            "INSERT INTO guild_snapshots (guild_id, name, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (guild_id) DO UPDATE SET name = excluded.name, updated_at = excluded.updated_at",
+            guild_id, name, now
+        )
+        await tx.executemany(
+            "INSERT INTO guild_snapshot_members (guild_id, member_id, bot, roles, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (guild_id, member_id) DO UPDATE SET bot = excluded.bot, roles = excluded.roles, updated_at = excluded.updated_at",
+            [_member_row(guild_id, member, now) for member in members]
+        )
+        await _replace_channels(tx, guild_id, channels)
+        await _replace_roles(tx, guild_id, roles)
+
+
+async def sync_guild(db: Database, guild: discord.Guild):
+    """
+    Full snapshot of a guild. Only needed at startup and when joining a guild;
+    gateway events keep it current afterwards.
+    """
+    await _write_guild(
+        db,
+        guild.id,
+        guild.name,
+        [serialize_member(member) for member in guild.members],
+        [(channel.name, serialize_channel(channel)) for channel in guild.channels],
+        [(role.name, serialize_role(role)) for role in guild.roles]
+    )
+
+
+async def sync_channels(db: Database, guild: discord.Guild):
+    # Positions shift together, so the (small) channel list is replaced as a whole
+    async with db.transaction() as tx:
+        await _replace_channels(tx, guild.id, [(channel.name, serialize_channel(channel)) for channel in guild.channels])
+
+
+async def sync_roles(db: Database, guild: discord.Guild):
+    async with db.transaction() as tx:
+        await _replace_roles(tx, guild.id, [(role.name, serialize_role(role)) for role in guild.roles])
+
+
+async def update_guild_name(db: Database, guild: discord.Guild):
+    await db.execute(
+        "UPDATE guild_snapshots SET name = ?, updated_at = ? WHERE guild_id = ?",
+        guild.name, time.time(), guild.id
+    )
+
+
+async def upsert_member(db: Database, member: discord.Member):
+    await db.execute(
+        "INSERT INTO guild_snapshot_members (guild_id, member_id, bot, roles, updated_at) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (guild_id, member_id) DO UPDATE SET bot = excluded.bot, roles = excluded.roles, updated_at = excluded.updated_at",
+        *_member_row(member.guild.id, serialize_member(member), time.time())
+    )
+
+
+async def get_member_data(db: Database, guild_id: int, member_id: int) -> dict:
+    row = await db.fetchone(
+        "SELECT bot, roles FROM guild_snapshot_members WHERE guild_id = ? AND member_id = ?",
+        guild_id, member_id
+    )
+    if not row:
+        return {}
+
+    bot, roles = row
+    return {"id": member_id, "bot": bool(bot), "roles": json.loads(roles)}
+
+
+async def get_guild_data(db: Database, guild_id: int) -> dict:
+    """
+    Returns the snapshot in the layout the restore code expects:
+    {"name", "members": [{id, bot, roles}], "channels": [{name: {...}}], "roles": [{name: {...}}]}
+    """
+    guild = await db.fetchone("SELECT name FROM guild_snapshots WHERE guild_id = ?", guild_id)
+    if not guild:
+        return {}
+
+    members = await db.fetchall("SELECT member_id, bot, roles FROM guild_snapshot_members WHERE guild_id = ? ORDER BY rowid", guild_id)
+    channels = await db.fetchall(
+        "SELECT name, data FROM guild_snapshot_channels WHERE guild_id = ? ORDER BY position, rowid", guild_id
+    )
+    roles = await db.fetchall(
+        "SELECT name, data FROM guild_snapshot_roles WHERE guild_id = ? ORDER BY position, rowid", guild_id
+    )
+
+    return {
+        "name": guild[0],
+        "members": [
+            {"id": member_id, "bot": bool(bot), "roles": json.loads(member_roles)}
+            for member_id, bot, member_roles in members
+        ],
+        "channels": [{name: json.loads(data)} for name, data in channels],
+        "roles": [{name: json.loads(data)} for name, data in roles]
+    }
+
+
+async def import_legacy_snapshot(db: Database):
+    """
+    Moves server_data.json into the store the first time the bot starts with it.
+    """
+    if not os.path.exists(LEGACY_SNAPSHOT_PATH):
+        return
+
+    existing = await db.fetchone("SELECT 1 FROM guild_snapshots LIMIT 1")
+    if existing:
+        return
+
+    try:
+        with open(LEGACY_SNAPSHOT_PATH, "r") as f:
+            data: dict = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Could not import {LEGACY_SNAPSHOT_PATH}: {e}")
+        return
+
+    for guild_id, guild_data in data.items():
+        await _write_guild(
+            db,
+            int(guild_id),
+            guild_data.get("name"),
+            guild_data.get("members", []),
+            [item for channel in guild_data.get("channels", []) for item in channel.items()],
+            [item for role in guild_data.get("roles", []) for item in role.items()]
+        )
+
+    print(f"Imported {len(data)} guild snapshots from {LEGACY_SNAPSHOT_PATH}")
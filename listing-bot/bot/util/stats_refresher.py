@@ -0,0 +1,177 @@
+import asyncio
+import os
+import time
+from dotenv import load_dotenv
+
+from bot.util.fetch import fetch_profile_data
+from bot.util.ratelimit import skyblock_bucket
+from bot.util.refresh import DONE, update_listing_message
+from bot.util.convert_payment_methods import convert_payment_methods
+from bot.util.list import ACCOUNT_STATS_INSERT, PROFILE_STATS_INSERT, account_stats_row, profile_stats_row
+from bot.util.helper.account import AccountObject, create_embed_account_listing
+from bot.util.helper.profile import ProfileObject, create_embed_profile_listing
+from bot.util.helper.macro_alt import AltObject, create_embed_alt_listing
+
+load_dotenv()
+
+# Every listing is refreshed at least this often; viewed and expensive ones more often
+STATS_MAX_AGE_HOURS = float(os.getenv("STATS_MAX_AGE_HOURS", "6"))
+# Listings refreshed per run and how many profiles are fetched at once
+STATS_REFRESH_BATCH = int(os.getenv("STATS_REFRESH_BATCH", "10"))
+STATS_REFRESH_CONCURRENCY = int(os.getenv("STATS_REFRESH_CONCURRENCY", "3"))
+# A listing counts as recently viewed for this long after someone opened its stats
+STATS_VIEW_WINDOW_HOURS = float(os.getenv("STATS_VIEW_WINDOW_HOURS", "24"))
+
+LISTING_CLASSES = {
+    "accounts": AccountObject,
+    "profiles": ProfileObject,
+    "alts": AltObject
+}
+
+
+class StatsRefresher:
+    """
+    Keeps account_stats, profile_stats and the listing embeds current without sellers
+    pressing "Update Stats". Each run refreshes the most overdue listings, where a
+    listing's refresh interval shrinks when it was viewed recently and with its price.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self._semaphore = asyncio.Semaphore(STATS_REFRESH_CONCURRENCY)
+
+        self.runs = 0
+        self.refreshed = 0
+        self.edited = 0
+        self.failed = 0
+
+    async def due_listings(self, limit: int = STATS_REFRESH_BATCH) -> list:
+        """
+        Returns up to `limit` (listing_type, row) pairs, most overdue first.
+        """
+        refresh_state = {
+            (listing_type, number): (last_viewed, last_refreshed)
+            for listing_type, number, last_viewed, last_refreshed in await self.bot.db.fetchall(
+                "SELECT listing_type, number, last_viewed, last_refreshed FROM listing_refresh"
+            )
+        }
+
+        listings = []
+        for listing_type in LISTING_CLASSES:
+            rows = await self.bot.db.fetchall(f"SELECT * FROM {listing_type} WHERE channel_id IS NOT NULL")
+            listings.extend((listing_type, row) for row in rows)
+        if not listings:
+            return []
+
+        now = time.time()
+        max_price = max((LISTING_CLASSES[listing_type](*row).price or 0 for listing_type, row in listings), default=0) or 1
+        view_window = STATS_VIEW_WINDOW_HOURS * 3600
+
+        scored = []
+        for listing_type, row in listings:
+            listing = LISTING_CLASSES[listing_type](*row)
+            last_viewed, last_refreshed = refresh_state.get((listing_type, listing.number), (None, None))
+
+            # 1x for an unviewed listing at no price, up to 6x for a viewed one at the top price
+            weight = 1 + 2 * min((listing.price or 0) / max_price, 1)
+            if last_viewed and now - last_viewed < view_window:
+                weight += 3
+
+            interval = STATS_MAX_AGE_HOURS * 3600 / weight
+            overdue = (now - last_refreshed) / interval if last_refreshed else float("inf")
+            if overdue >= 1:
+                scored.append((overdue, weight, listing_type, row))
+
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [(listing_type, row) for _, _, listing_type, row in scored[:limit]]
+
+    async def _refresh_listing(self, listing_type: str, row: list):
+        """
+        Fetches the listing's profile, edits its embed if anything changed and returns
+        the stats row to store (or None if the profile couldn't be fetched).
+        """
+        listing = LISTING_CLASSES[listing_type](*row)
+        async with self._semaphore:
+            await skyblock_bucket.acquire()
+            profile_data, cute_name = await fetch_profile_data(self.bot.session, listing.uuid, self.bot, listing.profile, allow_error_handler=False)
+
+        if not profile_data:
+            return None
+
+        payment_methods = convert_payment_methods(self.bot, listing.payment_methods)
+        listed_by = f"<@{listing.listed_by}>"
+        channel = self.bot.get_channel(listing.channel_id)
+
+        if listing_type == "accounts":
+            stats = account_stats_row(listing.uuid, profile_data)
+            # The embed only reads the guild from its context, which the listing channel has
+            embeds = [create_embed_account_listing(profile_data, cute_name, listing.uuid, listing.username, listing.price, listing.additional_info, payment_methods, channel, self.bot, listed_by)] if channel else []
+        elif listing_type == "profiles":
+            stats = profile_stats_row(listing.uuid, cute_name, profile_data)
+            embeds = [create_embed_profile_listing(profile_data, cute_name, listing.price, payment_methods, self.bot, listed_by)]
+        else:
+            stats = account_stats_row(listing.uuid, profile_data)
+            embeds = create_embed_alt_listing(profile_data, cute_name, listing.price, payment_methods, self.bot, listed_by, listing.mining, listing.farming)
+
+        if channel and embeds:
+            try:
+                if await update_listing_message(self.bot, listing_type, listing, embeds) == DONE:
+                    self.edited += 1
+            except Exception as e:
+                print(f"Failed to update {listing_type} listing #{listing.number}: {e}")
+
+        return stats
+
+    async def run(self) -> int:
+        """
+        Refreshes one batch of due listings. Stats of the whole batch are written in a
+        single transaction. Returns how many listings were refreshed.
+        """
+        due = await self.due_listings()
+        if not due:
+            return 0
+
+        results = await asyncio.gather(
+            *(self._refresh_listing(listing_type, row) for listing_type, row in due),
+            return_exceptions=True
+        )
+
+        account_rows, profile_rows, refreshed = [], [], []
+        now = time.time()
+        for (listing_type, row), result in zip(due, results):
+            number = LISTING_CLASSES[listing_type](*row).number
+            # Failed listings are marked too, so a broken profile doesn't hold up the queue
+            refreshed.append((listing_type, number, now))
+
+            if isinstance(result, Exception) or result is None:
+                if isinstance(result, Exception):
+                    print(f"Failed to refresh {listing_type} listing #{number}: {result}")
+                self.failed += 1
+                continue
+
+            (profile_rows if listing_type == "profiles" else account_rows).append(result)
+
+        async with self.bot.db.transaction() as tx:
+            await tx.executemany("DELETE FROM account_stats WHERE uuid = ?", [(stats[0],) for stats in account_rows])
+            await tx.executemany(ACCOUNT_STATS_INSERT, account_rows)
+            await tx.executemany(
+                "DELETE FROM profile_stats WHERE uuid = ? AND profile = ?",
+                [(stats[0], stats[1]) for stats in profile_rows]
+            )
+            await tx.executemany(PROFILE_STATS_INSERT, profile_rows)
+            await tx.executemany(
+                "INSERT INTO listing_refresh (listing_type, number, last_refreshed) VALUES (?, ?, ?) "
+                "ON CONFLICT (listing_type, number) DO UPDATE SET last_refreshed = excluded.last_refreshed",
+                refreshed
+            )
+
+        self.runs += 1
+        self.refreshed += len(account_rows) + len(profile_rows)
+        return len(account_rows) + len(profile_rows)
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "refreshed": self.refreshed,
+            "edited": self.edited,
+            "failed": self.failed
+        }
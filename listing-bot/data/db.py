@@ -1,22 +1,139 @@
 import aiosqlite
 import asyncio
+import hashlib
 import logging
+import os
 import re
+import time
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Read-only connections used by fetch*; writes always go through one writer connection
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "3"))
+# Most queued writes committed together in one transaction
+DB_WRITE_BATCH_MAX = int(os.getenv("DB_WRITE_BATCH_MAX", "50"))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "250"))
+# Table rebuilds copy this many rows per transaction; bigger tables are rebuilt in the background
+DB_REBUILD_CHUNK_ROWS = int(os.getenv("DB_REBUILD_CHUNK_ROWS", "5000"))
+DB_REBUILD_BACKGROUND_ROWS = int(os.getenv("DB_REBUILD_BACKGROUND_ROWS", "50000"))
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS "schema_version" (
+    "version" INTEGER,
+    "schema_hash" TEXT,
+    "applied_at" TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Raw statements that modify the config table behind the cache's back
+CONFIG_WRITE_PATTERN = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+"?config"?(?:\s|\(|$)',
+    re.IGNORECASE
+)
+
+# Vouch parsing shared by the mention index; amount is the largest figure in the message
+VOUCH_MENTION_PATTERN = re.compile(r'<@!?(\d+)>')
+VOUCH_AMOUNT_PATTERN = re.compile(r'(\d+)\$|\$(\d+)|(\d+)\s?bucks')
+
+class Transaction:
+    """
+    Statements run on the writer connection inside one BEGIN IMMEDIATE ... COMMIT.
+    Reads made through it see the transaction's own uncommitted writes.
+    """
+    def __init__(self, db: "Database"):
+        self.db = db
+        self.config_written = False
+
+    async def execute(self, query: str, *args):
+        started = time.perf_counter()
+        cursor = await self.db.conn.execute(query, args)
+        await cursor.close()
+        self.db._record_query(query, started)
+        if CONFIG_WRITE_PATTERN.match(query):
+            self.config_written = True
+        return cursor
+
+    async def executemany(self, query: str, rows):
+        started = time.perf_counter()
+        await self.db.conn.executemany(query, rows)
+        self.db._record_query(query, started)
+        if CONFIG_WRITE_PATTERN.match(query):
+            self.config_written = True
+
+    async def fetchone(self, query: str, *args):
+        started = time.perf_counter()
+        async with self.db.conn.execute(query, args) as cursor:
+            row = await cursor.fetchone()
+        self.db._record_query(query, started)
+        return row
+
+    async def fetchall(self, query: str, *args):
+        started = time.perf_counter()
+        async with self.db.conn.execute(query, args) as cursor:
+            rows = await cursor.fetchall()
+        self.db._record_query(query, started)
+        return rows
+
+
+def _normalize_sql(sql: str) -> str:
+    return re.sub(r'[\s"`\[\]]', '', sql).upper()
+
 
 class Database:
+    # Ordered data migrations, run once each after the schema is in place.
+    # Each must be safe to re-run; only ever append.
+    MIGRATIONS = [
+        (1, "index_vouch_mentions"),
+        (2, "index_vouch_amounts"),
+        (3, "normalize_role_pool"),
+        (4, "index_listing_numbers"),
+    ]
+
     def __init__(self, db_path: str, max_retries: int = 3, retry_delay: float = 1.0):
         self.db_path = db_path
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        # Single writer connection; all writes go through the write queue or transaction()
         self.conn = None
 
+        self._readers: asyncio.Queue = None
+        self._reader_conns = []
+        self._write_queue = asyncio.Queue()
+        self._write_lock = asyncio.Lock()
+        self._writer_task = None
+
+        # normalized query -> [count, total_ms, max_ms]
+        self._query_stats = {}
+        self.write_batches = 0
+        self.batched_writes = 0
+
+        self._schema_version = 0
+        self._schema_hash = None
+        self._rebuild_task = None
+
+        # key -> typed value, loaded once at connect and kept current on writes
+        self._config_cache = None
+        self.config_hits = 0
+        self.config_misses = 0
+        self.config_reloads = 0
+
     async def connect(self):
         for attempt in range(self.max_retries):
             try:
-                self.conn = await aiosqlite.connect(self.db_path)
-                await self._update_schema() 
-                await self.initialize_schema()
+                await self._close_connections()
+                self.conn = await aiosqlite.connect(self.db_path, isolation_level=None)
+                await self.conn.execute("PRAGMA journal_mode=WAL")
+                await self.conn.execute("PRAGMA synchronous=NORMAL")
+                await self.conn.execute("PRAGMA busy_timeout=5000")
+                self._writer_task = asyncio.create_task(self._write_loop())
+
+                version = await self._ensure_schema()
+                await self._open_readers()
                 await self.ensure_required_tables_data()  # Add this line
+                await self.load_config_cache()
+                await self._run_migrations(version)
                 break
             except Exception as e:
                 logging.error(f"Failed to connect to database (attempt {attempt + 1}/{self.max_retries}): {e}")
@@ -24,14 +141,164 @@ class Database:
         else:
             raise Exception("Failed to connect to the database after multiple attempts")
 
-    async def close(self):
+    async def _open_readers(self):
+        """
+        Read-only connections for fetch*. With WAL they read the last committed
+        state without waiting for the writer.
+        """
+        self._readers = asyncio.Queue()
+        if self.db_path == ":memory:":
+            return
+
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        for _ in range(DB_READ_POOL_SIZE):
+            reader = await aiosqlite.connect(uri, uri=True)
+            await reader.execute("PRAGMA busy_timeout=5000")
+            self._reader_conns.append(reader)
+            self._readers.put_nowait(reader)
+
+    async def _close_connections(self):
+        if self._rebuild_task:
+            self._rebuild_task.cancel()
+            self._rebuild_task = None
+        if self._writer_task:
+            self._writer_task.cancel()
+            self._writer_task = None
+        for reader in self._reader_conns:
+            await reader.close()
+        self._reader_conns = []
+        self._readers = None
         if self.conn:
             await self.conn.close()
+            self.conn = None
+
+    async def close(self):
+        await self._close_connections()
 
     async def ensure_connection(self):
         if not self.conn or not self.conn._conn:
             await self.connect()
 
+    def _record_query(self, query: str, started: float):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        key = " ".join(query.split())[:160]
+        stats = self._query_stats.get(key)
+        if stats is None:
+            stats = self._query_stats[key] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed_ms
+        stats[2] = max(stats[2], elapsed_ms)
+
+        if elapsed_ms >= DB_SLOW_QUERY_MS:
+            logging.warning(f"Slow query ({elapsed_ms:.0f} ms): {key}")
+
+    def query_stats(self, limit: int = 20) -> dict:
+        top = sorted(self._query_stats.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return {
+            "readers": len(self._reader_conns),
+            "pending_writes": self._write_queue.qsize(),
+            "write_batches": self.write_batches,
+            "batched_writes": self.batched_writes,
+            "queries": [
+                {
+                    "query": query,
+                    "count": count,
+                    "total_ms": round(total_ms, 2),
+                    "avg_ms": round(total_ms / count, 3),
+                    "max_ms": round(max_ms, 2)
+                }
+                for query, (count, total_ms, max_ms) in top
+            ]
+        }
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Groups statements into one transaction on the writer connection:
+
+            async with db.transaction() as tx:
+                await tx.execute(...)
+                await tx.executemany(...)
+
+        Use tx for every statement inside the block; db.execute would wait for
+        the transaction to finish.
+        """
+        await self.ensure_connection()
+        tx = Transaction(self)
+        async with self._write_lock:
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield tx
+            except BaseException:
+                await self.conn.execute("ROLLBACK")
+                raise
+            await self.conn.execute("COMMIT")
+
+        if tx.config_written:
+            await self.load_config_cache()
+
+    async def executemany(self, query: str, rows):
+        async with self.transaction() as tx:
+            await tx.executemany(query, rows)
+
+    async def _write_loop(self):
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < DB_WRITE_BATCH_MAX and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+
+            try:
+                async with self._write_lock:
+                    await self._run_write_batch(batch)
+            except BaseException as e:
+                if not isinstance(e, asyncio.CancelledError):
+                    logging.error(f"Write batch failed: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e if isinstance(e, Exception) else ConnectionError("Database connection closed"))
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+
+    async def _run_write_batch(self, batch: list):
+        """
+        Commits queued statements together. Each runs in its own savepoint, so a
+        failing statement is rolled back and reported without affecting the others.
+        """
+        results = []
+        await self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for query, args, future in batch:
+                if future.done():  # caller was cancelled
+                    continue
+
+                await self.conn.execute("SAVEPOINT queued_write")
+                started = time.perf_counter()
+                try:
+                    cursor = await self.conn.execute(query, args)
+                    await cursor.close()
+                    await self.conn.execute("RELEASE queued_write")
+                    results.append((future, cursor, None))
+                except Exception as e:
+                    await self.conn.execute("ROLLBACK TO queued_write")
+                    await self.conn.execute("RELEASE queued_write")
+                    results.append((future, None, e))
+                self._record_query(query, started)
+
+            await self.conn.execute("COMMIT")
+        except BaseException:
+            await self.conn.execute("ROLLBACK")
+            raise
+
+        self.write_batches += 1
+        self.batched_writes += len(results)
+        for future, cursor, error in results:
+            if future.done():
+                continue
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(cursor)
+
     async def update_config(self, option: str, value: any) -> bool:
         """
         Updates a configuration option in the database with automatic type detection
@@ -41,43 +308,65 @@ class Database:
         Returns:
             bool: True if update succeeded
         """
-        await self.ensure_connection()
         try:
             data_type = type(value).__name__
             
-            await self.conn.execute("DELETE FROM config WHERE key = ?", (option,))
-            
-            await self.conn.execute(
-                "INSERT INTO config (key, value, data_type) VALUES (?, ?, ?)",
-                (option, str(value), data_type)
-            )
-            await self.conn.commit()
+            async with self.transaction() as tx:
+                await tx.execute("DELETE FROM config WHERE key = ?", option)
+                await tx.execute(
+                    "INSERT INTO config (key, value, data_type) VALUES (?, ?, ?)",
+                    option, str(value), data_type
+                )
+            self._cache_config(option, str(value), data_type)
             return True
         except Exception as e:
             print(f"Error updating config: {e}")
             return False
 
     async def execute(self, query: str, *args):
+        """
+        Queues a write. Concurrent writes are committed together in one transaction.
+        """
         await self.ensure_connection()
         for attempt in range(self.max_retries):
             try:
-                async with self.conn.cursor() as cursor:
-                    await cursor.execute(query, args)
-                    await self.conn.commit()
-                    return cursor
+                future = asyncio.get_running_loop().create_future()
+                self._write_queue.put_nowait((query, args, future))
+                cursor = await future
+                if CONFIG_WRITE_PATTERN.match(query):
+                    await self.load_config_cache()
+                return cursor
             except Exception as e:
                 logging.error(f"Failed to execute query (attempt {attempt + 1}/{self.max_retries}): {e}")
                 await asyncio.sleep(self.retry_delay)
         else:
             raise Exception("Failed to execute query after multiple attempts")
 
+    @asynccontextmanager
+    async def _reader(self):
+        if not self._readers or not self._reader_conns:
+            yield self.conn
+            return
+
+        reader = await self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put_nowait(reader)
+
+    async def _read(self, query: str, args: tuple, one: bool):
+        started = time.perf_counter()
+        async with self._reader() as conn:
+            async with conn.execute(query, args) as cursor:
+                result = await cursor.fetchone() if one else await cursor.fetchall()
+        self._record_query(query, started)
+        return result
+
     async def fetch(self, query: str, *args):
         await self.ensure_connection()
         for attempt in range(self.max_retries):
             try:
-                async with self.conn.cursor() as cursor:
-                    await cursor.execute(query, args)
-                    return await cursor.fetchall()
+                return await self._read(query, args, one=False)
             except Exception as e:
                 logging.error(f"Failed to fetch data (attempt {attempt + 1}/{self.max_retries}): {e}")
                 await asyncio.sleep(self.retry_delay)
@@ -88,9 +377,7 @@ class Database:
         await self.ensure_connection()
         for attempt in range(self.max_retries):
             try:
-                async with self.conn.cursor() as cursor:
-                    await cursor.execute(query, args)
-                    return await cursor.fetchone()
+                return await self._read(query, args, one=True)
             except Exception as e:
                 logging.error(f"Failed to fetch one (attempt {attempt + 1}/{self.max_retries}): {e}")
                 await asyncio.sleep(self.retry_delay)
@@ -101,47 +388,304 @@ class Database:
         await self.ensure_connection()
         for attempt in range(self.max_retries):
             try:
-                async with self.conn.cursor() as cursor:
-                    await cursor.execute(query, args)
-                    return await cursor.fetchall()
+                return await self._read(query, args, one=False)
             except Exception as e:
                 logging.error(f"Failed to fetch all (attempt {attempt + 1}/{self.max_retries}): {e}")
                 await asyncio.sleep(self.retry_delay)
         else:
             raise Exception("Failed to fetch all after multiple attempts")
         
+    @staticmethod
+    def _coerce_config(value: str, data_type: str):
+        if data_type == 'int':
+            return int(value)
+        elif data_type == 'float':
+            return float(value)
+        elif data_type == 'bool':
+            return value.lower() in ('true', '1')
+        else:
+            return value
+
+    def _cache_config(self, key: str, value: str, data_type: str):
+        if self._config_cache is not None:
+            self._config_cache[key] = self._coerce_config(value, data_type)
+
+    async def load_config_cache(self):
+        """
+        Loads the whole config table into memory. The first row wins for
+        duplicated keys, matching what a direct SELECT ... WHERE key = ? returns.
+        """
+        rows = await self.fetchall("SELECT key, value, data_type FROM config")
+        cache = {}
+        for key, value, data_type in rows:
+            if key in cache:
+                continue
+            try:
+                cache[key] = self._coerce_config(value, data_type)
+            except (ValueError, AttributeError) as e:
+                logging.error(f"Invalid config value for {key}: {e}")
+                cache[key] = None
+        self._config_cache = cache
+        self.config_reloads += 1
+
+    def config_cache_stats(self) -> dict:
+        lookups = self.config_hits + self.config_misses
+        return {
+            "entries": len(self._config_cache) if self._config_cache is not None else 0,
+            "hits": self.config_hits,
+            "misses": self.config_misses,
+            "hit_rate": round(self.config_hits / lookups, 4) if lookups else None,
+            "reloads": self.config_reloads
+        }
+
     async def get_config(self, key: str):
+        if self._config_cache is not None:
+            self.config_hits += 1
+            return self._config_cache.get(key)
+
+        self.config_misses += 1
         query = "SELECT value, data_type FROM config WHERE key = ?"
         result = await self.fetchone(query, key)
         if result:
             value, data_type = result
-            if data_type == 'int':
-                return int(value)
-            elif data_type == 'float':
-                return float(value)
-            elif data_type == 'bool':
-                return value.lower() in ('true', '1')
-            else:
-                return value
+            return self._coerce_config(value, data_type)
         return None
+
+    async def get_configs(self, keys: list) -> dict:
+        """
+        Looks up several config options at once
+        Returns: {key: value} with None for options that are not set
+        """
+        if self._config_cache is not None:
+            self.config_hits += len(keys)
+            return {key: self._config_cache.get(key) for key in keys}
+
+        self.config_misses += len(keys)
+        values = dict.fromkeys(keys)
+        if not keys:
+            return values
+
+        placeholders = ", ".join("?" for _ in keys)
+        rows = await self.fetchall(
+            f"SELECT key, value, data_type FROM config WHERE key IN ({placeholders})",
+            *keys
+        )
+        seen = set()
+        for key, value, data_type in rows:
+            if key not in seen:
+                seen.add(key)
+                values[key] = self._coerce_config(value, data_type)
+        return values
     
     async def set_config(self, key: str, value: any):
         data_type = type(value).__name__
-        query = "INSERT OR REPLACE INTO config (key, value, data_type) VALUES (?, ?, ?)"
-        await self.execute(query, key, str(value), data_type)
+        # config has no unique key, so replace any previous rows explicitly
+        async with self.transaction() as tx:
+            await tx.execute("DELETE FROM config WHERE key = ?", key)
+            await tx.execute(
+                "INSERT INTO config (key, value, data_type) VALUES (?, ?, ?)",
+                key, str(value), data_type
+            )
+        self._cache_config(key, str(value), data_type)
         return True
     
     async def delete_config(self, key: str):
-        query = "DELETE FROM config WHERE key = ?"
-        await self.execute(query, key)
+        async with self.transaction() as tx:
+            await tx.execute("DELETE FROM config WHERE key = ?", key)
+        if self._config_cache is not None:
+            self._config_cache.pop(key, None)
         return True
     
-    async def _update_schema(self):
+    @staticmethod
+    def _vouch_amount(message: str) -> int:
+        """
+        The amount a vouch was for: the largest `N$`, `$N` or `N bucks` in the message.
+        """
+        amounts = [int(match) for group in VOUCH_AMOUNT_PATTERN.findall(message or "") for match in group if match]
+        return max(amounts) if amounts else 0
+
+    @classmethod
+    def _vouch_mention_rows(cls, rowid: int, message: str) -> list:
+        """
+        Returns the vouch_mentions rows for a vouch: one per distinct mentioned user,
+        in order of appearance, each carrying the vouch amount.
+        """
+        if not message:
+            return []
+
+        amount = cls._vouch_amount(message)
+        mentioned = dict.fromkeys(int(user_id) for user_id in VOUCH_MENTION_PATTERN.findall(message))
+        return [(rowid, user_id, amount, position) for position, user_id in enumerate(mentioned)]
+
+    async def add_vouch(self, user_id: int, message: str, avatar: str, username: str) -> int:
+        """
+        Stores a vouch and its mention index rows in one transaction.
+        Returns the rowid of the new vouch.
+        """
+        async with self.transaction() as tx:
+            cursor = await tx.execute(
+                "INSERT INTO vouches (user_id, message, avatar, username) VALUES (?, ?, ?, ?)",
+                user_id, message, avatar, username
+            )
+            rowid = cursor.lastrowid
+            await tx.executemany(
+                "INSERT INTO vouch_mentions (vouch_rowid, mentioned_user_id, amount, position) VALUES (?, ?, ?, ?)",
+                self._vouch_mention_rows(rowid, message)
+            )
+            # Triggers on vouch_amounts keep the customer_spending ledger current
+            amount = self._vouch_amount(message)
+            if amount > 0:
+                await tx.execute(
+                    "INSERT INTO vouch_amounts (vouch_rowid, user_id, amount) VALUES (?, ?, ?)",
+                    rowid, user_id, amount
+                )
+        return rowid
+
+    async def index_vouch_mentions(self):
+        """
+        Backfills vouch_mentions from the vouches table. Runs when the index is empty
+        while vouches exist (first start after the upgrade) or when it points at vouches
+        that are gone, which happens if _update_schema rebuilt the vouches table.
+        """
+        stale = await self.fetchone(
+            """
+            SELECT (NOT EXISTS (SELECT 1 FROM vouch_mentions) AND EXISTS (SELECT 1 FROM vouches))
+                OR EXISTS (
+                    SELECT 1 FROM vouch_mentions m
+                    LEFT JOIN vouches v ON v.rowid = m.vouch_rowid
+                    WHERE v.rowid IS NULL
+                )
+            """
+        )
+        if not stale or not stale[0]:
+            return
+
+        logging.info("Rebuilding vouch mention index...")
+        vouches = await self.fetchall("SELECT rowid, message FROM vouches")
+        rows = [row for rowid, message in vouches for row in self._vouch_mention_rows(rowid, message)]
+
+        async with self.transaction() as tx:
+            await tx.execute("DELETE FROM vouch_mentions")
+            await tx.executemany(
+                "INSERT INTO vouch_mentions (vouch_rowid, mentioned_user_id, amount, position) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        logging.info(f"Indexed {len(rows)} mentions across {len(vouches)} vouches.")
+
+    async def index_vouch_amounts(self):
+        """
+        Rebuilds vouch_amounts, and through its triggers the customer_spending
+        ledger, from the vouches table.
+        """
+        logging.info("Rebuilding customer spending ledger...")
+        vouches = await self.fetchall("SELECT rowid, user_id, message FROM vouches")
+        rows = [(rowid, user_id, self._vouch_amount(message)) for rowid, user_id, message in vouches]
+
+        async with self.transaction() as tx:
+            await tx.execute("DELETE FROM vouch_amounts")
+            await tx.execute("DELETE FROM customer_spending")
+            await tx.executemany(
+                "INSERT INTO vouch_amounts (vouch_rowid, user_id, amount) VALUES (?, ?, ?)",
+                [row for row in rows if row[2] > 0]
+            )
+        logging.info(f"Ledger built from {len(vouches)} vouches.")
+
+    async def normalize_role_pool(self):
+        """
+        The roles pool used to store "used" as 0, "0", 1 or "False"; maps them all to 0/1.
+        """
+        await self.execute(
+            "UPDATE roles SET used = CASE WHEN used IN (1, '1', 'True', 'true') THEN 1 ELSE 0 END "
+            "WHERE used IS NULL OR typeof(used) != 'integer' OR used NOT IN (0, 1)"
+        )
+
+    async def index_listing_numbers(self):
+        """
+        Seeds the listing number allocator: every unused number below the highest one
+        in use goes into listing_free_numbers, and the counter starts above it.
+        """
+        async with self.transaction() as tx:
+            for table in ("accounts", "profiles", "alts"):
+                numbers = {row[0] for row in await tx.fetchall(f"SELECT number FROM {table} WHERE number IS NOT NULL")}
+                highest = max(numbers, default=0)
+
+                await tx.execute("DELETE FROM listing_free_numbers WHERE listing_type = ?", table)
+                await tx.execute("DELETE FROM listing_number_reservations WHERE listing_type = ?", table)
+                await tx.executemany(
+                    "INSERT INTO listing_free_numbers (listing_type, number) VALUES (?, ?)",
+                    [(table, number) for number in range(1, highest) if number not in numbers]
+                )
+                await tx.execute(
+                    "INSERT INTO listing_number_counters (listing_type, next_number) VALUES (?, ?) "
+                    "ON CONFLICT (listing_type) DO UPDATE SET next_number = excluded.next_number",
+                    table, highest + 1
+                )
+
+    async def _ensure_schema(self) -> int:
+        """
+        Fast path for restarts: the schema diff only runs when DatabaseSchema changed
+        since it was last applied. Returns the data migration version.
+        """
+        await self.conn.execute(SCHEMA_VERSION_TABLE)
+        async with self.conn.execute(
+            "SELECT version, schema_hash FROM schema_version ORDER BY rowid DESC LIMIT 1"
+        ) as cursor:
+            row = await cursor.fetchone()
+        self._schema_version, self._schema_hash = row if row else (0, None)
+
+        schema_hash = DatabaseSchema().fingerprint()
+        if self._schema_hash == schema_hash:
+            logging.info("Database schema is up to date.")
+            return self._schema_version
+
+        rebuilds, failed = await self._update_schema()
+        await self.initialize_schema()
+
+        if failed:
+            # Leaving the hash unrecorded makes the next start run the diff again
+            logging.warning("Some schema changes failed, they will be retried on next start.")
+            schema_hash = None
+
+        if rebuilds:
+            # Recorded once the background copies are done, so an interrupted rebuild is retried
+            self._rebuild_task = asyncio.create_task(self._finish_rebuilds(rebuilds, schema_hash))
+        elif schema_hash:
+            await self._record_schema(self._schema_version, schema_hash)
+        return self._schema_version
+
+    async def _record_schema(self, version: int, schema_hash: str):
+        self._schema_version, self._schema_hash = version, schema_hash
+        await self.execute(
+            "INSERT INTO schema_version (version, schema_hash) VALUES (?, ?)",
+            version, schema_hash
+        )
+
+    async def _run_migrations(self, version: int):
+        for migration_version, name in self.MIGRATIONS:
+            if migration_version <= version:
+                continue
+            logging.info(f"Applying migration {migration_version}: {name}")
+            await getattr(self, name)()
+            await self._record_schema(migration_version, self._schema_hash)
+
+    async def _finish_rebuilds(self, rebuilds: list, schema_hash: str):
+        try:
+            for table, rebuild in rebuilds:
+                await rebuild
+            await self.initialize_schema()
+            if schema_hash:
+                await self._record_schema(self._schema_version, schema_hash)
+        except Exception as e:
+            logging.error(f"Background table rebuild failed, it will be retried on next start: {e}")
+
+    async def _update_schema(self) -> tuple:
         """
         Compares the current DB schema with the defined schema and:
         1. Applies necessary ALTER TABLE commands to add missing columns
         2. Drops tables that are no longer in the schema definition
-        3. Recreates tables with updated constraints when necessary
+        3. Rebuilds tables whose constraints changed or that lost columns
+        Returns (table, coroutine) pairs for rebuilds of large tables, which
+        the caller runs in the background, and whether any change failed.
         """
         logging.info("Checking for database schema updates...")
         schema = DatabaseSchema()
@@ -193,7 +737,23 @@ class Database:
 
         cursor = await self.conn.cursor()
         
-        # Clean up any leftover temporary tables from failed migrations
+        # Clean up any leftover temporary tables and copy triggers from interrupted rebuilds
+        await cursor.execute("SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE '%\\_rebuild\\_%' ESCAPE '\\'")
+        for (trigger,) in await cursor.fetchall():
+            await self.conn.execute(f'DROP TRIGGER IF EXISTS "{trigger}"')
+
+        # Triggers are created with IF NOT EXISTS, so a changed body only applies once the old one is dropped
+        await cursor.execute("SELECT name, sql FROM sqlite_master WHERE type='trigger'")
+        existing_triggers = {name: _normalize_sql(sql) for name, sql in await cursor.fetchall()}
+        for query in schema.create_table_queries:
+            trigger_match = re.search(r'CREATE TRIGGER IF NOT EXISTS "(\w+)"', query)
+            if not trigger_match or trigger_match.group(1) not in existing_triggers:
+                continue
+            defined = _normalize_sql(query).replace("IFNOTEXISTS", "", 1).rstrip(";")
+            if existing_triggers[trigger_match.group(1)] != defined:
+                logging.info(f"Recreating changed trigger {trigger_match.group(1)}")
+                await self.conn.execute(f'DROP TRIGGER "{trigger_match.group(1)}"')
+
         await cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%_new'")
         temp_tables = await cursor.fetchall()
         for (temp_table,) in temp_tables:
@@ -204,8 +764,12 @@ class Database:
             except Exception as cleanup_err:
                 logging.error(f"Error cleaning up temporary table {temp_table}: {cleanup_err}")
         
-        await cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        existing_tables = [row[0] for row in await cursor.fetchall()]
+        await cursor.execute("SELECT name, sql FROM sqlite_master WHERE type='table'")
+        existing_sql = {name: sql for name, sql in await cursor.fetchall()}
+        existing_tables = list(existing_sql)
+
+        background_rebuilds = []
+        failed = False
 
         # Drop tables that no longer exist in the schema
         for table in existing_tables:
@@ -220,6 +784,7 @@ class Database:
                     await self.conn.execute(drop_query)
                     logging.info(f"Successfully dropped table: {table}")
                 except Exception as e:
+                    failed = True
                     logging.error(f"Failed to drop table {table}: {e}")
 
         # Handle table updates
@@ -240,83 +805,131 @@ class Database:
             # Check for columns to drop
             cols_to_drop = [col for col in existing_col_names if col not in required_columns]
             
-            # Check if table has constraints (need to recreate if so)
-            has_constraints = bool(table_constraints.get(table, []))
+            # Constraints only force a rebuild when the existing table doesn't have them yet
+            existing_definition = _normalize_sql(existing_sql.get(table) or "")
+            constraints_changed = any(
+                _normalize_sql(constraint) not in existing_definition
+                for constraint in table_constraints.get(table, [])
+            )
+            adds_key_column = any('PRIMARY KEY' in definition.upper() for _, definition in columns_to_add)
             
-            # If we have constraints or columns to drop, recreate the table
-            if has_constraints or cols_to_drop or (columns_to_add and has_constraints):
+            if constraints_changed or cols_to_drop or adds_key_column:
+                copy_columns = [col for col in existing_col_names if col in required_columns]
+                rebuild = self._rebuild_table(table, required_columns, table_constraints.get(table, []), copy_columns)
+
+                row_count = (await (await self.conn.execute(f'SELECT COUNT(*) FROM "{table}"')).fetchone())[0]
+                if row_count > DB_REBUILD_BACKGROUND_ROWS:
+                    logging.info(f"Rebuilding table {table} ({row_count} rows) in the background")
+                    background_rebuilds.append((table, rebuild))
+                    continue
+
                 try:
-                    logging.info(f"Recreating table {table} due to constraints or column changes")
-                    
-                    # Create a new table with the correct schema
-                    temp_table = f"{table}_new"
-                    
-                    # First, check if temp table already exists and drop it
-                    await cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{temp_table}'")
-                    if await cursor.fetchone():
-                        logging.warning(f"Temporary table {temp_table} already exists, dropping it")
-                        await self.conn.execute(f'DROP TABLE "{temp_table}"')
-                    
-                    create_temp_query = f'CREATE TABLE "{temp_table}" ('
-                    
-                    # Add column definitions
-                    all_definitions = []
-                    for col_name, col_definition in required_columns.items():
-                        all_definitions.append(f'"{col_name}" {col_definition}')
-                    
-                    # Add constraints
-                    for constraint in table_constraints.get(table, []):
-                        all_definitions.append(constraint)
-                    
-                    create_temp_query += ', '.join(all_definitions) + ')'
-                    
-                    await self.conn.execute(create_temp_query)
-                    
-                    # Copy data from old table to new table (only for existing columns)
-                    remaining_cols = [col for col in existing_col_names if col in required_columns]
-                    if remaining_cols:
-                        copy_query = f'INSERT INTO "{temp_table}" ('
-                        copy_query += ', '.join([f'"{col}"' for col in remaining_cols])
-                        copy_query += f') SELECT '
-                        copy_query += ', '.join([f'"{col}"' for col in remaining_cols])
-                        copy_query += f' FROM "{table}"'
-                        
-                        await self.conn.execute(copy_query)
-                    
-                    # Drop old table and rename new table
-                    await self.conn.execute(f'DROP TABLE "{table}"')
-                    await self.conn.execute(f'ALTER TABLE "{temp_table}" RENAME TO "{table}"')
-                    
-                    logging.info(f"Successfully recreated table {table} with updated schema")
+                    await rebuild
                 except Exception as e:
+                    failed = True
                     logging.error(f"Failed to update schema for table {table}: {e}")
-                    # Enhanced cleanup - remove temp table if it exists
-                    try:
-                        await cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{temp_table}'")
-                        if await cursor.fetchone():
-                            await self.conn.execute(f'DROP TABLE "{temp_table}"')
-                            logging.info(f"Cleaned up temporary table {temp_table}")
-                    except Exception as cleanup_err:
-                        logging.error(f"Error during temp table cleanup: {cleanup_err}")
             
             # If no constraints and only adding columns, use ALTER TABLE
-            elif columns_to_add and not cols_to_drop:
+            elif columns_to_add:
                 for col_name, col_definition in columns_to_add:
                     try:
-                        # Skip adding columns with PRIMARY KEY constraint via ALTER TABLE
-                        if 'PRIMARY KEY' in col_definition.upper():
-                            logging.warning(f"Cannot add PRIMARY KEY column {col_name} to existing table {table}, skipping")
-                            continue
-                            
                         alter_query = f'ALTER TABLE "{table}" ADD COLUMN "{col_name}" {col_definition}'
                         logging.info(f"Applying migration: {alter_query}")
                         await self.conn.execute(alter_query)
                     except Exception as e:
+                        failed = True
                         logging.error(f"Failed to apply migration for {table}.{col_name}: {e}")
         
-        await self.conn.commit()
         await cursor.close()
         logging.info("Database schema check complete.")
+        return background_rebuilds, failed
+
+    async def _rebuild_table(self, table: str, columns: dict, constraints: list, copy_columns: list):
+        """
+        Recreates a table with the defined columns and constraints. Rows are copied
+        in rowid chunks, each its own short transaction, while triggers mirror writes
+        made to the old table in the meantime. Rowids are preserved.
+        """
+        temp_table = f"{table}_new"
+        logging.info(f"Recreating table {table} due to constraints or column changes")
+
+        definitions = [f'"{col_name}" {col_definition}' for col_name, col_definition in columns.items()]
+        definitions.extend(constraints)
+
+        # An INTEGER PRIMARY KEY column is the rowid, so it is copied as a regular column
+        has_rowid_alias = any('INTEGER PRIMARY KEY' in definition.upper() for definition in columns.values())
+        key = "" if has_rowid_alias else "rowid, "
+        col_list = ", ".join(f'"{col}"' for col in copy_columns)
+        new_values = ", ".join(f'NEW."{col}"' for col in copy_columns)
+        if not has_rowid_alias:
+            new_values = "NEW.rowid, " + new_values
+
+        # DROP TABLE takes the table's indexes and triggers with it; they are recreated in
+        # the swap transaction so no write lands on the new table without them
+        attached = [
+            query for query in DatabaseSchema().create_table_queries
+            if re.search(rf'CREATE (?:UNIQUE )?(?:INDEX|TRIGGER) IF NOT EXISTS "\w+"\s+(?:AFTER \w+ )?ON "{table}"', query)
+        ]
+
+        async with self.transaction() as tx:
+            await tx.execute(f'DROP TABLE IF EXISTS "{temp_table}"')
+            await tx.execute(f'CREATE TABLE "{temp_table}" ({", ".join(definitions)})')
+            if not copy_columns:
+                await tx.execute(f'DROP TABLE "{table}"')
+                await tx.execute(f'ALTER TABLE "{temp_table}" RENAME TO "{table}"')
+                for query in attached:
+                    await tx.execute(query)
+                return
+
+            await tx.execute(
+                f'CREATE TRIGGER "{table}_rebuild_insert" AFTER INSERT ON "{table}" BEGIN '
+                f'INSERT OR REPLACE INTO "{temp_table}" ({key}{col_list}) VALUES ({new_values}); END'
+            )
+            await tx.execute(
+                f'CREATE TRIGGER "{table}_rebuild_update" AFTER UPDATE ON "{table}" BEGIN '
+                f'DELETE FROM "{temp_table}" WHERE rowid = OLD.rowid; '
+                f'INSERT OR REPLACE INTO "{temp_table}" ({key}{col_list}) VALUES ({new_values}); END'
+            )
+            await tx.execute(
+                f'CREATE TRIGGER "{table}_rebuild_delete" AFTER DELETE ON "{table}" BEGIN '
+                f'DELETE FROM "{temp_table}" WHERE rowid = OLD.rowid; END'
+            )
+
+        last_rowid = None
+        copied = 0
+        while True:
+            async with self.transaction() as tx:
+                row = await tx.fetchone(
+                    f'SELECT MAX(rowid), COUNT(*) FROM (SELECT rowid FROM "{table}" WHERE rowid > ? ORDER BY rowid LIMIT ?)',
+                    last_rowid if last_rowid is not None else -(2 ** 63), DB_REBUILD_CHUNK_ROWS
+                )
+                chunk_end, chunk_rows = row
+                if not chunk_rows:
+                    break
+
+                # Rows the triggers already wrote are newer than the old table's copy
+                await tx.execute(
+                    f'INSERT OR IGNORE INTO "{temp_table}" ({key}{col_list}) '
+                    f'SELECT {key}{col_list} FROM "{table}" WHERE rowid > ? AND rowid <= ?',
+                    last_rowid if last_rowid is not None else -(2 ** 63), chunk_end
+                )
+            last_rowid = chunk_end
+            copied += chunk_rows
+            # Let queued reads and writes through between chunks
+            await asyncio.sleep(0)
+
+        async with self.transaction() as tx:
+            # Keeps references in other tables' triggers untouched while the old table is gone
+            await tx.execute("PRAGMA legacy_alter_table=ON")
+            try:
+                await tx.execute(f'DROP TABLE "{table}"')
+                await tx.execute(f'ALTER TABLE "{temp_table}" RENAME TO "{table}"')
+            finally:
+                await tx.execute("PRAGMA legacy_alter_table=OFF")
+            for query in attached:
+                await tx.execute(query)
+
+        logging.info(f"Successfully recreated table {table} with updated schema ({copied} rows copied)")
 
     async def initialize_schema(self):
         schema = DatabaseSchema()
@@ -362,6 +975,7 @@ class Database:
 class DatabaseSchema:
     def __init__(self):
         self.create_table_queries = [
+            SCHEMA_VERSION_TABLE,
             """
             CREATE TABLE IF NOT EXISTS "accounts" (
                 "uuid" TEXT,
@@ -402,10 +1016,15 @@ class DatabaseSchema:
             """
             CREATE TABLE IF NOT EXISTS "roles" (
                 "role_id" INTEGER,
-                "used" TEXT
+                "used" INTEGER DEFAULT 0,
+                UNIQUE ("role_id")
             );
             """,
             """
+            CREATE INDEX IF NOT EXISTS "idx_roles_used"
+            ON "roles" ("used");
+            """,
+            """
             CREATE TABLE IF NOT EXISTS "tickets" (
                 "opened_by" INTEGER,
                 "channel_id" INTEGER,
@@ -425,6 +1044,170 @@ class DatabaseSchema:
             );
             """,
             """
+            CREATE TABLE IF NOT EXISTS "vouch_mentions" (
+                "vouch_rowid" INTEGER,
+                "mentioned_user_id" INTEGER,
+                "amount" INTEGER DEFAULT 0,
+                "position" INTEGER DEFAULT 0
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS "idx_vouch_mentions_user"
+            ON "vouch_mentions" ("mentioned_user_id", "position", "amount");
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS "idx_vouch_mentions_vouch"
+            ON "vouch_mentions" ("vouch_rowid");
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "vouches_delete_mentions"
+            AFTER DELETE ON "vouches"
+            BEGIN
+                DELETE FROM "vouch_mentions" WHERE "vouch_rowid" = OLD.rowid;
+            END;
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "vouch_amounts" (
+                "vouch_rowid" INTEGER PRIMARY KEY,
+                "user_id" INTEGER,
+                "amount" INTEGER DEFAULT 0
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "customer_spending" (
+                "user_id" INTEGER PRIMARY KEY,
+                "username" TEXT,
+                "total_spent" INTEGER DEFAULT 0,
+                "purchase_count" INTEGER DEFAULT 0,
+                "version" INTEGER DEFAULT 0,
+                "checked_version" INTEGER DEFAULT 0
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS "idx_customer_spending_total"
+            ON "customer_spending" ("total_spent", "purchase_count");
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "vouches_delete_amounts"
+            AFTER DELETE ON "vouches"
+            BEGIN
+                DELETE FROM "vouch_amounts" WHERE "vouch_rowid" = OLD.rowid;
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "vouch_amounts_insert_spending"
+            AFTER INSERT ON "vouch_amounts"
+            BEGIN
+                INSERT INTO "customer_spending" ("user_id", "username", "total_spent", "purchase_count", "version")
+                VALUES (NEW."user_id", (SELECT "username" FROM "vouches" WHERE rowid = NEW."vouch_rowid"), NEW."amount", 1, 1)
+                ON CONFLICT ("user_id") DO UPDATE SET
+                    "username" = COALESCE(excluded."username", "username"),
+                    "total_spent" = "total_spent" + excluded."total_spent",
+                    "purchase_count" = "purchase_count" + 1,
+                    "version" = "version" + 1;
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "vouch_amounts_delete_spending"
+            AFTER DELETE ON "vouch_amounts"
+            BEGIN
+                UPDATE "customer_spending" SET
+                    "total_spent" = "total_spent" - OLD."amount",
+                    "purchase_count" = "purchase_count" - 1,
+                    "version" = "version" + 1
+                WHERE "user_id" = OLD."user_id";
+            END;
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "refresh_jobs" (
+                "job_id" INTEGER PRIMARY KEY,
+                "job_key" TEXT,
+                "created_at" REAL,
+                "finished_at" REAL
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "refresh_job_items" (
+                "job_id" INTEGER,
+                "number" INTEGER,
+                "label" TEXT,
+                "payload" TEXT,
+                "status" TEXT DEFAULT 'pending',
+                "error" TEXT
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS "idx_refresh_job_items_job"
+            ON "refresh_job_items" ("job_id", "number");
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "listing_hashes" (
+                "listing_type" TEXT,
+                "number" INTEGER,
+                "hash" TEXT,
+                PRIMARY KEY ("listing_type", "number")
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "listing_refresh" (
+                "listing_type" TEXT,
+                "number" INTEGER,
+                "last_viewed" REAL,
+                "last_refreshed" REAL,
+                PRIMARY KEY ("listing_type", "number")
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "guild_snapshots" (
+                "guild_id" INTEGER,
+                "name" TEXT,
+                "updated_at" REAL
+            );
+            """,
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS "idx_guild_snapshots_guild"
+            ON "guild_snapshots" ("guild_id");
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "guild_snapshot_members" (
+                "guild_id" INTEGER,
+                "member_id" INTEGER,
+                "bot" INTEGER DEFAULT 0,
+                "roles" TEXT,
+                "updated_at" REAL
+            );
+            """,
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS "idx_guild_snapshot_members_member"
+            ON "guild_snapshot_members" ("guild_id", "member_id");
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "guild_snapshot_channels" (
+                "guild_id" INTEGER,
+                "channel_id" INTEGER,
+                "name" TEXT,
+                "position" INTEGER,
+                "data" TEXT
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS "idx_guild_snapshot_channels_guild"
+            ON "guild_snapshot_channels" ("guild_id", "position");
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "guild_snapshot_roles" (
+                "guild_id" INTEGER,
+                "role_id" INTEGER,
+                "name" TEXT,
+                "position" INTEGER,
+                "data" TEXT
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS "idx_guild_snapshot_roles_guild"
+            ON "guild_snapshot_roles" ("guild_id", "position");
+            """,
+            """
             CREATE TABLE IF NOT EXISTS "alts" (
                 "uuid"	TEXT,
                 "username"	TEXT,
@@ -442,6 +1225,165 @@ class DatabaseSchema:
             );
             """,
             """
+            CREATE TABLE IF NOT EXISTS "listing_free_numbers" (
+                "listing_type" TEXT,
+                "number" INTEGER,
+                PRIMARY KEY ("listing_type", "number")
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "listing_number_counters" (
+                "listing_type" TEXT PRIMARY KEY,
+                "next_number" INTEGER
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS "listing_number_reservations" (
+                "listing_type" TEXT,
+                "number" INTEGER,
+                "reserved_at" REAL,
+                PRIMARY KEY ("listing_type", "number")
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS "idx_accounts_number"
+            ON "accounts" ("number");
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "accounts_insert_number"
+            AFTER INSERT ON "accounts"
+            BEGIN
+                DELETE FROM "listing_free_numbers" WHERE "listing_type" = 'accounts' AND "number" = NEW."number";
+                DELETE FROM "listing_number_reservations" WHERE "listing_type" = 'accounts' AND "number" = NEW."number";
+                INSERT OR IGNORE INTO "listing_free_numbers" ("listing_type", "number")
+                SELECT 'accounts', "n" FROM (
+                    WITH RECURSIVE "gap" ("n") AS (
+                        SELECT "next_number" FROM "listing_number_counters"
+                        WHERE "listing_type" = 'accounts' AND "next_number" < NEW."number"
+                        UNION ALL
+                        SELECT "n" + 1 FROM "gap" WHERE "n" + 1 < NEW."number"
+                    )
+                    SELECT "n" FROM "gap"
+                )
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM "listing_number_reservations" WHERE "listing_type" = 'accounts' AND "number" = "n"
+                );
+                UPDATE "listing_number_counters" SET "next_number" = MAX("next_number", NEW."number" + 1)
+                WHERE "listing_type" = 'accounts';
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "accounts_delete_hash"
+            AFTER DELETE ON "accounts"
+            BEGIN
+                DELETE FROM "listing_hashes" WHERE "listing_type" = 'accounts' AND "number" = OLD."number";
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "accounts_delete_number"
+            AFTER DELETE ON "accounts"
+            WHEN OLD."number" IS NOT NULL
+                AND NOT EXISTS (SELECT 1 FROM "accounts" WHERE "number" = OLD."number")
+                AND NOT EXISTS (
+                    SELECT 1 FROM "listing_number_reservations" WHERE "listing_type" = 'accounts' AND "number" = OLD."number"
+                )
+            BEGIN
+                INSERT OR IGNORE INTO "listing_free_numbers" ("listing_type", "number") VALUES ('accounts', OLD."number");
+            END;
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS "idx_profiles_number"
+            ON "profiles" ("number");
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "profiles_insert_number"
+            AFTER INSERT ON "profiles"
+            BEGIN
+                DELETE FROM "listing_free_numbers" WHERE "listing_type" = 'profiles' AND "number" = NEW."number";
+                DELETE FROM "listing_number_reservations" WHERE "listing_type" = 'profiles' AND "number" = NEW."number";
+                INSERT OR IGNORE INTO "listing_free_numbers" ("listing_type", "number")
+                SELECT 'profiles', "n" FROM (
+                    WITH RECURSIVE "gap" ("n") AS (
+                        SELECT "next_number" FROM "listing_number_counters"
+                        WHERE "listing_type" = 'profiles' AND "next_number" < NEW."number"
+                        UNION ALL
+                        SELECT "n" + 1 FROM "gap" WHERE "n" + 1 < NEW."number"
+                    )
+                    SELECT "n" FROM "gap"
+                )
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM "listing_number_reservations" WHERE "listing_type" = 'profiles' AND "number" = "n"
+                );
+                UPDATE "listing_number_counters" SET "next_number" = MAX("next_number", NEW."number" + 1)
+                WHERE "listing_type" = 'profiles';
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "profiles_delete_hash"
+            AFTER DELETE ON "profiles"
+            BEGIN
+                DELETE FROM "listing_hashes" WHERE "listing_type" = 'profiles' AND "number" = OLD."number";
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "profiles_delete_number"
+            AFTER DELETE ON "profiles"
+            WHEN OLD."number" IS NOT NULL
+                AND NOT EXISTS (SELECT 1 FROM "profiles" WHERE "number" = OLD."number")
+                AND NOT EXISTS (
+                    SELECT 1 FROM "listing_number_reservations" WHERE "listing_type" = 'profiles' AND "number" = OLD."number"
+                )
+            BEGIN
+                INSERT OR IGNORE INTO "listing_free_numbers" ("listing_type", "number") VALUES ('profiles', OLD."number");
+            END;
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS "idx_alts_number"
+            ON "alts" ("number");
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "alts_insert_number"
+            AFTER INSERT ON "alts"
+            BEGIN
+                DELETE FROM "listing_free_numbers" WHERE "listing_type" = 'alts' AND "number" = NEW."number";
+                DELETE FROM "listing_number_reservations" WHERE "listing_type" = 'alts' AND "number" = NEW."number";
+                INSERT OR IGNORE INTO "listing_free_numbers" ("listing_type", "number")
+                SELECT 'alts', "n" FROM (
+                    WITH RECURSIVE "gap" ("n") AS (
+                        SELECT "next_number" FROM "listing_number_counters"
+                        WHERE "listing_type" = 'alts' AND "next_number" < NEW."number"
+                        UNION ALL
+                        SELECT "n" + 1 FROM "gap" WHERE "n" + 1 < NEW."number"
+                    )
+                    SELECT "n" FROM "gap"
+                )
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM "listing_number_reservations" WHERE "listing_type" = 'alts' AND "number" = "n"
+                );
+                UPDATE "listing_number_counters" SET "next_number" = MAX("next_number", NEW."number" + 1)
+                WHERE "listing_type" = 'alts';
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "alts_delete_hash"
+            AFTER DELETE ON "alts"
+            BEGIN
+                DELETE FROM "listing_hashes" WHERE "listing_type" = 'alts' AND "number" = OLD."number";
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS "alts_delete_number"
+            AFTER DELETE ON "alts"
+            WHEN OLD."number" IS NOT NULL
+                AND NOT EXISTS (SELECT 1 FROM "alts" WHERE "number" = OLD."number")
+                AND NOT EXISTS (
+                    SELECT 1 FROM "listing_number_reservations" WHERE "listing_type" = 'alts' AND "number" = OLD."number"
+                )
+            BEGIN
+                INSERT OR IGNORE INTO "listing_free_numbers" ("listing_type", "number") VALUES ('alts', OLD."number");
+            END;
+            """,
+            """
             CREATE TABLE IF NOT EXISTS "sellers" (
                 "user_id"	INTEGER,
                 "payment_methods"	TEXT
@@ -698,4 +1640,11 @@ class DatabaseSchema:
                 PRIMARY KEY ("guild_id", "action_type", "channel_type")
             )
             """
-        ]
\ No newline at end of file
+        ]
+
+    def fingerprint(self) -> str:
+        """
+        Hash of the schema definition; when it matches the stored one the schema diff is skipped.
+        """
+        normalized = "\n".join(" ".join(query.split()) for query in self.create_table_queries)
+        return hashlib.sha256(normalized.encode()).hexdigest()
@@ -1,10 +1,9 @@
 from fastapi import FastAPI, HTTPException, Request, Query, WebSocket, WebSocketDisconnect, Response, Depends
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response as StarletteResponse
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 import os
-import aiohttp
 import json
 from dotenv import load_dotenv
 import base64
@@ -16,6 +15,10 @@ from functools import lru_cache, wraps
 import logging
 import uuid
 import httpx
+from collections import OrderedDict
+import heapq
+import sqlite3
+import urllib.parse
 
 load_dotenv()
 APP_API_KEY = os.getenv("API_KEY")
@@ -34,8 +37,47 @@ DISCORD_TOKEN_URL = "https://discord.com/api/oauth2/token"
 DISCORD_USER_URL = "https://discord.com/api/users/@me"
 
 SESSION_LIFETIME = timedelta(hours=int(os.getenv("SESSION_LIFETIME_HOURS", "24")))
-
-DISALLOWED_FILES = {"parent_api"}
+# memory (single worker), sqlite or redis (shared across uvicorn workers and restarts)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory").lower()
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.db")
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://127.0.0.1:6379/0")
+SESSION_REDIS_PREFIX = os.getenv("SESSION_REDIS_PREFIX", "listingbot:")
+
+DOMAIN_INDEX_REFRESH_SECONDS = int(os.getenv("DOMAIN_INDEX_REFRESH_SECONDS", "300"))
+DOMAIN_INDEX_MISS_REFRESH_SECONDS = int(os.getenv("DOMAIN_INDEX_MISS_REFRESH_SECONDS", "30"))
+
+EMAIL_INDEX_FILE = os.getenv("EMAIL_INDEX_FILE", "email_index.json")
+EMAIL_INDEX_REFRESH_SECONDS = int(os.getenv("EMAIL_INDEX_REFRESH_SECONDS", "1800"))
+EMAIL_INDEX_MISS_REFRESH_SECONDS = int(os.getenv("EMAIL_INDEX_MISS_REFRESH_SECONDS", "30"))
+
+PROXY_CACHE_MAX_BYTES = int(os.getenv("PROXY_CACHE_MAX_MB", "64")) * 1024 * 1024
+PROXY_CACHE_MAX_ENTRY_BYTES = int(os.getenv("PROXY_CACHE_MAX_ENTRY_MB", "8")) * 1024 * 1024
+# Fallback freshness for fingerprinted build output when upstream sends max-age=0
+PROXY_CACHE_ASSET_TTL_SECONDS = int(os.getenv("PROXY_CACHE_ASSET_TTL_SECONDS", "3600"))
+
+# Connection pools: one for the shop frontend, one per bot, one for external APIs
+PROXY_MAX_CONNECTIONS = int(os.getenv("PROXY_MAX_CONNECTIONS", "100"))
+PROXY_MAX_KEEPALIVE = int(os.getenv("PROXY_MAX_KEEPALIVE", "20"))
+PROXY_KEEPALIVE_EXPIRY = float(os.getenv("PROXY_KEEPALIVE_EXPIRY", "30"))
+BOT_POOL_MAX_CONNECTIONS = int(os.getenv("BOT_POOL_MAX_CONNECTIONS", "10"))
+BOT_POOL_MAX_KEEPALIVE = int(os.getenv("BOT_POOL_MAX_KEEPALIVE", "5"))
+BOT_POOL_KEEPALIVE_EXPIRY = float(os.getenv("BOT_POOL_KEEPALIVE_EXPIRY", "60"))
+# Bots serve plain HTTP, so HTTP/2 there means prior-knowledge h2c; needs the h2 package
+INTERNAL_HTTP2 = os.getenv("INTERNAL_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# Shared with the bots, which register and heartbeat into it on startup
+SERVICE_REGISTRY_PATH = os.getenv("SERVICE_REGISTRY_PATH", "registry.db")
+REGISTRY_POLL_SECONDS = float(os.getenv("REGISTRY_POLL_SECONDS", "0.5"))
+# Bots heartbeat every 30 seconds; one silent for this long is no longer routed to
+REGISTRY_STALE_SECONDS = float(os.getenv("REGISTRY_STALE_SECONDS", "120"))
+
+# Consecutive connect errors/timeouts before a bot is skipped, and how long for
+BOT_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("BOT_CIRCUIT_FAILURE_THRESHOLD", "3"))
+BOT_CIRCUIT_OPEN_SECONDS = float(os.getenv("BOT_CIRCUIT_OPEN_SECONDS", "15"))
+BOT_CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv("BOT_CIRCUIT_MAX_OPEN_SECONDS", "300"))
+
+SCATTER_DEFAULT_DEADLINE = float(os.getenv("SCATTER_DEFAULT_DEADLINE", "5"))
+SCATTER_MAX_DEADLINE = float(os.getenv("SCATTER_MAX_DEADLINE", "30"))
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -76,105 +118,958 @@ def load_approved_domains() -> Set[str]:
         # In case of error, return an empty set to prevent unauthorized access
         return set()
 
-class AppCache:
-    """Centralized cache for application data"""
-    def __init__(self):
-        self._ports: Optional[Dict] = None
-        self._bots: Optional[List[str]] = None
-        self._last_ports_update: Optional[datetime] = None
-        self._last_bots_update: Optional[datetime] = None
-        self._cache_ttl = timedelta(minutes=5)  # 5-minute cache TTL
-    
-    def is_cache_valid(self, last_update: Optional[datetime]) -> bool:
-        if last_update is None:
-            return False
-        return datetime.now() - last_update < self._cache_ttl
-    
-    def get_ports(self) -> Optional[Dict]:
-        if self.is_cache_valid(self._last_ports_update):
-            return self._ports
-        return None
-    
-    def set_ports(self, ports: Dict):
-        self._ports = ports
-        self._last_ports_update = datetime.now()
-    
-    def get_bots(self) -> Optional[List[str]]:
-        if self.is_cache_valid(self._last_bots_update):
-            return self._bots
-        return None
-    
-    def set_bots(self, bots: List[str]):
-        self._bots = bots
-        self._last_bots_update = datetime.now()
+class ServiceRegistry:
+    """
+    Read side of the bot service registry. Bots create the registry, register
+    and heartbeat into it themselves (listing-bot/bot/util/registry.py owns the
+    schema); parent_api keeps the routing table in memory, reloads it whenever
+    another process commits a change and stops routing to bots whose heartbeat
+    has gone stale.
+    """
+    def __init__(self, path: str, stale_seconds: float):
+        self.path = path
+        self.stale_seconds = stale_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._services: Dict[str, Dict] = {}
+        self._ports: Dict[str, int] = {}
+        self._stale: Set[str] = set()
+        self._lock = asyncio.Lock()
+        self.reloads = 0
+        self.last_reload: Optional[float] = None
+
+    async def run(self, method):
+        """Runs poll/reload off the event loop, one at a time, since sqlite3 can block on a busy registry"""
+        async with self._lock:
+            return await asyncio.to_thread(method)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._conn = conn
+        return self._conn
+
+    def reload(self) -> Dict[str, Set[str]]:
+        """
+        Re-read the registry. Returns the bots that were added, removed,
+        re-registered or moved, went stale or recovered since the last check.
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT bot_name, port, pid, registered_at, last_heartbeat FROM services"
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            # No bot has created the registry yet
+            if "no such table" not in str(e):
+                raise
+            rows = []
+        self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+
+        services = {
+            bot_name: {
+                "port": port,
+                "pid": pid,
+                "registered_at": registered_at,
+                "last_heartbeat": last_heartbeat
+            }
+            for bot_name, port, pid, registered_at, last_heartbeat in rows
+        }
+        previous = self._services
+        changes = {
+            "added": set(services) - set(previous),
+            "removed": set(previous) - set(services),
+            "reregistered": {
+                bot_name for bot_name in set(services) & set(previous)
+                if (services[bot_name]["port"], services[bot_name]["registered_at"])
+                != (previous[bot_name]["port"], previous[bot_name]["registered_at"])
+            }
+        }
+        self._services = services
+        changes.update(self._check_heartbeats())
+        self.reloads += 1
+        self.last_reload = time.time()
+        return changes
+
+    def _check_heartbeats(self) -> Dict[str, Set[str]]:
+        """
+        Drops bots that stopped heartbeating from the routing table. Bots imported
+        from ports.json have never heartbeated and stay routed until they register.
+        """
+        now = time.time()
+        stale = {
+            bot_name for bot_name, service in self._services.items()
+            if service["last_heartbeat"] and now - service["last_heartbeat"] > self.stale_seconds
+        }
+        changes = {
+            "stale": stale - self._stale,
+            "recovered": (self._stale - stale) & set(self._services)
+        }
+        self._stale = stale
+        self._ports = {
+            bot_name: service["port"] for bot_name, service in self._services.items()
+            if bot_name not in stale
+        }
+        return changes
+
+    def poll(self) -> Optional[Dict[str, Set[str]]]:
+        """
+        Cheap change check: PRAGMA data_version only moves when another
+        connection commits, so an idle registry costs one pragma per poll.
+        Heartbeat ages are checked on every poll, since a dead bot commits nothing.
+        """
+        conn = self._connect()
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        changes = self._check_heartbeats() if version == self._data_version else self.reload()
+        return changes if any(changes.values()) else None
+
+    def ports(self) -> Dict[str, int]:
+        if self._data_version is None:
+            self.reload()
+        return self._ports
+
+    def stats(self) -> Dict:
+        now = time.time()
+        return {
+            "services": len(self._services),
+            "stale": sorted(self._stale),
+            "reloads": self.reloads,
+            "last_reload": self.last_reload,
+            "bots": {
+                bot_name: {
+                    "port": service["port"],
+                    "pid": service["pid"],
+                    "seconds_since_heartbeat": round(now - service["last_heartbeat"], 1) if service["last_heartbeat"] else None,
+                    "stale": bot_name in self._stale
+                }
+                for bot_name, service in self._services.items()
+            }
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+class BotHealth:
+    """
+    Per-bot circuit breaker keyed by port. After BOT_CIRCUIT_FAILURE_THRESHOLD
+    consecutive transport failures the circuit opens and requests fail fast;
+    once the cooldown passes a single half-open probe decides whether it closes
+    again or stays open with a doubled cooldown.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, open_seconds: float, max_open_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._bots: Dict[int, Dict] = {}
+        self.short_circuited = 0
+
+    def _entry(self, port: int) -> Dict:
+        entry = self._bots.get(port)
+        if entry is None:
+            entry = self._bots[port] = {
+                "state": self.CLOSED,
+                "consecutive_failures": 0,
+                "total_failures": 0,
+                "short_circuited": 0,
+                "cooldown": self.open_seconds,
+                "open_until": 0.0,
+                "probe_in_flight": False,
+                "last_success": None,
+                "last_failure": None,
+                "last_error": None
+            }
+        return entry
+
+    def allow(self, port: int) -> bool:
+        """Whether a request to this bot should be attempted right now"""
+        entry = self._bots.get(port)
+        if entry is None or entry["state"] == self.CLOSED:
+            return True
+
+        if entry["state"] == self.OPEN and time.monotonic() >= entry["open_until"]:
+            entry["state"] = self.HALF_OPEN
+
+        if entry["state"] == self.HALF_OPEN and not entry["probe_in_flight"]:
+            entry["probe_in_flight"] = True
+            return True
+
+        entry["short_circuited"] += 1
+        self.short_circuited += 1
+        return False
+
+    def record_success(self, port: int):
+        entry = self._bots.get(port)
+        if entry is None:
+            return
+        if entry["state"] != self.CLOSED:
+            logger.info(f"Bot on port {port} recovered, closing circuit")
+        entry.update(
+            state=self.CLOSED,
+            consecutive_failures=0,
+            cooldown=self.open_seconds,
+            probe_in_flight=False,
+            last_success=time.time()
+        )
+
+    def record_failure(self, port: int, error: str):
+        entry = self._entry(port)
+        entry["consecutive_failures"] += 1
+        entry["total_failures"] += 1
+        entry["last_failure"] = time.time()
+        entry["last_error"] = error
+
+        if entry["state"] == self.HALF_OPEN:
+            # Failed probe: back off further before trying again
+            entry["cooldown"] = min(entry["cooldown"] * 2, self.max_open_seconds)
+            self._open(port, entry)
+        elif entry["state"] == self.CLOSED and entry["consecutive_failures"] >= self.failure_threshold:
+            self._open(port, entry)
+
+    def release_probe(self, port: int):
+        """A half-open probe was cancelled before it produced a verdict"""
+        entry = self._bots.get(port)
+        if entry is not None:
+            entry["probe_in_flight"] = False
+
+    def _open(self, port: int, entry: Dict):
+        entry["state"] = self.OPEN
+        entry["probe_in_flight"] = False
+        entry["open_until"] = time.monotonic() + entry["cooldown"]
+        logger.warning(f"Circuit opened for bot on port {port} for {entry['cooldown']:.0f}s after {entry['consecutive_failures']} failures")
+
+    def reset(self, port: int):
+        """Forget a bot's failures, e.g. after it re-registered"""
+        self._bots.pop(port, None)
+
+    def table(self, ports: Dict[str, int]) -> Dict[str, Dict]:
+        now = time.monotonic()
+        table = {}
+        for bot_name, port in ports.items():
+            entry = self._bots.get(port)
+            if entry is None:
+                table[bot_name] = {"port": port, "state": self.CLOSED, "consecutive_failures": 0}
+                continue
+            table[bot_name] = {
+                "port": port,
+                "state": entry["state"],
+                "consecutive_failures": entry["consecutive_failures"],
+                "total_failures": entry["total_failures"],
+                "short_circuited": entry["short_circuited"],
+                "retry_in_seconds": round(max(entry["open_until"] - now, 0), 1) if entry["state"] == self.OPEN else None,
+                "last_success": entry["last_success"],
+                "last_failure": entry["last_failure"],
+                "last_error": entry["last_error"]
+            }
+        return table
+
+def _encode_session(session: Dict) -> str:
+    return json.dumps({
+        **session,
+        "expires_at": session["expires_at"].isoformat(),
+        "created_at": session["created_at"].isoformat()
+    })
+
+def _decode_session(raw: str) -> Dict:
+    session = json.loads(raw)
+    session["expires_at"] = datetime.fromisoformat(session["expires_at"])
+    session["created_at"] = datetime.fromisoformat(session["created_at"])
+    return session
+
+class MemorySessionBackend:
+    """Process-local sessions; an expiry heap keeps cleanup proportional to what expired"""
+    name = "memory"
 
-class SessionStorage:
-    """In-memory session storage with automatic cleanup"""
     def __init__(self):
         self._sessions: Dict[str, Dict] = {}
+        self._expiry: List[Tuple[float, str]] = []
+
+    async def set(self, session_id: str, session: Dict):
+        self._sessions[session_id] = session
+        heapq.heappush(self._expiry, (session["expires_at"].timestamp(), session_id))
+
+    async def get(self, session_id: str) -> Optional[Dict]:
+        session = self._sessions.get(session_id)
+        if session and session["expires_at"] <= datetime.now():
+            del self._sessions[session_id]
+            return None
+        return session
+
+    async def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    async def purge_expired(self) -> int:
+        now = datetime.now()
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now.timestamp():
+            _, session_id = heapq.heappop(self._expiry)
+            session = self._sessions.get(session_id)
+            if session and session["expires_at"] <= now:
+                del self._sessions[session_id]
+                removed += 1
+        return removed
+
+    async def count(self) -> int:
+        await self.purge_expired()
+        return len(self._sessions)
+
+    async def close(self):
+        pass
+
+class SQLiteSessionBackend:
+    """Sessions in a WAL-mode SQLite file so several workers and restarts share them"""
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+        self._lock = asyncio.Lock()
+
+    async def _run(self, query: str, *params) -> sqlite3.Cursor:
+        async with self._lock:
+            return await asyncio.to_thread(self._conn.execute, query, params)
+
+    async def set(self, session_id: str, session: Dict):
+        await self._run(
+            "INSERT OR REPLACE INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?)",
+            session_id, _encode_session(session), session["expires_at"].timestamp()
+        )
+
+    async def get(self, session_id: str) -> Optional[Dict]:
+        cursor = await self._run(
+            "SELECT data FROM sessions WHERE session_id = ? AND expires_at > ?",
+            session_id, time.time()
+        )
+        row = cursor.fetchone()
+        return _decode_session(row[0]) if row else None
+
+    async def delete(self, session_id: str) -> bool:
+        cursor = await self._run("DELETE FROM sessions WHERE session_id = ?", session_id)
+        return cursor.rowcount > 0
+
+    async def purge_expired(self) -> int:
+        cursor = await self._run("DELETE FROM sessions WHERE expires_at <= ?", time.time())
+        return cursor.rowcount
+
+    async def count(self) -> int:
+        cursor = await self._run("SELECT COUNT(*) FROM sessions WHERE expires_at > ?", time.time())
+        return cursor.fetchone()[0]
+
+    async def close(self):
+        self._conn.close()
+
+class RedisError(Exception):
+    pass
+
+class RedisProtocolClient:
+    """Minimal RESP2 client; enough for the session store against any Redis-compatible server"""
+    def __init__(self, url: str):
+        parsed = urllib.parse.urlparse(url)
+        self._host = parsed.hostname or "127.0.0.1"
+        self._port = parsed.port or 6379
+        self._password = parsed.password
+        self._db = int(parsed.path.lstrip("/") or 0)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
         self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+        if self._password:
+            await self._send("AUTH", self._password)
+        if self._db:
+            await self._send("SELECT", self._db)
+
+    async def _send(self, *args) -> Any:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self) -> Any:
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise RedisError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            return (await self._reader.readexactly(length + 2))[:-2].decode()
+        if prefix == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    async def execute(self, *args) -> Any:
+        async with self._lock:
+            if self._writer is None or self._writer.is_closing():
+                await self._connect()
+            try:
+                return await self._send(*args)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Drop the broken connection so the next command reconnects
+                self._writer.close()
+                self._writer = None
+                raise
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+class RedisSessionBackend:
+    """Sessions in Redis with native key TTLs; a sorted set tracks expiry for counting"""
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str):
+        self._client = RedisProtocolClient(url)
+        self._prefix = prefix
+        self._expiry_key = f"{prefix}sessions:expiry"
+
+    def _key(self, session_id: str) -> str:
+        return f"{self._prefix}session:{session_id}"
+
+    async def set(self, session_id: str, session: Dict):
+        ttl = max(int((session["expires_at"] - datetime.now()).total_seconds()), 1)
+        await self._client.execute("SET", self._key(session_id), _encode_session(session), "EX", ttl)
+        await self._client.execute("ZADD", self._expiry_key, session["expires_at"].timestamp(), session_id)
+
+    async def get(self, session_id: str) -> Optional[Dict]:
+        raw = await self._client.execute("GET", self._key(session_id))
+        return _decode_session(raw) if raw else None
+
+    async def delete(self, session_id: str) -> bool:
+        deleted = await self._client.execute("DEL", self._key(session_id))
+        await self._client.execute("ZREM", self._expiry_key, session_id)
+        return deleted > 0
+
+    async def purge_expired(self) -> int:
+        # The session keys expire on their own; only the index needs trimming
+        return await self._client.execute("ZREMRANGEBYSCORE", self._expiry_key, "-inf", time.time())
+
+    async def count(self) -> int:
+        await self.purge_expired()
+        return await self._client.execute("ZCARD", self._expiry_key)
+
+    async def close(self):
+        await self._client.close()
+
+def create_session_backend():
+    if SESSION_BACKEND == "sqlite":
+        return SQLiteSessionBackend(SESSION_DB_PATH)
+    if SESSION_BACKEND == "redis":
+        return RedisSessionBackend(SESSION_REDIS_URL, SESSION_REDIS_PREFIX)
+    if SESSION_BACKEND != "memory":
+        logger.warning(f"Unknown SESSION_BACKEND '{SESSION_BACKEND}', using in-memory sessions")
+    return MemorySessionBackend()
+
+class SessionStorage:
+    """Session storage with automatic expiry on a pluggable backend"""
+    def __init__(self, backend=None):
+        self._backend = backend or create_session_backend()
+
+    @property
+    def backend_name(self) -> str:
+        return self._backend.name
     
     async def create_session(self, discord_id: str, user_info: Dict) -> str:
         """Create a new session and return session ID"""
         session_id = str(uuid.uuid4())
-        expires_at = datetime.now() + SESSION_LIFETIME
         
-        async with self._lock:
-            self._sessions[session_id] = {
-                "discord_id": discord_id,
-                "user_info": user_info,
-                "expires_at": expires_at,
-                "created_at": datetime.now()
-            }
+        await self._backend.set(session_id, {
+            "discord_id": discord_id,
+            "user_info": user_info,
+            "expires_at": datetime.now() + SESSION_LIFETIME,
+            "created_at": datetime.now()
+        })
         
         logger.info(f"Created session {session_id} for Discord user {discord_id}")
         return session_id
     
     async def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session data if it exists and is valid"""
-        async with self._lock:
-            session = self._sessions.get(session_id)
-            if session and session["expires_at"] > datetime.now():
-                return session
-            elif session:
-                # Session expired, remove it
-                del self._sessions[session_id]
-        return None
+        return await self._backend.get(session_id)
     
     async def delete_session(self, session_id: str) -> bool:
         """Delete a session"""
-        async with self._lock:
-            if session_id in self._sessions:
-                del self._sessions[session_id]
-                logger.info(f"Deleted session {session_id}")
-                return True
+        if await self._backend.delete(session_id):
+            logger.info(f"Deleted session {session_id}")
+            return True
         return False
     
     async def cleanup_expired_sessions(self):
         """Remove expired sessions"""
-        now = datetime.now()
-        async with self._lock:
-            expired_sessions = [
-                session_id for session_id, session in self._sessions.items()
-                if session["expires_at"] <= now
-            ]
-            for session_id in expired_sessions:
-                del self._sessions[session_id]
+        removed = await self._backend.purge_expired()
         
-        if expired_sessions:
-            logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
+        if removed:
+            logger.info(f"Cleaned up {removed} expired sessions")
     
     async def get_active_sessions_count(self) -> int:
         """Get the number of active sessions"""
-        await self.cleanup_expired_sessions()
-        return len(self._sessions)
+        return await self._backend.count()
+
+    async def close(self):
+        await self._backend.close()
+
+class DomainIndex:
+    """In-memory domain -> (bot_name, port) routing index"""
+    def __init__(self):
+        self._domains: Dict[str, Tuple[str, int]] = {}
+        self._bot_domains: Dict[str, str] = {}
+        self._lock = asyncio.Lock()
+        self._last_refresh: Optional[datetime] = None
+        self.hits = 0
+        self.misses = 0
+        self.refresh_count = 0
+        self.last_refresh_ms: Optional[float] = None
+        self.max_refresh_ms: float = 0.0
+        self._total_refresh_ms: float = 0.0
+
+    @property
+    def is_built(self) -> bool:
+        return self._last_refresh is not None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        return self._lock
+
+    def seconds_since_refresh(self) -> Optional[float]:
+        if self._last_refresh is None:
+            return None
+        return (datetime.now() - self._last_refresh).total_seconds()
+
+    def lookup(self, domain: str, count: bool = True) -> Optional[Tuple[str, int]]:
+        """O(1) lookup of the bot serving a domain"""
+        entry = self._domains.get(domain.lower())
+        if not count:
+            return entry
+        if entry:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def replace(self, bot_domains: List[Tuple[str, int, Optional[str]]], elapsed_ms: float):
+        """Swap in a freshly built index; the first bot claiming a domain wins"""
+        domains: Dict[str, Tuple[str, int]] = {}
+        by_bot: Dict[str, str] = {}
+        for bot_name, port, domain in bot_domains:
+            if not domain:
+                continue
+            domain = domain.lower()
+            by_bot[bot_name] = domain
+            domains.setdefault(domain, (bot_name, port))
+
+        self._domains = domains
+        self._bot_domains = by_bot
+        self._last_refresh = datetime.now()
+        self.refresh_count += 1
+        self.last_refresh_ms = elapsed_ms
+        self.max_refresh_ms = max(self.max_refresh_ms, elapsed_ms)
+        self._total_refresh_ms += elapsed_ms
+
+    def update_bot(self, bot_name: str, port: int, domain: Optional[str]):
+        """Re-point a single bot after its domain config changed"""
+        old_domain = self._bot_domains.pop(bot_name, None)
+        if old_domain and self._domains.get(old_domain, (None,))[0] == bot_name:
+            del self._domains[old_domain]
+
+        if domain:
+            domain = domain.lower()
+            self._bot_domains[bot_name] = domain
+            self._domains[domain] = (bot_name, port)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "domains": len(self._domains),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "refresh_count": self.refresh_count,
+            "last_refresh": self._last_refresh.isoformat() if self._last_refresh else None,
+            "last_refresh_ms": self.last_refresh_ms,
+            "avg_refresh_ms": round(self._total_refresh_ms / self.refresh_count, 2) if self.refresh_count else None,
+            "max_refresh_ms": self.max_refresh_ms
+        }
+
+class EmailIndex:
+    """Persistent, case-folded email -> bot_name index"""
+    def __init__(self, path: str):
+        self._path = path
+        self._emails: Dict[str, str] = {}
+        self._bot_emails: Dict[str, str] = {}
+        self._lock = asyncio.Lock()
+        self._last_refresh: Optional[datetime] = None
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        return self._lock
+
+    @staticmethod
+    def normalize(email: str) -> str:
+        return email.strip().casefold()
+
+    def load(self):
+        try:
+            with open(self._path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError as e:
+            logger.error(f"Could not parse {self._path}: {e}")
+            return
+
+        self._bot_emails = {
+            bot_name: self.normalize(email)
+            for bot_name, email in data.items() if email
+        }
+        self._emails = {email: bot_name for bot_name, email in self._bot_emails.items()}
+        logger.info(f"Loaded {len(self._emails)} emails from {self._path}")
+
+    def save(self):
+        tmp_path = f"{self._path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._bot_emails, f, indent=4)
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.error(f"Could not write {self._path}: {e}")
+
+    def seconds_since_refresh(self) -> Optional[float]:
+        if self._last_refresh is None:
+            return None
+        return (datetime.now() - self._last_refresh).total_seconds()
+
+    def mark_refreshed(self):
+        self._last_refresh = datetime.now()
+
+    def lookup(self, email: str, count: bool = True) -> Optional[str]:
+        bot_name = self._emails.get(self.normalize(email))
+        if count:
+            if bot_name:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return bot_name
+
+    def update_bot(self, bot_name: str, email: Optional[str], persist: bool = True) -> bool:
+        """Set or clear a single bot's email; returns whether anything changed"""
+        email = self.normalize(email) if email else None
+        old_email = self._bot_emails.get(bot_name)
+        if old_email == email:
+            return False
+
+        if old_email and self._emails.get(old_email) == bot_name:
+            del self._emails[old_email]
+
+        if email:
+            self._bot_emails[bot_name] = email
+            self._emails[email] = bot_name
+        else:
+            self._bot_emails.pop(bot_name, None)
+
+        if persist:
+            self.save()
+        return True
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "emails": len(self._emails),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "last_refresh": self._last_refresh.isoformat() if self._last_refresh else None
+        }
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into {directive: argument}"""
+    directives: Dict[str, Optional[str]] = {}
+    if not value:
+        return directives
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') or None
+    return directives
+
+class ProxyCache:
+    """Size-bounded LRU byte cache for proxied shop frontend responses"""
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self._entries: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        # Request headers each URL's responses vary on, as last announced by upstream
+        self._vary: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        self._size = 0
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def key_for(self, bot_name: str, url: str, request_headers) -> Tuple:
+        names = self._vary.get((bot_name, url), ())
+        return (bot_name, url, tuple(request_headers.get(name, "") for name in names))
+
+    def set_vary(self, bot_name: str, url: str, names: Tuple[str, ...]):
+        self._vary[(bot_name, url)] = names
+
+    def get(self, key: Tuple) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return entry["expires_at"] > time.monotonic()
+
+    def put(self, key: Tuple, status_code: int, headers: Dict[str, str], body: bytes, ttl: float):
+        size = len(body)
+        if size > self.max_entry_bytes:
+            return
+
+        self.remove(key)
+        self._entries[key] = {
+            "status_code": status_code,
+            "headers": headers,
+            "body": body,
+            "etag": headers.get("etag"),
+            "expires_at": time.monotonic() + ttl,
+            "size": size
+        }
+        self._size += size
+
+        while self._size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted["size"]
+            self.evictions += 1
+
+    def touch(self, entry: Dict, ttl: float):
+        """Extend an entry's freshness after a successful upstream revalidation"""
+        entry["expires_at"] = time.monotonic() + ttl
+
+    def remove(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._size -= entry["size"]
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "revalidations": self.revalidations,
+            "not_modified_served": self.not_modified,
+            "evictions": self.evictions
+        }
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class _MeteredStream(httpx.AsyncByteStream):
+    """Response stream that releases its pool slot in the metrics once closed"""
+    def __init__(self, stream: httpx.AsyncByteStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close:
+                self._on_close()
+                self._on_close = None
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records pool utilization and request latency"""
+    def __init__(self, name: str, limits: httpx.Limits, http1: bool = True, http2: bool = False):
+        self.name = name
+        self.limits = limits
+        self.http2 = http2
+        self._transport = httpx.AsyncHTTPTransport(limits=limits, http1=http1, http2=http2)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self._total_ms = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+
+        def release():
+            self.in_flight -= 1
+            self._total_ms += (time.perf_counter() - started) * 1000
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            self.errors += 1
+            release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_MeteredStream(response.stream, release),
+            extensions=response.extensions
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+    def stats(self) -> Dict:
+        connections = []
+        pool = getattr(self._transport, "_pool", None)
+        if pool is not None:
+            connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        max_connections = self.limits.max_connections
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "max_connections": max_connections,
+            "utilization": round(self.in_flight / max_connections, 4) if max_connections else None,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "avg_request_ms": round(self._total_ms / self.requests, 2) if self.requests else None,
+            "http2": self.http2
+        }
+
+class InternalTransport:
+    """Pooled HTTP clients for every outbound call made by parent_api"""
+    def __init__(self):
+        http2 = INTERNAL_HTTP2 and _http2_available()
+        if INTERNAL_HTTP2 and not http2:
+            logger.warning("INTERNAL_HTTP2 is enabled but the h2 package is not installed, using HTTP/1.1")
+
+        self._bot_http2 = http2
+        self._bot_limits = httpx.Limits(
+            max_connections=BOT_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=BOT_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=BOT_POOL_KEEPALIVE_EXPIRY
+        )
+        self._bot_clients: Dict[int, httpx.AsyncClient] = {}
+        self._transports: Dict[str, MeteredTransport] = {}
+
+        self.frontend = self._client(
+            "frontend",
+            httpx.Limits(
+                max_connections=PROXY_MAX_CONNECTIONS,
+                max_keepalive_connections=PROXY_MAX_KEEPALIVE,
+                keepalive_expiry=PROXY_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0)
+        )
+        self.external = self._client(
+            "external",
+            httpx.Limits(max_connections=20, max_keepalive_connections=5, keepalive_expiry=30),
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            http2=http2
+        )
+
+    def _client(self, name: str, limits: httpx.Limits, timeout: httpx.Timeout, http2: bool = False, **kwargs) -> httpx.AsyncClient:
+        transport = MeteredTransport(name, limits, http2=http2)
+        self._transports[name] = transport
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=timeout,
+            headers={"User-Agent": "ListingBot-Parent-API/1.0"},
+            **kwargs
+        )
+
+    def bot_client(self, port: int) -> httpx.AsyncClient:
+        """Keep-alive client dedicated to a single bot"""
+        client = self._bot_clients.get(port)
+        if client is None:
+            name = f"bot:{port}"
+            transport = MeteredTransport(
+                name,
+                self._bot_limits,
+                http1=not self._bot_http2,
+                http2=self._bot_http2
+            )
+            self._transports[name] = transport
+            client = httpx.AsyncClient(
+                transport=transport,
+                base_url=f"http://{BOT_SERVICE_HOST}:{port}",
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                headers={"User-Agent": "ListingBot-Parent-API/1.0"}
+            )
+            self._bot_clients[port] = client
+        return client
+
+    async def aclose(self):
+        clients = [self.frontend, self.external, *self._bot_clients.values()]
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+        self._bot_clients.clear()
+
+    def stats(self) -> Dict:
+        return {name: transport.stats() for name, transport in self._transports.items()}
 
 class App(FastAPI):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.session: Optional[aiohttp.ClientSession] = None
-        self.cache = AppCache()
+        self.transport = InternalTransport()
+        self.registry = ServiceRegistry(SERVICE_REGISTRY_PATH, REGISTRY_STALE_SECONDS)
+        self.bot_health = BotHealth(
+            BOT_CIRCUIT_FAILURE_THRESHOLD,
+            BOT_CIRCUIT_OPEN_SECONDS,
+            BOT_CIRCUIT_MAX_OPEN_SECONDS
+        )
         self.sessions = SessionStorage()
+        self.domain_index = DomainIndex()
+        self.email_index = EmailIndex(EMAIL_INDEX_FILE)
+        self.proxy_cache = ProxyCache(PROXY_CACHE_MAX_BYTES, PROXY_CACHE_MAX_ENTRY_BYTES)
 
 app = App(
     title="Listing Bot API",
@@ -272,28 +1167,18 @@ os.makedirs("static", exist_ok=True)
 
 @app.on_event("startup")
 async def startup_event():
-    # Create session with optimized connector settings
-    connector = aiohttp.TCPConnector(
-        limit=100,  # Total connection pool size
-        limit_per_host=30,  # Max connections per host
-        ttl_dns_cache=300,  # DNS cache TTL
-        use_dns_cache=True,
-        keepalive_timeout=30,
-        enable_cleanup_closed=True
-    )
-    
-    # Configure session with timeout and connection settings
-    timeout = aiohttp.ClientTimeout(total=30, connect=5)
-    app.session = aiohttp.ClientSession(
-        connector=connector,
-        timeout=timeout,
-        headers={"User-Agent": "ListingBot-Parent-API/1.0"}
-    )
-    
+    # Load the routing table off the event loop before anything asks for ports
+    await app.registry.run(app.registry.reload)
+
     # Start background task for session cleanup
     asyncio.create_task(session_cleanup_task())
-    
-    logger.info("Application started with optimized HTTP session and session management")
+
+    # Build the domain routing index and keep it fresh
+    asyncio.create_task(domain_index_refresh_task())
+    asyncio.create_task(email_index_refresh_task())
+    asyncio.create_task(registry_watch_task())
+
+    logger.info("Application started with pooled HTTP transport and session management")
 
 async def session_cleanup_task():
     """Background task to clean up expired sessions every hour"""
@@ -304,124 +1189,214 @@ async def session_cleanup_task():
         except Exception as e:
             logger.error(f"Error in session cleanup task: {e}")
 
+async def registry_watch_task():
+    """Background task that picks up bot registrations as soon as they commit"""
+    while True:
+        try:
+            changes = await app.registry.run(app.registry.poll)
+            if changes:
+                logger.info("Service registry changed: " + "; ".join(
+                    f"{kind} {', '.join(sorted(bot_names))}" for kind, bot_names in changes.items() if bot_names
+                ))
+                ports = app.registry.ports()
+                for bot_name in changes["added"] | changes["reregistered"] | changes["recovered"]:
+                    # A (re)registered bot starts with a clean circuit
+                    if bot_name in ports:
+                        app.bot_health.reset(ports[bot_name])
+        except Exception as e:
+            logger.error(f"Error in registry watch task: {e}")
+        await asyncio.sleep(REGISTRY_POLL_SECONDS)
+
+async def domain_index_refresh_task():
+    """Background task to rebuild the domain routing index on a schedule"""
+    while True:
+        try:
+            await refresh_domain_index()
+        except Exception as e:
+            logger.error(f"Error in domain index refresh task: {e}")
+        await asyncio.sleep(DOMAIN_INDEX_REFRESH_SECONDS)
+
+async def email_index_refresh_task():
+    """Background task to reconcile the email index with every bot"""
+    while True:
+        try:
+            await refresh_email_index()
+        except Exception as e:
+            logger.error(f"Error in email index refresh task: {e}")
+        await asyncio.sleep(EMAIL_INDEX_REFRESH_SECONDS)
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up resources on shutdown"""
-    if app.session:
-        await app.session.close()
+    await app.transport.aclose()
+    await app.sessions.close()
+    app.registry.close()
     logger.info("Application shutdown complete")
 
 async def get_listing_bots() -> List[str]:
-    """Get listing bots with caching"""
-    cached_bots = app.cache.get_bots()
-    if cached_bots is not None:
-        return cached_bots
-    
-    try:
-        bots = [file for file in os.listdir("../") if file not in DISALLOWED_FILES]
-        app.cache.set_bots(bots)
-        return bots
-    except OSError as e:
-        logger.error(f"Error reading bot directories: {e}")
-        return []
+    """Get the names of all registered listing bots"""
+    return list(get_ports())
 
 def get_ports() -> Dict:
-    """Get ports configuration with caching and error handling"""
-    cached_ports = app.cache.get_ports()
-    if cached_ports is not None:
-        return cached_ports
-    
+    """Get the bot -> port routing table from the service registry"""
     try:
-        with open("./ports.json") as f:
-            ports = json.load(f)
-            app.cache.set_ports(ports)
-            return ports
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        logger.error(f"Error loading ports configuration: {e}")
+        return app.registry.ports()
+    except sqlite3.Error as e:
+        logger.error(f"Error loading service registry: {e}")
         raise HTTPException(status_code=500, detail="Error loading ports configuration")
 
 async def make_bot_request(port: int, endpoint: str, timeout: int = 10, data: Any = None) -> Tuple[bool, Dict]:
     """
-    Make an optimized request to a bot endpoint
+    Make a request to a bot endpoint over that bot's keep-alive connection pool
     Returns: (success, response_data)
     """
-    url = f"http://{BOT_SERVICE_HOST}:{port}{endpoint}"
-    if "?" in url:
-        url += f"&api_key={INTERNAL_API_KEY}"
-    else:
-        url += f"?api_key={INTERNAL_API_KEY}"
+    health = app.bot_health
+    if not health.allow(port):
+        return False, {"error": "Bot is not responding", "circuit_open": True}
+
+    client = app.transport.bot_client(port)
     
     try:
         if data is not None:
             # Make POST request with JSON data
-            async with app.session.post(
-                url, 
+            response = await client.post(
+                endpoint,
+                params={"api_key": INTERNAL_API_KEY},
                 json=data,
-                timeout=aiohttp.ClientTimeout(total=timeout),
-                headers={'Content-Type': 'application/json'}
-            ) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return True, response_data
-                else:
-                    error_data = await response.json() if response.content_type == 'application/json' else {"error": "Unknown error"}
-                    return False, error_data
+                timeout=timeout
+            )
         else:
-            # Make GET request
-            async with app.session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    return True, response_data
-                else:
-                    error_data = await response.json() if response.content_type == 'application/json' else {"error": "Unknown error"}
-                    return False, error_data
-    except aiohttp.ClientConnectorError:
+            response = await client.get(
+                endpoint,
+                params={"api_key": INTERNAL_API_KEY},
+                timeout=timeout
+            )
+
+        # Any HTTP answer means the bot process is alive
+        health.record_success(port)
+
+        if response.status_code == 200:
+            return True, response.json()
+
+        is_json = response.headers.get("content-type", "").startswith("application/json")
+        return False, response.json() if is_json else {"error": "Unknown error"}
+    except httpx.ConnectError:
         logger.warning(f"Bot on port {port} is not responding")
+        health.record_failure(port, "not responding")
         return False, {"error": "Bot is not responding"}
-    except asyncio.TimeoutError:
+    except httpx.TimeoutException:
         logger.warning(f"Request to bot on port {port} timed out")
+        health.record_failure(port, "timed out")
         return False, {"error": "Request timed out"}
+    except asyncio.CancelledError:
+        health.release_probe(port)
+        raise
     except Exception as e:
         logger.error(f"Error making request to bot on port {port}: {e}")
+        if isinstance(e, httpx.TransportError):
+            health.record_failure(port, str(e) or type(e).__name__)
+        else:
+            health.release_probe(port)
         return False, {"error": f"Request failed: {str(e)}"}
 
+def _email_from_response(result: Any) -> Tuple[bool, Optional[str]]:
+    """
+    Interpret a /get/email response
+    Returns: (known, email) where known is False if the bot could not be reached
+    """
+    if isinstance(result, Exception):
+        return False, None
+
+    success, data = result
+    if success:
+        return True, data.get("email")
+    # The bot answered but has no email configured
+    if data.get("success") is False:
+        return True, None
+    return False, None
+
+async def refresh_email_index():
+    """
+    Fan /get/email out to every bot once and reconcile the persisted email index.
+    Concurrent callers wait for the running refresh instead of starting another.
+    """
+    index = app.email_index
+    if index.lock.locked():
+        async with index.lock:
+            return
+
+    async with index.lock:
+        bots = await get_listing_bots()
+        ports = get_ports()
+
+        tasks = []
+        bot_names = []
+
+        for bot_name in bots:
+            port = ports.get(bot_name)
+            if port:
+                tasks.append(make_bot_request(port, "/get/email", timeout=5))
+                bot_names.append(bot_name)
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        changed = False
+        for bot_name, result in zip(bot_names, results):
+            known, bot_email = _email_from_response(result)
+            if known:
+                changed |= index.update_bot(bot_name, bot_email, persist=False)
+
+        if changed:
+            index.save()
+        index.mark_refreshed()
+        logger.info(f"Email index reconciled with {len(bot_names)} bots")
+
+async def refresh_bot_email(bot_name: str) -> Optional[str]:
+    """Re-query a single bot's email and update the index"""
+    port = get_ports().get(bot_name)
+    if not port:
+        app.email_index.update_bot(bot_name, None)
+        return None
+
+    known, bot_email = _email_from_response(
+        await make_bot_request(port, "/get/email", timeout=5)
+    )
+    if known:
+        app.email_index.update_bot(bot_name, bot_email)
+    return bot_email
+
 async def find_bot_by_email(email: str) -> Tuple[Optional[str], Optional[int]]:
     """
-    Find a bot by email address efficiently using concurrent requests
+    Find a bot by email address using the email index, falling back to a
+    fan-out over all bots only when the index misses or is stale
     Returns: (bot_name, port) or (None, None) if not found
     """
-    bots = await get_listing_bots()
-    ports = get_ports()
-    
-    # Create concurrent tasks for all bots
-    tasks = []
-    bot_port_pairs = []
-    
-    for bot_name in bots:
-        port = ports.get(bot_name)
+    index = app.email_index
+    normalized = index.normalize(email)
+
+    bot_name = index.lookup(email)
+    if bot_name:
+        # Confirm with the single indexed bot before acting on a payment
+        port = get_ports().get(bot_name)
         if port:
-            task = make_bot_request(port, "/get/email", timeout=5)
-            tasks.append(task)
-            bot_port_pairs.append((bot_name, port))
-    
-    if not tasks:
-        return None, None
-    
-    # Execute all requests concurrently
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Check results for matching email
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            continue
-            
-        success, data = result
-        if success:
-            bot_email = data.get("email")
-            if bot_email and bot_email.lower() == email.lower():
-                bot_name, port = bot_port_pairs[i]
+            bot_email = await refresh_bot_email(bot_name)
+            if bot_email and index.normalize(bot_email) == normalized:
                 return bot_name, port
-    
+    else:
+        # Unknown emails only trigger a fan-out once per interval
+        since_refresh = index.seconds_since_refresh()
+        if since_refresh is not None and since_refresh < EMAIL_INDEX_MISS_REFRESH_SECONDS:
+            return None, None
+
+    await refresh_email_index()
+
+    # Already counted by the lookup above
+    bot_name = index.lookup(email, count=False)
+    if bot_name:
+        port = get_ports().get(bot_name)
+        if port:
+            return bot_name, port
+
     return None, None
 
 async def get_token(bot_name: str) -> Dict:
@@ -691,64 +1666,64 @@ async def discord_callback(
     
     try:
         # Exchange code for access token
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                DISCORD_TOKEN_URL,
-                data={
-                    'client_id': DISCORD_CLIENT_ID,
-                    'client_secret': DISCORD_CLIENT_SECRET,
-                    'grant_type': 'authorization_code',
-                    'code': code,
-                    'redirect_uri': DISCORD_REDIRECT_URI,
-                    'scope': 'identify'
-                },
-                headers={'Content-Type': 'application/x-www-form-urlencoded'}
-            )
-            
-            if token_response.status_code != 200:
-                logger.error(f"Discord token exchange failed: {token_response.text}")
-                raise HTTPException(status_code=400, detail="Failed to retrieve access token")
-            
-            token_data = token_response.json()
-            access_token = token_data['access_token']
-            
-            # Get user information
-            user_response = await client.get(
-                DISCORD_USER_URL,
-                headers={'Authorization': f"Bearer {access_token}"}
-            )
-            
-            if user_response.status_code != 200:
-                logger.error(f"Discord user info fetch failed: {user_response.text}")
-                raise HTTPException(status_code=400, detail="Failed to retrieve user information")
-            
-            user_info = user_response.json()
-            discord_id = user_info['id']
-            
-            # Create session
-            session_id = await app.sessions.create_session(discord_id, user_info)
-            
-            # Use state parameter as redirect URL (or default to "/")
-            final_redirect_url = state if state else "/"
-            redirect_response = RedirectResponse(url=final_redirect_url)
-            
-            # Set secure cookie with improved cross-domain support
-            is_localhost = "localhost" in (state or "") or "127.0.0.1" in (state or "")
-            is_noemt_domain = "noemt.dev" in (state or "")
-            
-            redirect_response.set_cookie(
-                key="session_id",
-                value=session_id,
-                max_age=int(SESSION_LIFETIME.total_seconds()),
-                httponly=True,
-                samesite="none" if not is_localhost else "lax",
-                secure=not is_localhost,  # Only secure for non-localhost
-                domain=".noemt.dev" if is_noemt_domain and not is_localhost else None
-            )
-            
-            logger.info(f"Set session cookie for user {discord_id} with domain: {'.noemt.dev' if is_noemt_domain and not is_localhost else 'None'}")
-            
-            return redirect_response
+        client = app.transport.external
+        token_response = await client.post(
+            DISCORD_TOKEN_URL,
+            data={
+                'client_id': DISCORD_CLIENT_ID,
+                'client_secret': DISCORD_CLIENT_SECRET,
+                'grant_type': 'authorization_code',
+                'code': code,
+                'redirect_uri': DISCORD_REDIRECT_URI,
+                'scope': 'identify'
+            },
+            headers={'Content-Type': 'application/x-www-form-urlencoded'}
+        )
+        
+        if token_response.status_code != 200:
+            logger.error(f"Discord token exchange failed: {token_response.text}")
+            raise HTTPException(status_code=400, detail="Failed to retrieve access token")
+        
+        token_data = token_response.json()
+        access_token = token_data['access_token']
+        
+        # Get user information
+        user_response = await client.get(
+            DISCORD_USER_URL,
+            headers={'Authorization': f"Bearer {access_token}"}
+        )
+        
+        if user_response.status_code != 200:
+            logger.error(f"Discord user info fetch failed: {user_response.text}")
+            raise HTTPException(status_code=400, detail="Failed to retrieve user information")
+        
+        user_info = user_response.json()
+        discord_id = user_info['id']
+        
+        # Create session
+        session_id = await app.sessions.create_session(discord_id, user_info)
+        
+        # Use state parameter as redirect URL (or default to "/")
+        final_redirect_url = state if state else "/"
+        redirect_response = RedirectResponse(url=final_redirect_url)
+        
+        # Set secure cookie with improved cross-domain support
+        is_localhost = "localhost" in (state or "") or "127.0.0.1" in (state or "")
+        is_noemt_domain = "noemt.dev" in (state or "")
+        
+        redirect_response.set_cookie(
+            key="session_id",
+            value=session_id,
+            max_age=int(SESSION_LIFETIME.total_seconds()),
+            httponly=True,
+            samesite="none" if not is_localhost else "lax",
+            secure=not is_localhost,  # Only secure for non-localhost
+            domain=".noemt.dev" if is_noemt_domain and not is_localhost else None
+        )
+        
+        logger.info(f"Set session cookie for user {discord_id} with domain: {'.noemt.dev' if is_noemt_domain and not is_localhost else 'None'}")
+        
+        return redirect_response
             
     except Exception as e:
         logger.error(f"Discord OAuth callback error: {e}")
@@ -802,6 +1777,7 @@ async def session_stats():
     """Get session statistics (for debugging/monitoring)"""
     active_sessions = await app.sessions.get_active_sessions_count()
     return {
+        "backend": app.sessions.backend_name,
         "active_sessions": active_sessions,
         "session_lifetime_hours": SESSION_LIFETIME.total_seconds() / 3600
     }
@@ -920,21 +1896,23 @@ async def get_transcript(request: Request, bot_name: str, identifier: str):
                 await app.sessions.delete_session(session_id)
             return RedirectResponse(url="https://www.youtube.com/shorts/cU060_vSuf0")
 
-        success, response = await make_bot_request(port, f"/transcript/{identifier}.html")
-        
-        if not success:
-            if session_id:
-                await app.sessions.delete_session(session_id)
-            return RedirectResponse(url="https://www.youtube.com/shorts/cU060_vSuf0")
+        # Stream the raw transcript file instead of buffering it inside a JSON body
+        bot_client = app.transport.bot_client(port)
+        transcript_request = bot_client.build_request(
+            "GET",
+            f"/transcript/{identifier}.html",
+            params={"raw": "1", "api_key": INTERNAL_API_KEY}
+        )
+        resp = await bot_client.send(transcript_request, stream=True)
         
-        if not response.get("response"):
+        if resp.status_code != 200:
+            await resp.aclose()
             if session_id:
                 await app.sessions.delete_session(session_id)
             return RedirectResponse(url="https://www.youtube.com/shorts/cU060_vSuf0")
             
-        transcript_html = response.get("response")
         logger.info(f"Transcript {identifier} accessed by seller {user_id} in bot {bot_name}")
-        return HTMLResponse(content=transcript_html)
+        return StreamingResponse(_stream_upstream(resp, decode=True), media_type="text/html")
         
     except Exception as e:
         logger.error(f"Transcript access error: {e}")
@@ -1641,6 +2619,9 @@ async def update_bot_config(
             error_detail = response.get("error", "Unknown error")
             raise HTTPException(status_code=500, detail=f"Failed to update configuration: {error_detail}")
 
+    if "domain" in request_data:
+        await refresh_bot_domain(bot_name)
+
     return response
 
 @app.get("/api/bot/{bot_name}/channels")
@@ -1767,13 +2748,120 @@ async def get_all_accounts(request: Request, api_key: str = None):
     
     ports = get_ports()
     bots = await get_listing_bots()
-    for bot in bots:
-        port = ports.get(bot)
-        results_bot = await make_bot_request(port, "/api/accounts/all")
-        data[bot] = results_bot
+    targets = [(bot, ports[bot]) for bot in bots if ports.get(bot)]
+
+    async for result in scatter_gather(targets, "/api/accounts/all", SCATTER_MAX_DEADLINE):
+        if result.get("done"):
+            for bot in result["stragglers"]:
+                data[bot] = (False, {"error": "Request timed out"})
+            continue
+        data[result["bot_name"]] = (
+            result["success"],
+            result["data"] if result["success"] else {"error": result["error"]}
+        )
 
     return data
 
+async def scatter_gather(
+    targets: List[Tuple[str, int]],
+    endpoint: str,
+    deadline: float,
+    data: Any = None
+):
+    """
+    Query many bots concurrently and yield each result as soon as it arrives.
+    Bots that have not answered within the deadline are cancelled and reported
+    as stragglers in the final {"done": True, ...} summary.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def call(bot_name: str, port: int):
+        success, response = await make_bot_request(port, endpoint, timeout=deadline, data=data)
+        return bot_name, success, response, round((loop.time() - started) * 1000, 2)
+
+    tasks = {asyncio.create_task(call(bot_name, port)): bot_name for bot_name, port in targets}
+    pending = set(tasks)
+    succeeded = 0
+    failed = []
+
+    try:
+        while pending:
+            remaining = started + deadline - loop.time()
+            if remaining <= 0:
+                break
+
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                bot_name, success, response, elapsed_ms = task.result()
+                result = {"bot_name": bot_name, "success": success, "elapsed_ms": elapsed_ms}
+                if success:
+                    succeeded += 1
+                    result["data"] = response
+                else:
+                    failed.append(bot_name)
+                    result["error"] = response.get("error", "Unknown error")
+                yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
+    yield {
+        "done": True,
+        "total": len(tasks),
+        "succeeded": succeeded,
+        "failed": failed,
+        "stragglers": sorted(tasks[task] for task in pending),
+        "elapsed_ms": round((loop.time() - started) * 1000, 2)
+    }
+
+@app.post("/internal/scatter")
+async def scatter_endpoint(request: Request, api_key: str = None):
+    """
+    Run one endpoint against many bots concurrently and stream the results
+    back as newline-delimited JSON while they arrive.
+
+    Body: {"endpoint": "/vouches/all", "bots": [...], "deadline": 5, "data": {...}}
+    Omitting "bots" targets every bot; "data" turns the calls into POSTs.
+    """
+    if not api_key or api_key not in (INTERNAL_API_KEY, APP_API_KEY):
+        raise HTTPException(status_code=403, detail="Invalid API key")
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON in request body")
+
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON object")
+
+    endpoint = body.get("endpoint")
+    if not isinstance(endpoint, str) or not endpoint.startswith("/"):
+        raise HTTPException(status_code=400, detail="endpoint must be a path starting with '/'")
+
+    bots = body.get("bots")
+    if bots is not None and (not isinstance(bots, list) or not all(isinstance(bot, str) for bot in bots)):
+        raise HTTPException(status_code=400, detail="bots must be a list of bot names")
+
+    try:
+        deadline = float(body.get("deadline", SCATTER_DEFAULT_DEADLINE))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="deadline must be a number of seconds")
+    deadline = min(max(deadline, 0.1), SCATTER_MAX_DEADLINE)
+
+    ports = get_ports()
+    bots = bots or await get_listing_bots()
+    targets = [(bot, ports[bot]) for bot in bots if ports.get(bot)]
+    unknown = [bot for bot in bots if not ports.get(bot)]
+
+    async def stream():
+        for bot in unknown:
+            yield json.dumps({"bot_name": bot, "success": False, "error": "Bot not found", "elapsed_ms": 0}) + "\n"
+        async for result in scatter_gather(targets, endpoint, deadline, body.get("data")):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @app.get("/api/seller/configuration")
 @require_seller_login
 async def get_seller_configuration(request: Request):
@@ -1983,42 +3071,149 @@ async def check_domain(domain: str = Query(...)):
         logger.warning(f"Domain check FAILED for unauthorized domain: {domain}")
         raise HTTPException(status_code=403, detail="Domain is not authorized for this service.")
     
+async def refresh_domain_index():
+    """
+    Rebuild the domain routing index by asking every bot for its domain once.
+    Concurrent callers wait for the running refresh instead of starting another.
+    """
+    index = app.domain_index
+    if index.lock.locked():
+        async with index.lock:
+            return
+
+    async with index.lock:
+        started = time.perf_counter()
+        bots = await get_listing_bots()
+        ports = get_ports()
+
+        tasks = []
+        bot_port_pairs = []
+
+        for bot_name in bots:
+            port = ports.get(bot_name)
+            if port:
+                tasks.append(make_bot_request(port, "/api/domain", timeout=5))
+                bot_port_pairs.append((bot_name, port))
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        entries = []
+        for (bot_name, port), result in zip(bot_port_pairs, results):
+            if isinstance(result, Exception):
+                continue
+
+            success, data = result
+            if success:
+                entries.append((bot_name, port, data.get("domain")))
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        index.replace(entries, elapsed_ms)
+        logger.info(f"Domain index rebuilt with {len(entries)} bots in {elapsed_ms}ms")
+
+async def refresh_bot_domain(bot_name: str) -> Optional[str]:
+    """Re-query a single bot's domain and update the routing index"""
+    port = get_ports().get(bot_name)
+    if not port:
+        app.domain_index.update_bot(bot_name, 0, None)
+        return None
+
+    success, data = await make_bot_request(port, "/api/domain", timeout=5)
+    if not success:
+        return None
+
+    domain = data.get("domain")
+    app.domain_index.update_bot(bot_name, port, domain)
+    logger.info(f"Domain index updated: {bot_name} -> {domain}")
+    return domain
+
 async def find_bot_by_domain(domain: str) -> Tuple[Optional[str], Optional[int]]:
     """
-    Find a bot by domain efficiently using concurrent requests
+    Find a bot by domain using the in-memory routing index
     Returns: (bot_name, port) or (None, None) if not found
     """
-    bots = await get_listing_bots()
-    ports = get_ports()
-    
-    tasks = []
-    bot_port_pairs = []
-    
-    for bot_name in bots:
-        port = ports.get(bot_name)
-        if port:
-            task = make_bot_request(port, "/api/domain", timeout=5)
-            tasks.append(task)
-            bot_port_pairs.append((bot_name, port))
-    
-    if not tasks:
-        return None, None
-    
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            continue
-            
-        success, data = result
-        if success:
-            bot_domain = data.get("domain")
-            if bot_domain and bot_domain.lower() == domain.lower():
-                bot_name, port = bot_port_pairs[i]
-                return bot_name, port
-    
+    index = app.domain_index
+    entry = index.lookup(domain)
+    if entry:
+        return entry
+
+    # Only approved domains may trigger a rebuild, so unknown hosts stay O(1)
+    since_refresh = index.seconds_since_refresh()
+    if not index.is_built or (
+        since_refresh > DOMAIN_INDEX_MISS_REFRESH_SECONDS
+        and domain.lower() in load_approved_domains()
+    ):
+        await refresh_domain_index()
+        # Already counted as a miss above
+        entry = index.lookup(domain, count=False)
+        if entry:
+            return entry
+
     return None, None
 
+@app.post("/internal/domain/invalidate")
+async def invalidate_domain(bot_name: str, api_key: str = None):
+    """Called by a bot after its domain config changed"""
+    if api_key != INTERNAL_API_KEY:
+        raise HTTPException(status_code=403, detail="Invalid API key")
+
+    if not validate_bot_name(bot_name):
+        raise HTTPException(status_code=404, detail=f"Bot '{bot_name}' not found")
+
+    domain = await refresh_bot_domain(bot_name)
+    return {"success": True, "bot_name": bot_name, "domain": domain}
+
+@app.get("/domains/index/stats")
+async def domain_index_stats():
+    """Get domain routing index statistics (for debugging/monitoring)"""
+    return app.domain_index.stats()
+
+@app.post("/internal/email/invalidate")
+async def invalidate_email(bot_name: str, api_key: str = None):
+    """Called by a bot after its payment email changed"""
+    if api_key != INTERNAL_API_KEY:
+        raise HTTPException(status_code=403, detail="Invalid API key")
+
+    if not validate_bot_name(bot_name):
+        raise HTTPException(status_code=404, detail=f"Bot '{bot_name}' not found")
+
+    await refresh_bot_email(bot_name)
+    return {"success": True, "bot_name": bot_name}
+
+@app.post("/internal/registry/invalidate")
+async def invalidate_registry(bot_name: str, api_key: str = None):
+    """
+    Called by a bot once it is serving, so routing and the domain/email
+    indexes pick it up without waiting for the next poll or refresh
+    """
+    if api_key != INTERNAL_API_KEY:
+        raise HTTPException(status_code=403, detail="Invalid API key")
+
+    await app.registry.run(app.registry.reload)
+    if not validate_bot_name(bot_name):
+        raise HTTPException(status_code=404, detail=f"Bot '{bot_name}' not found")
+    app.bot_health.reset(get_ports()[bot_name])
+
+    domain, _ = await asyncio.gather(refresh_bot_domain(bot_name), refresh_bot_email(bot_name))
+    return {"success": True, "bot_name": bot_name, "port": get_ports().get(bot_name), "domain": domain}
+
+@app.get("/bots/health")
+async def bots_health():
+    """Get the per-bot circuit breaker table (for debugging/monitoring)"""
+    return {
+        "short_circuited": app.bot_health.short_circuited,
+        "bots": app.bot_health.table(get_ports())
+    }
+
+@app.get("/registry/stats")
+async def registry_stats():
+    """Get service registry statistics (for debugging/monitoring)"""
+    return app.registry.stats()
+
+@app.get("/emails/index/stats")
+async def email_index_stats():
+    """Get email index statistics (for debugging/monitoring)"""
+    return app.email_index.stats()
+
 
 @app.get("/custom/bot/name")
 async def get_bot_name_for_domain(request: Request):
@@ -2043,6 +3238,213 @@ async def get_bot_name_for_domain(request: Request):
     return {"name": bot_name}
 
 
+# Headers dropped when the body is re-encoded (decoded stream / cache) vs passed through untouched
+PROXY_EXCLUDED_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+PROXY_PASSTHROUGH_EXCLUDED_HEADERS = {"transfer-encoding", "connection", "keep-alive"}
+# Requests carrying these may get a per-user response, so they never use the shared cache
+PROXY_UNCACHEABLE_REQUEST_HEADERS = ("cookie", "authorization")
+
+def _vary_headers(upstream_headers: httpx.Headers) -> Tuple[str, ...]:
+    # Cached bodies are stored decoded, so accept-encoding never splits them
+    names = {name.strip().lower() for name in upstream_headers.get("vary", "").split(",") if name.strip()}
+    names.discard("accept-encoding")
+    return tuple(sorted(names))
+
+def _cache_ttl(path: str, upstream_headers: httpx.Headers) -> Optional[float]:
+    """
+    Seconds a proxied response may be served without contacting upstream.
+    Returns None if the response must not be stored at all.
+    """
+    directives = parse_cache_control(upstream_headers.get("cache-control"))
+    if "no-store" in directives or "private" in directives:
+        return None
+    # A cookie set for one visitor must never be replayed to the next
+    if "set-cookie" in upstream_headers or upstream_headers.get("vary", "").strip() == "*":
+        return None
+
+    ttl = 0
+    for name in ("s-maxage", "max-age"):
+        try:
+            ttl = int(directives.get(name) or 0)
+        except ValueError:
+            continue
+        if ttl:
+            break
+
+    # Build output under static/ and assets/ is content-hashed, so it is safe
+    # to keep even though the frontend server always answers max-age=0
+    if ttl <= 0 and "no-cache" not in directives and path.startswith(("static/", "assets/")):
+        ttl = PROXY_CACHE_ASSET_TTL_SECONDS
+
+    if ttl <= 0 and not upstream_headers.get("etag"):
+        return None
+    return ttl
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def _cached_response(request: Request, entry: Dict, cache_status: str, extra_headers: Optional[Dict[str, str]]) -> Response:
+    headers = dict(entry["headers"])
+    headers["Access-Control-Allow-Origin"] = "*"
+    if extra_headers:
+        headers.update(extra_headers)
+    headers["X-Cache"] = cache_status
+
+    if_none_match = request.headers.get("if-none-match")
+    if entry["etag"] and if_none_match and _etag_matches(if_none_match, entry["etag"]):
+        app.proxy_cache.not_modified += 1
+        headers.pop("content-type", None)
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry["body"], status_code=entry["status_code"], headers=headers)
+
+async def _stream_upstream(
+    resp: httpx.Response,
+    decode: bool,
+    on_complete: Optional[Any] = None,
+    limit: int = 0
+):
+    """
+    Yield upstream chunks as they arrive. When on_complete is given, the
+    decoded body is also collected (up to limit bytes) and handed to it once
+    the stream finishes, so the cache is filled without delaying the client.
+    """
+    buffer = bytearray() if on_complete else None
+    try:
+        chunks = resp.aiter_bytes() if decode else resp.aiter_raw()
+        async for chunk in chunks:
+            if buffer is not None:
+                if len(buffer) + len(chunk) > limit:
+                    buffer = None
+                else:
+                    buffer.extend(chunk)
+            yield chunk
+
+        if buffer is not None:
+            on_complete(bytes(buffer))
+    finally:
+        await resp.aclose()
+
+async def proxy_shop_frontend(
+    request: Request,
+    bot_name: str,
+    target_url: str,
+    default_content_type: str = "application/octet-stream",
+    extra_headers: Optional[Dict[str, str]] = None,
+    default_accept: Optional[str] = None
+) -> Response:
+    """
+    Proxy a request to the shop frontend, serving repeat GETs from the shared
+    response cache and answering conditional requests with 304s directly.
+    Everything else is streamed through chunk by chunk.
+    """
+    url = httpx.URL(target_url, params=request.query_params)
+    path = url.path.lstrip("/")
+    headers = dict(request.headers)
+    headers["host"] = f"{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}"
+    if default_accept and "accept" not in headers:
+        headers["accept"] = default_accept
+
+    cache = app.proxy_cache
+    cacheable = request.method == "GET" and not any(name in request.headers for name in PROXY_UNCACHEABLE_REQUEST_HEADERS)
+    key = cache.key_for(bot_name, str(url), request.headers)
+    entry = cache.get(key) if cacheable else None
+
+    if entry is not None and cache.is_fresh(entry):
+        cache.hits += 1
+        return _cached_response(request, entry, "HIT", extra_headers)
+
+    if cacheable:
+        # Conditional headers are answered from the cache, not forwarded
+        headers.pop("if-none-match", None)
+        headers.pop("if-modified-since", None)
+        if entry is not None and entry["etag"]:
+            headers["if-none-match"] = entry["etag"]
+
+    proxy_client = app.transport.frontend
+    req = proxy_client.build_request(
+        method=request.method,
+        url=url,
+        headers=headers,
+        content=request.stream() if request.method not in ("GET", "HEAD") else None
+    )
+    resp = await proxy_client.send(req, stream=True)
+
+    if resp.status_code == 304:
+        await resp.aclose()
+        if entry is not None:
+            cache.hits += 1
+            cache.revalidations += 1
+            cache.touch(entry, _cache_ttl(path, resp.headers) or 0)
+            return _cached_response(request, entry, "REVALIDATED", extra_headers)
+
+    ttl = _cache_ttl(path, resp.headers) if cacheable and resp.status_code == 200 else None
+    content_length = resp.headers.get("content-length")
+    if ttl is not None and content_length and content_length.isdigit() and int(content_length) > cache.max_entry_bytes:
+        ttl = None
+
+    # Cacheable bodies are decoded so they can be served to any client later;
+    # everything else is piped through byte for byte, compression included
+    decode = ttl is not None
+    excluded = PROXY_EXCLUDED_HEADERS if decode else PROXY_PASSTHROUGH_EXCLUDED_HEADERS
+    response_headers = {
+        key.lower(): value for key, value in resp.headers.items()
+        if key.lower() not in excluded
+    }
+
+    if resp.status_code != 304:
+        content_type = resp.headers.get("content-type", default_content_type)
+        if "text/html" in content_type and "charset" not in content_type:
+            content_type = "text/html; charset=utf-8"
+        response_headers["content-type"] = content_type
+
+    on_complete = None
+    if decode:
+        cached_headers = dict(response_headers)
+        status_code = resp.status_code
+        vary = _vary_headers(resp.headers)
+        cache.set_vary(bot_name, str(url), vary)
+        store_key = (bot_name, str(url), tuple(request.headers.get(name, "") for name in vary))
+
+        def on_complete(body: bytes):
+            cache.put(store_key, status_code, cached_headers, body, ttl)
+
+    response_headers["Access-Control-Allow-Origin"] = "*"
+    if extra_headers:
+        response_headers.update(extra_headers)
+    response_headers["X-Cache"] = "MISS" if cacheable else "BYPASS"
+
+    if resp.status_code == 304 or request.method == "HEAD":
+        await resp.aclose()
+        return Response(status_code=resp.status_code, headers=response_headers)
+
+    return StreamingResponse(
+        _stream_upstream(resp, decode, on_complete, cache.max_entry_bytes),
+        status_code=resp.status_code,
+        headers=response_headers
+    )
+
+@app.get("/proxy/cache/stats")
+async def proxy_cache_stats():
+    """Get shop frontend proxy cache statistics (for debugging/monitoring)"""
+    return app.proxy_cache.stats()
+
+@app.get("/transport/stats")
+async def transport_stats():
+    """Get connection pool utilization for every outbound pool (for debugging/monitoring)"""
+    pools = app.transport.stats()
+    try:
+        bot_names = {f"bot:{port}": bot_name for bot_name, port in get_ports().items()}
+    except HTTPException:
+        bot_names = {}
+    for name, pool in pools.items():
+        if name in bot_names:
+            pool["bot_name"] = bot_names[name]
+    return pools
+
 @app.get("/static/{full_path:path}")
 async def flexible_static_endpoint(request: Request, full_path: str):
     """
@@ -2083,6 +3485,7 @@ async def flexible_static_endpoint(request: Request, full_path: str):
             logger.error(f"Error serving local static file {full_path}: {e}")
     
     host = request.headers.get("host")
+    bot_name = None
     
     if host and host not in ["v2.noemt.dev", "noemt.dev", "localhost:7000"]:
         bot_name, _ = await find_bot_by_domain(host)
@@ -2092,41 +3495,7 @@ async def flexible_static_endpoint(request: Request, full_path: str):
     target_url = f"http://{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}/static/{full_path}"
     
     try:
-        url = httpx.URL(target_url, params=request.query_params)
-        headers = dict(request.headers)
-        headers["host"] = f"{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}"
-        
-        async with httpx.AsyncClient() as client:
-            req = client.build_request(
-                method=request.method,
-                url=url,
-                headers=headers,
-                content=await request.body()
-            )
-            
-            resp = await client.send(req, stream=True)
-            
-            content_type = resp.headers.get("content-type", "application/octet-stream")
-            
-            excluded_headers = ["content-encoding", "transfer-encoding"]
-            response_headers = {}
-            
-            for key, value in resp.headers.items():
-                if key.lower() not in excluded_headers:
-                    response_headers[key] = value
-            
-            response_headers["Access-Control-Allow-Origin"] = "*"
-            
-            content = await resp.aread()
-            response_headers["Content-Length"] = str(len(content))
-            
-            return Response(
-                content=content,
-                status_code=resp.status_code,
-                headers=response_headers,
-                media_type=content_type
-            )
-    
+        return await proxy_shop_frontend(request, bot_name or "", target_url)
     except httpx.RequestError as e:
         logger.error(f"Failed to proxy static file {full_path}: {e}")
         raise HTTPException(status_code=502, detail="Could not contact the backend service.")
@@ -2135,8 +3504,6 @@ async def flexible_static_endpoint(request: Request, full_path: str):
         raise HTTPException(status_code=500, detail="Internal server error.")
 
 
-proxy_client = httpx.AsyncClient()
-
 @app.api_route("/static/{full_path:path}", include_in_schema=False)
 async def custom_domain_static_proxy(request: Request, full_path: str):
     """
@@ -2159,48 +3526,9 @@ async def custom_domain_static_proxy(request: Request, full_path: str):
         )
 
     target_url = f"http://{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}/static/{full_path}"
-    
-    print(f"Static asset request: /static/{full_path}")
-    print(f"Target URL: {target_url}")
 
     try:
-        url = httpx.URL(target_url, params=request.query_params)
-        headers = dict(request.headers)
-        
-        headers["host"] = f"{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}"
-        
-        req = proxy_client.build_request(
-            method=request.method,
-            url=url,
-            headers=headers,
-            content=await request.body()
-        )
-        
-        print(f"Proxying static asset {request.method} {target_url}")
-        resp = await proxy_client.send(req, stream=True)
-        
-        content_type = resp.headers.get("content-type", "application/octet-stream")
-        print(f"Static asset response: {resp.status_code}, Content-Type: {content_type}")
-        
-        excluded_headers = ["content-encoding", "transfer-encoding"]
-        response_headers = {}
-        
-        for key, value in resp.headers.items():
-            if key.lower() not in excluded_headers:
-                response_headers[key] = value
-        
-        response_headers["Access-Control-Allow-Origin"] = "*"
-        
-        content = await resp.aread()
-        response_headers["Content-Length"] = str(len(content))
-        
-        return Response(
-            content=content,
-            status_code=resp.status_code,
-            headers=response_headers,
-            media_type=content_type
-        )
-
+        return await proxy_shop_frontend(request, bot_name, target_url)
     except httpx.RequestError as e:
         logger.error(f"Failed to proxy static asset request for '{host}' to '{target_url}': {e}")
         raise HTTPException(status_code=502, detail="Could not contact the backend shop service.")
@@ -2226,46 +3554,9 @@ async def custom_domain_assets_proxy(request: Request, full_path: str):
         )
 
     target_url = f"http://{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}/assets/{full_path}"
-    
-    print(f"Assets request: /assets/{full_path}")
-    print(f"Target URL: {target_url}")
 
     try:
-        url = httpx.URL(target_url, params=request.query_params)
-        headers = dict(request.headers)
-        headers["host"] = f"{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}"
-        
-        req = proxy_client.build_request(
-            method=request.method,
-            url=url,
-            headers=headers,
-            content=await request.body()
-        )
-        
-        resp = await proxy_client.send(req, stream=True)
-        
-        content_type = resp.headers.get("content-type", "application/octet-stream")
-        print(f"Assets response: {resp.status_code}, Content-Type: {content_type}")
-        
-        excluded_headers = ["content-encoding", "transfer-encoding"]
-        response_headers = {}
-        
-        for key, value in resp.headers.items():
-            if key.lower() not in excluded_headers:
-                response_headers[key] = value
-        
-        response_headers["Access-Control-Allow-Origin"] = "*"
-        
-        content = await resp.aread()
-        response_headers["Content-Length"] = str(len(content))
-        
-        return Response(
-            content=content,
-            status_code=resp.status_code,
-            headers=response_headers,
-            media_type=content_type
-        )
-
+        return await proxy_shop_frontend(request, bot_name, target_url)
     except httpx.RequestError as e:
         logger.error(f"Failed to proxy assets request for '{host}' to '{target_url}': {e}")
         raise HTTPException(status_code=502, detail="Could not contact the backend shop service.")
@@ -2288,7 +3579,6 @@ async def custom_domain_shop_proxy(request: Request, full_path: str):
         )
 
     bot_name, _ = await find_bot_by_domain(host)
-    print(f"Bot found for domain {host}: {bot_name}")
 
     if not bot_name:
         return Response(
@@ -2296,104 +3586,22 @@ async def custom_domain_shop_proxy(request: Request, full_path: str):
             status_code=404
         )
 
+    # React SPA - all routes serve index.html
     target_url = f"http://{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}/"
-    
-    print(f"Original request path: /shop/{full_path}")
-    print(f"Target URL: {target_url} (React SPA - all routes serve index.html)")
 
     try:
-        url = httpx.URL(target_url, params=request.query_params)
-        headers = dict(request.headers)
-        
-        headers["host"] = f"{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}"
-        
-        if "accept" not in headers:
-            headers["accept"] = "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
-        
-        # Build and send the new request
-        req = proxy_client.build_request(
-            method=request.method,
-            url=url,
-            headers=headers,
-            content=await request.body()
-        )
-        
-        print(f"Proxying {request.method} {target_url}")
-        resp = await proxy_client.send(req, stream=True)
-        
-        # Get content type from response
-        content_type = resp.headers.get("content-type", "text/html")
-        print(f"Response: {resp.status_code}, Content-Type: {content_type}")
-        
-        # Handle 304 Not Modified responses - pass through directly with minimal processing
-        if resp.status_code == 304:
-            # For 304 responses, preserve original headers as much as possible
-            response_headers = {}
-            excluded_headers = ["content-encoding", "transfer-encoding", "content-length"]
-            
-            for key, value in resp.headers.items():
-                if key.lower() not in excluded_headers:
-                    response_headers[key] = value
-            
-            # Add minimal CORS headers for browser compatibility
-            response_headers["Access-Control-Allow-Origin"] = "*"
-            
-            return Response(
-                content=b"",  # Empty bytes for 304
-                status_code=304,
-                headers=response_headers
-            )
-        
-        # Exclude headers that can cause issues but preserve important ones
-        excluded_headers = ["content-encoding", "transfer-encoding"]
-        response_headers = {}
-        
-        for key, value in resp.headers.items():
-            if key.lower() not in excluded_headers:
-                response_headers[key] = value
-        
         # Ensure CORS headers for CSR applications
-        response_headers["Access-Control-Allow-Origin"] = "*"
-        response_headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-        response_headers["Access-Control-Allow-Headers"] = "*"
-        
-        # Handle different content types appropriately
-        if "text/html" in content_type:
-            # For HTML, read the full content
-            content = await resp.aread()
-            
-            # Debug: Log content length and beginning of content
-            print(f"HTML content length: {len(content)} bytes")
-            if len(content) > 0:
-                preview = content[:200].decode('utf-8', errors='ignore')
-                print(f"HTML content preview: {preview}")
-            else:
-                print("HTML content is empty!")
-            
-            # Ensure proper charset
-            if "charset" not in content_type:
-                response_headers["Content-Type"] = "text/html; charset=utf-8"
-            
-            # Set content length for the full content
-            response_headers["Content-Length"] = str(len(content))
-            
-            return Response(
-                content=content,
-                status_code=resp.status_code,
-                headers=response_headers
-            )
-        else:
-            # For other content types (JS, CSS, images, etc.), read full content too
-            content = await resp.aread()
-            response_headers["Content-Length"] = str(len(content))
-            
-            return Response(
-                content=content,
-                status_code=resp.status_code,
-                headers=response_headers,
-                media_type=content_type
-            )
-
+        return await proxy_shop_frontend(
+            request,
+            bot_name,
+            target_url,
+            default_content_type="text/html",
+            default_accept="text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            extra_headers={
+                "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+                "Access-Control-Allow-Headers": "*"
+            }
+        )
     except httpx.RequestError as e:
         logger.error(f"Failed to proxy request for '{host}' to '{target_url}': {e}")
         raise HTTPException(status_code=502, detail="Could not contact the backend shop service.")
@@ -2432,46 +3640,9 @@ async def custom_domain_catch_all(request: Request, full_path: str):
     else:
         # Everything else - serve React app
         target_url = f"http://{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}/"
-    
-    print(f"Catch-all request: /{full_path}")
-    print(f"Target URL: {target_url}")
 
     try:
-        url = httpx.URL(target_url, params=request.query_params)
-        headers = dict(request.headers)
-        headers["host"] = f"{SHOP_FRONTEND_HOST}:{SHOP_FRONTEND_PORT}"
-        
-        req = proxy_client.build_request(
-            method=request.method,
-            url=url,
-            headers=headers,
-            content=await request.body()
-        )
-        
-        resp = await proxy_client.send(req, stream=True)
-        
-        content_type = resp.headers.get("content-type", "application/octet-stream")
-        print(f"Catch-all response: {resp.status_code}, Content-Type: {content_type}")
-        
-        excluded_headers = ["content-encoding", "transfer-encoding"]
-        response_headers = {}
-        
-        for key, value in resp.headers.items():
-            if key.lower() not in excluded_headers:
-                response_headers[key] = value
-        
-        response_headers["Access-Control-Allow-Origin"] = "*"
-        
-        content = await resp.aread()
-        response_headers["Content-Length"] = str(len(content))
-        
-        return Response(
-            content=content,
-            status_code=resp.status_code,
-            headers=response_headers,
-            media_type=content_type
-        )
-
+        return await proxy_shop_frontend(request, bot_name, target_url)
     except httpx.RequestError as e:
         logger.error(f"Failed to proxy catch-all request for '{host}' to '{target_url}': {e}")
         raise HTTPException(status_code=502, detail="Could not contact the backend shop service.")